@@ -8,7 +8,7 @@ import {
 } from "@/lib/playbackEngine";
 import { isServerSideModel, type VoiceSelection } from "@/lib/voiceSelection";
 import type { Section } from "@/lib/sectionIndex";
-import { createServerSynthesizer, type ServerSynthesizerInstance, type WSBlockStatusMessage, type WSEvictedMessage } from "@/lib/serverSynthesizer";
+import { createServerSynthesizer, type ServerSynthesizerInstance, type WSBlockStatusMessage, type WSBlockStatusesMessage, type WSEvictedMessage, type WSSessionMessage } from "@/lib/serverSynthesizer";
 import { createBrowserSynthesizer, type BrowserSynthesizerInstance } from "@/lib/browserSynthesizer";
 import { useTTSWebSocket, type WSMessage } from "./useTTSWebSocket";
 
@@ -52,8 +52,17 @@ export function usePlaybackEngine(
   // WS message handler — forwards to server synthesizer
   const handleWSMessage = useCallback((data: WSMessage) => {
     if (!serverSynthRef.current) return;
-    if (data.type === "status") {
+    if (data.type === "session") {
+      // Replayed statuses came first; what's neither resolved nor in flight is re-sent
+      const session = data as unknown as WSSessionMessage;
+      if (session.resumed) serverSynthRef.current.resumePending(session.pending);
+      else serverSynthRef.current.retryAllPending();
+    } else if (data.type === "status") {
       serverSynthRef.current.onWSMessage(data as unknown as WSBlockStatusMessage);
+    } else if (data.type === "statuses") {
+      for (const status of (data as unknown as WSBlockStatusesMessage).statuses) {
+        serverSynthRef.current.onWSMessage(status);
+      }
     } else if (data.type === "evicted") {
       serverSynthRef.current.onWSMessage(data as unknown as WSEvictedMessage);
     } else if (data.type === "error") {
@@ -61,12 +70,8 @@ export function usePlaybackEngine(
     }
   }, []);
 
-  // On WS connect/reconnect: retry all pending synthesis requests
-  const handleWSConnect = useCallback(() => {
-    serverSynthRef.current?.retryAllPending();
-  }, []);
-
-  const ttsWS = useTTSWebSocket(handleWSMessage, handleWSConnect);
+  // Pending synthesis requests are retried once the `session` frame says whether the server resumed us
+  const ttsWS = useTTSWebSocket(handleWSMessage);
 
   // Stable refs for WS deps
   const sendWSRef = useRef(ttsWS.send);
@@ -7,7 +7,7 @@ const WS_BASE_URL = import.meta.env.VITE_WS_BASE_URL ||
 	`${window.location.protocol === "https:" ? "wss:" : "ws:"}//${window.location.host}/api`;
 
 export interface WSMessage {
-  type: "status" | "evicted" | "error";
+  type: "session" | "status" | "statuses" | "evicted" | "error";
   [key: string]: unknown;
 }
 
@@ -46,9 +46,12 @@ export function useTTSWebSocket(
 
   // Message queue: messages sent while WS is not connected are queued and drained on connect
   const messageQueueRef = useRef<object[]>([]);
+  // Server-assigned session, resumed on reconnect (replays statuses missed while disconnected)
+  const sessionIdRef = useRef<string | null>(null);
 
   const getWebSocketUrl = useCallback(async (): Promise<string> => {
-    const baseUrl = `${WS_BASE_URL}/v1/ws/tts`;
+    const resume = sessionIdRef.current ? `&resume=${encodeURIComponent(sessionIdRef.current)}` : "";
+    const baseUrl = `${WS_BASE_URL}/v1/ws/tts?timestamps=compact&statuses=batched${resume}`;
     if (!authEnabled) return baseUrl;
     if (user?.currentSession) {
       // getTokens() refreshes the access token via the refresh token when expired.
@@ -56,11 +59,11 @@ export function useTTSWebSocket(
       // so connect() retries. Never downgrade a signed-in user to an anonymous identity.
       const { accessToken } = await user.currentSession.getTokens();
       if (!accessToken) throw new Error("No access token for signed-in session");
-      return `${baseUrl}?token=${encodeURIComponent(accessToken)}`;
+      return `${baseUrl}&token=${encodeURIComponent(accessToken)}`;
     }
     const anonymousId = await getOrCreateAnonymousId();
     const anonymousToken = getAnonymousToken();
-    return `${baseUrl}?anonymous_id=${encodeURIComponent(anonymousId)}&anonymous_token=${encodeURIComponent(anonymousToken ?? "")}`;
+    return `${baseUrl}&anonymous_id=${encodeURIComponent(anonymousId)}&anonymous_token=${encodeURIComponent(anonymousToken ?? "")}`;
   }, [user]);
 
   const connect = useCallback(async () => {
@@ -109,7 +112,7 @@ export function useTTSWebSocket(
           messageQueueRef.current = [];
         }
 
-        // Notify listeners (synthesizer uses this to retry pending blocks)
+        // Notify listeners
         onConnectRef.current?.();
 
         reconnectAttemptsRef.current = 0;
@@ -119,6 +122,7 @@ export function useTTSWebSocket(
       ws.onmessage = (event: MessageEvent) => {
         try {
           const data: WSMessage = JSON.parse(event.data);
+          if (data.type === "session") sessionIdRef.current = data.session_id as string;
           onMessageRef.current(data);
         } catch (err) {
           console.error("[TTS WS] Failed to parse message:", err);
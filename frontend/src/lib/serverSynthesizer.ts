@@ -1,5 +1,6 @@
 import type { Synthesizer } from "./synthesizer";
 import type { AudioBufferData, WordTiming } from "./playbackEngine";
+import { decodeCompactTimestamps } from "./wordTimestamps";
 
 interface WSSynthesizeRequest {
   type: "synthesize";
@@ -19,17 +20,35 @@ export interface WSBlockStatusMessage {
   type: "status";
   document_id: string;
   block_idx: number;
-  status: "queued" | "processing" | "cached" | "skipped" | "error";
+  status: "queued" | "processing" | "cached" | "skipped" | "error" | "cancelled";
   audio_url?: string;
   error?: string;
   recoverable?: boolean;
   model_slug?: string;
   voice_slug?: string;
+  /** JSON list of word timings; sent to connections that didn't ask for the compact form. */
   word_timestamps?: string;
+  /** Binary word timings, base64 (see wordTimestamps.ts); sent with `?timestamps=compact`. */
+  word_timestamps_compact?: string;
   /** Exact synthesized length. Null until the billing consumer has written it for a cache hit. */
   duration_ms?: number | null;
 }
 
+/** All blocks one synthesize request resolved; sent with `?statuses=batched`. */
+export interface WSBlockStatusesMessage {
+  type: "statuses";
+  document_id: string;
+  statuses: WSBlockStatusMessage[];
+}
+
+/** First frame on every connection; `pending` lists the blocks a resumed session still has in flight. */
+export interface WSSessionMessage {
+  type: "session";
+  session_id: string;
+  resumed: boolean;
+  pending: Record<string, number[]>;
+}
+
 export interface WSEvictedMessage {
   type: "evicted";
   document_id: string;
@@ -66,6 +85,7 @@ interface ServerSynthesizerDeps {
 export function createServerSynthesizer(deps: ServerSynthesizerDeps): Synthesizer & {
   onWSMessage(msg: WSBlockStatusMessage | WSEvictedMessage): void;
   retryAllPending(): void;
+  resumePending(serverPending: Record<string, number[]>): void;
 } {
   const pending = new Map<string, PendingRequest>();
   let lastError: string | null = null;
@@ -180,14 +200,30 @@ export function createServerSynthesizer(deps: ServerSynthesizerDeps): Synthesize
 
   /**
    * Re-send synthesis requests for all pending blocks.
-   * Called on WS connect/reconnect. Idempotent — server handles duplicates.
+   * Called on a fresh WS session. Idempotent — server handles duplicates.
    */
   function retryAllPending() {
+    retryPending(() => true);
+  }
+
+  /**
+   * Called when the server resumed our WS session. Statuses published while we were
+   * disconnected have been replayed already; blocks the server still has in flight
+   * need nothing, only the rest are re-sent.
+   */
+  function resumePending(serverPending: Record<string, number[]>) {
+    retryPending((req) => !serverPending[req.documentId]?.includes(req.blockIdx));
+  }
+
+  function retryPending(shouldResend: (req: PendingRequest) => boolean) {
     if (pending.size === 0) return;
 
     // Group by document+model+voice for batch efficiency
     const groups = new Map<string, { documentId: string; model: string; voice: string; indices: number[] }>();
+    let resent = 0;
     for (const req of pending.values()) {
+      if (!shouldResend(req)) continue;
+      resent++;
       const groupKey = `${req.documentId}:${req.model}:${req.voice}`;
       let group = groups.get(groupKey);
       if (!group) {
@@ -208,7 +244,7 @@ export function createServerSynthesizer(deps: ServerSynthesizerDeps): Synthesize
       req.timer = createRetryTimer(key, req);
     }
 
-    console.log(`[ServerSynth] Retried ${pending.size} pending blocks on reconnect`);
+    console.log(`[ServerSynth] Retried ${resent} of ${pending.size} pending blocks on reconnect`);
   }
 
   function onWSMessage(msg: WSBlockStatusMessage | WSEvictedMessage) {
@@ -239,13 +275,8 @@ export function createServerSynthesizer(deps: ServerSynthesizerDeps): Synthesize
       lastError = null;
       lastErrorRecoverable = true;
 
-      let wordTimings: WordTiming[] | undefined;
-      try {
-        wordTimings = msg.word_timestamps ? JSON.parse(msg.word_timestamps) : undefined;
-      } catch { /* ignore malformed timestamps */ }
-
-      deps.fetchAudio(msg.audio_url)
-        .then((arrayBuffer) => {
+      Promise.all([deps.fetchAudio(msg.audio_url), parseWordTimings(msg)])
+        .then(([arrayBuffer, wordTimings]) => {
           req.resolve({
             rawAudio: arrayBuffer,
             mimeType: "audio/ogg",
@@ -265,7 +296,7 @@ export function createServerSynthesizer(deps: ServerSynthesizerDeps): Synthesize
         req.resolve(null);
         pending.delete(key);
       }
-    } else if (msg.status === "skipped") {
+    } else if (msg.status === "skipped" || msg.status === "cancelled") {
       if (req) {
         clearTimeout(req.timer);
         req.resolve(null);
@@ -288,6 +319,7 @@ export function createServerSynthesizer(deps: ServerSynthesizerDeps): Synthesize
     onWSMessage,
     onCursorMove,
     retryAllPending,
+    resumePending,
     getError: () => lastError,
     isRecoverable: () => lastErrorRecoverable,
     clearError: () => { lastError = null; lastErrorRecoverable = true; },
@@ -296,3 +328,12 @@ export function createServerSynthesizer(deps: ServerSynthesizerDeps): Synthesize
 }
 
 export type ServerSynthesizerInstance = ReturnType<typeof createServerSynthesizer>;
+
+async function parseWordTimings(msg: WSBlockStatusMessage): Promise<WordTiming[] | undefined> {
+  try {
+    if (msg.word_timestamps_compact) return await decodeCompactTimestamps(msg.word_timestamps_compact);
+    return msg.word_timestamps ? JSON.parse(msg.word_timestamps) : undefined;
+  } catch {
+    return undefined; // malformed timestamps: play without highlighting
+  }
+}
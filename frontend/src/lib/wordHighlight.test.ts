@@ -0,0 +1,21 @@
+import { describe, it, expect } from "vitest";
+import { foldForMatch } from "./wordHighlight";
+
+// Mirrors the character rules of yapit.gateway.text_canonical.canonicalize
+describe("foldForMatch", () => {
+  it("folds page text the way the gateway canonicalizes it", () => {
+    expect(foldForMatch("Don\u2019t re-en\u00adtrant\u200b cafe\u0301").text).toBe("Don't re-entrant caf\u00e9");
+  });
+
+  it("maps folded characters back to the original text", () => {
+    const original = "a re-en\u00adtrant cafe\u0301!";
+    const folded = foldForMatch(original);
+    const span = (word: string) => {
+      const idx = folded.text.indexOf(word);
+      return original.slice(folded.starts[idx], folded.ends[idx + word.length - 1]);
+    };
+
+    expect(span("re-entrant")).toBe("re-en\u00adtrant");
+    expect(span("caf\u00e9")).toBe("cafe\u0301");
+  });
+});
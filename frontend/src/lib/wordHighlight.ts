@@ -2,6 +2,37 @@ import type { WordTiming } from "./playbackEngine";
 
 const HIGHLIGHT_NAME = "audio-word-active";
 
+// The gateway synthesizes canonical text (yapit/gateway/text_canonical.py), so
+// timestamp words are NFC, without soft hyphens or zero-width characters, and have
+// straight quotes. Page text is folded by the same rules before searching it;
+// starts/ends map each folded character back to the original characters it came
+// from. Whitespace needs no folding: timestamp words are trimmed single words.
+const INVISIBLE = new Set(["\u00ad", "\u200b", "\u2060", "\ufeff"]); // soft hyphen, ZWSP, word joiner, BOM
+const QUOTES: Record<string, string> = { "\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"' };
+const CHARACTER = /\P{M}\p{M}*|\p{M}+/gu; // a code point and the combining marks after it
+
+export interface FoldedText {
+  text: string;
+  starts: number[];
+  ends: number[];
+}
+
+export function foldForMatch(original: string): FoldedText {
+  let text = "";
+  const starts: number[] = [];
+  const ends: number[] = [];
+  for (const match of original.matchAll(CHARACTER)) {
+    if (INVISIBLE.has(match[0])) continue;
+    const folded = match[0].normalize("NFC").replace(/[\u2018\u2019\u201c\u201d]/g, (q) => QUOTES[q]);
+    text += folded;
+    for (let i = 0; i < folded.length; i++) {
+      starts.push(match.index);
+      ends.push(match.index + match[0].length);
+    }
+  }
+  return { text, starts, ends };
+}
+
 export function createWordHighlightManager() {
   const isSupported = typeof CSS !== "undefined" && "highlights" in CSS;
   let prebuiltRanges: (Range | null)[] | null = null;
@@ -18,18 +49,18 @@ export function createWordHighlightManager() {
     let searchFrom = 0;
 
     for (let wordPointer = 0; wordPointer < timings.length; wordPointer++) {
-      const wordText = timings[wordPointer].t.trim();
+      const wordText = foldForMatch(timings[wordPointer].t.trim()).text;
       if (!wordText) { ranges.push(null); continue; }
 
       let found = false;
       for (let n = nodeIdx; n < textNodes.length; n++) {
-        const text = textNodes[n].textContent || "";
+        const folded = foldForMatch(textNodes[n].textContent || "");
         const start = n === nodeIdx ? searchFrom : 0;
-        const idx = text.indexOf(wordText, start);
+        const idx = folded.text.indexOf(wordText, start);
         if (idx !== -1) {
           const range = document.createRange();
-          range.setStart(textNodes[n], idx);
-          range.setEnd(textNodes[n], idx + wordText.length);
+          range.setStart(textNodes[n], folded.starts[idx]);
+          range.setEnd(textNodes[n], folded.ends[idx + wordText.length - 1]);
           ranges.push(range);
           nodeIdx = n;
           searchFrom = idx + wordText.length;
@@ -0,0 +1,28 @@
+import { describe, it, expect } from "vitest";
+import { decodeCompactTimestamps } from "./wordTimestamps";
+
+// Produced by yapit.word_timestamps.encode_b64 on the gateway side
+const SHORT = "AQMDVGhlA2NhdAN0aGUEAACiAQHEAu4BAuAKZACsAsgB";
+const ZLIB = "EXjaY2bOz0tlLinPZy3JKEpNtWFg+MXIeIPlFyMTiGAAEaNc7FwA/0Fyww==";
+
+describe("decodeCompactTimestamps", () => {
+  it("decodes an uncompressed payload with a shared token table", async () => {
+    expect(await decodeCompactTimestamps(SHORT)).toEqual([
+      { t: "The", s: 0, e: 0.162 },
+      { t: "cat", s: 0.162, e: 0.4 },
+      { t: "the", s: 0.85, e: 0.95 },
+      { t: "The", s: 1, e: 1.2 },
+    ]);
+  });
+
+  it("inflates a zlib payload", async () => {
+    const words = await decodeCompactTimestamps(ZLIB);
+    expect(words).toHaveLength(60);
+    expect(words[1]).toEqual({ t: "two", s: 0.3, e: 0.55 });
+    expect(words[59]).toEqual({ t: "three", s: 17.7, e: 17.95 });
+  });
+
+  it("rejects an unknown format", async () => {
+    await expect(decodeCompactTimestamps(btoa("\x07abc"))).rejects.toThrow();
+  });
+});
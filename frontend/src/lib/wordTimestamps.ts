@@ -0,0 +1,58 @@
+/**
+ * Decoder for compact word timestamps (`word_timestamps_compact` on status messages).
+ *
+ * Mirrors yapit/word_timestamps.py: a header byte (format version, zlib flag), then
+ * a token table and per-word (token index, zigzag start delta ms, duration ms)
+ * varints. Requested with `?timestamps=compact` on the TTS WebSocket.
+ */
+import type { WordTiming } from "./playbackEngine";
+
+const FORMAT_VERSION = 1;
+const FLAG_ZLIB = 0x10;
+const VERSION_MASK = 0x0f;
+
+export async function decodeCompactTimestamps(packed: string): Promise<WordTiming[]> {
+  const data = Uint8Array.from(atob(packed), (c) => c.charCodeAt(0));
+  if (data.length === 0 || (data[0] & VERSION_MASK) !== FORMAT_VERSION) {
+    throw new Error("Unknown word timestamp format");
+  }
+  let body = data.subarray(1);
+  if (data[0] & FLAG_ZLIB) {
+    const stream = new Blob([body]).stream().pipeThrough(new DecompressionStream("deflate"));
+    body = new Uint8Array(await new Response(stream).arrayBuffer());
+  }
+
+  let pos = 0;
+  const readVarint = (): number => {
+    let result = 0;
+    let scale = 1;
+    for (;;) {
+      if (pos >= body.length) throw new Error("Truncated word timestamps");
+      const byte = body[pos++];
+      result += (byte & 0x7f) * scale;
+      if (!(byte & 0x80)) return result;
+      scale *= 128;
+    }
+  };
+
+  const decoder = new TextDecoder();
+  const tokens: string[] = [];
+  const nTokens = readVarint();
+  for (let i = 0; i < nTokens; i++) {
+    const length = readVarint();
+    tokens.push(decoder.decode(body.subarray(pos, pos + length)));
+    pos += length;
+  }
+
+  const words: WordTiming[] = [];
+  const nWords = readVarint();
+  let start = 0;
+  for (let i = 0; i < nWords; i++) {
+    const t = tokens[readVarint()];
+    const delta = readVarint();
+    const duration = readVarint();
+    start += delta % 2 === 0 ? delta / 2 : -(delta + 1) / 2;
+    words.push({ t, s: start / 1000, e: (start + duration) / 1000 });
+  }
+  return words;
+}
@@ -184,7 +184,7 @@ Yapit is a text-to-speech platform with these components:
 - Results feed into Gemini extraction
 
 **Reliability mechanisms:**
-- **Visibility timeout**: If worker takes too long (TTS: 20s, YOLO: 10s), job is requeued
+- **Visibility timeout**: If worker takes too long (TTS: 20s minimum, scaled up with text length; YOLO: 10s), job is requeued. TTS workers heartbeat their lease, so a crashed TTS worker's job is requeued within ~15s
 - **DLQ (Dead Letter Queue)**: Jobs that fail after max retries — indicates systematic failure
 
 **Models:**
@@ -208,9 +208,13 @@ Yapit is a text-to-speech platform with these components:
 ## Event Types in Metrics
 
 **TTS flow:**
-- `synthesis_queued` — job entered queue (has `queue_depth`)
+- `synthesis_queued` — job entered queue (has `queue_depth`); `user_id` = `trending-warmer` marks background warming of trending public docs; `data.canonicalized` = text canonicalization changed the block (compare its hit rate against `cache_hit` with the same flag)
+- `trending_warm` — a public doc is trending (`data.listeners`); `data.queued` blocks were pre-synthesized past the listeners' `data.frontier`
+- `audiobook_export` — a whole-document download started (`data.blocks`, `data.chapters`); its missing blocks went through the queue as `synthesis_queued` beforehand
+- `bulk_synthesis` — a REST pre-render job finished; `data.failed` > 0 means blocks without audio (timeouts behind live traffic, usage limits)
 - `synthesis_complete` — successful synthesis (has `queue_wait_ms`, `worker_latency_ms`, `worker_id`)
 - `synthesis_error` — synthesis failed
+- `synthesis_cancelled` — running job stopped because the user skipped past its block (normal during scrubbing; not billed)
 
 **Detection flow:**
 - `detection_queued`, `detection_complete`, `detection_error`
@@ -218,6 +222,10 @@ Yapit is a text-to-speech platform with these components:
 **Reliability events:**
 - `job_requeued` — visibility timeout fired, job retrying
 - `job_dlq` — job exceeded max retries, moved to dead letter queue (BAD)
+- `stale_result_rejected` — a worker finished a job after its lease had been reclaimed; result discarded (wasted synthesis)
+- `result_stream_pending` — results read but not yet acked by a gateway (`data.pending`, per-consumer in `data.consumers`); `data.reclaimed` > 0 means a gateway died mid-batch and another finalized its results
+- `audio_buffer_usage` — bytes of synthesized audio held in Redis awaiting expiry (`data.bytes` vs `data.max_bytes`)
+- `audio_buffer_overflow` — the Redis audio buffer was full, so audio went straight to SQLite (`data.spilled`, `data.store_ms`)
 
 **Document extraction:**
 - `document_extraction_complete` — emitted for every document extraction (all paths)
@@ -240,10 +248,17 @@ Yapit is a text-to-speech platform with these components:
 - `error` — gateway-side failures caught by exception handlers (e.g., cache write failures, DB errors during result processing). These are NOT pipeline-specific errors — they indicate something broke inside the gateway itself. Check `data.message` for details.
 - `warning` — non-fatal issues worth tracking (e.g., near-failures, degraded behavior)
 - ANY `error` event is a red flag. These represent failures that may silently drop work — e.g., a synthesis result that completed but couldn't be cached, leaving the user with no audio.
-- **`Background task <name> crashed` / `Background task <name> exited unexpectedly`** — a long-lived loop (billing-consumer, result-consumer, cache-persister, tts-visibility, yolo-visibility, batch-poller, cache-lru-flush, cache-maintenance, usage-log-cleanup, guest-cleanup, billing-sync, openai-tts-dispatcher, metrics-writer) is **gone** and is not coming back. Whatever that loop does has stopped silently for the rest of the process lifetime. **P0 — a gateway restart is required to recover.** Identify the loop from the name and report what has stopped (e.g. billing-consumer = nothing is being billed).
+- **`Background task <name> crashed` / `Background task <name> exited unexpectedly`** — a long-lived loop (billing-consumer, result-consumer, cache-persister, tts-visibility, yolo-visibility, batch-poller, cache-lru-flush, cache-maintenance, usage-log-cleanup, guest-cleanup, billing-sync, openai-tts-dispatcher, metrics-writer, loop-lag-monitor, blocking-call-detector) is **gone** and is not coming back. Whatever that loop does has stopped silently for the rest of the process lifetime. **P0 — a gateway restart is required to recover.** Identify the loop from the name and report what has stopped (e.g. billing-consumer = nothing is being billed). Exception: the singleton loops (billing-consumer, cache-persister, tts-visibility, yolo-visibility, batch-poller, cache-maintenance, usage-log-cleanup, guest-cleanup, billing-sync) release their leader lease when they die, so with more than one gateway process another one takes the loop over — check for a `leader_acquired` for the same loop right after. Still a defect to report, but no longer an outage.
+- `leader_acquired` / `leader_lost` (`data.loop`, `data.holder` = host:pid:nonce) — which gateway process runs each singleton loop. One `leader_acquired` per loop per deploy is normal. `leader_lost` means a leader couldn't renew its lease (Redis unreachable or a stalled event loop) and stopped the loop; frequent flapping between holders = look at Redis latency and `event_loop_lag`.
 - **`Billing consumer group missing (Redis reset?), re-creating`** (WARNING, `yapit.gateway.billing_consumer`) — Redis was recreated and the consumer group was rebuilt automatically. One occurrence per Redis restart is expected and self-healing; nothing to do. A *repeating* pattern means Redis is restarting in a loop — investigate that instead.
 - Stuck-loop retries back off exponentially (1s→60s), so a stuck loop produces roughly 1 error/minute. Judge such errors by the span between first and last occurrence — a low count can still be a dead loop.
 
+**Gateway runtime:**
+- `event_loop_lag` — per-minute event-loop lag percentiles
+  - `duration_ms` — p99 lag. Nominal: a few ms. Sustained >100ms means sync work is stalling every WebSocket and consumer at once.
+  - `data.p50_ms`, `data.p95_ms`, `data.max_ms`
+- `event_loop_blocked` — only when the blocking-call detector is enabled; `data.stack` names the call that held the loop
+
 **Billing/Webhooks:**
 - `stripe_webhook` — Stripe webhook processing
   - `duration_ms` — handler latency. Nominal: <1s. Stripe times out at 20s.
@@ -292,6 +307,9 @@ Read the actual error messages and investigate — a count alone is not analysis
 - `detection_error`, `page_extraction_error` — same: read the actual error messages.
 - `job_dlq` — ANY entry means something is systematically broken. Investigate immediately.
 - `job_requeued` — occasional is fine (transient), sustained pattern = worker issues.
+- `stale_result_rejected` — should track `job_requeued` for TTS at most. Many of them = leases expiring under live workers (budget too tight or worker event loop blocked).
+- `result_stream_pending` — a brief nonzero `data.pending` is normal. Pending that stays up across ticks for one consumer = that gateway is stuck finalizing; any `data.reclaimed` = a gateway crashed or restarted mid-batch (users waited up to ~45s for those blocks).
+- `audio_buffer_overflow` — occasional during a burst is fine. Sustained = the 300s TTL times synthesis throughput exceeds the cap; check `data.store_ms` (hot-path latency users feel) and `audio_buffer_usage` near `data.max_bytes`.
 
 **Log file errors (data/logs/*.jsonl):**
 - **Check the time range of gateway.jsonl first** (first and last entry timestamps). The file can span weeks. Start analysis with the last 24-48h — filter by `.record.time.repr > "YYYY-MM-DD"`. Total error counts across the whole file are misleading without date context. Older entries are useful for establishing baselines or investigating trends when something looks suspicious.
@@ -332,7 +350,7 @@ See the BILLING RECONCILIATION section — event counts and character totals are
 
 ### Cache
 
-- Vacuum runs as a background task in the gateway, checking every 24h. It only vacuums if `bloat_ratio` (file_size / data_size) exceeds 2.0x. **No vacuum events = bloat is under threshold = healthy.** This is not a missing cron. SQLite WAL mode with steady insert/delete keeps fragmentation low naturally.
+- Cache files use incremental auto_vacuum: the cache-maintenance loop returns freed pages to the OS a few hundred at a time, and only once nobody has written to the file for 30s, so file size tracks data size without a blocking rewrite. A full VACUUM (`Cache vacuum starting` in logs) only happens for files created before incremental mode, once their `bloat_ratio` (file_size / data_size) exceeds 2.0x — that run also converts the file, so expect it at most once per cache. **No vacuum events = healthy.** A `bloat_ratio` that stays high on a busy cache means it never goes quiet long enough to reclaim — worth a note, not an incident.
 
 ### Cloudflare Edge (see CLOUDFLARE ANALYTICS section)
 - **504 errors**: Check total count, origin response status, and affected hosts/IPs.
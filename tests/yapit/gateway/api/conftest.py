@@ -21,6 +21,7 @@ from yapit.gateway.db import close_db, create_session, get_engine, init_db
 from yapit.gateway.deps import create_cache, create_image_storage
 from yapit.gateway.markdown.transformer import DocumentTransformer
 from yapit.gateway.stack_auth.users import User
+from yapit.gateway.variant_completions import VariantCompletions
 
 DEFAULT_TEST_USER = User(
     id="default-test-user",
@@ -106,6 +107,7 @@ async def _shared_app(_create_schema, _test_settings) -> FastAPI:
         init_db(settings)
         app.state.redis_client = await aioredis.from_url(settings.redis_url, decode_responses=False)
         app.state.audio_cache = create_cache(settings.audio_cache_type, settings.audio_cache_config)
+        app.state.variant_completions = VariantCompletions(app.state.redis_client)
         app.state.document_cache = create_cache(settings.document_cache_type, settings.document_cache_config)
         app.state.extraction_cache = create_cache(settings.extraction_cache_type, settings.extraction_cache_config)
         app.state.image_storage = create_image_storage(settings)
@@ -119,6 +121,7 @@ async def _shared_app(_create_schema, _test_settings) -> FastAPI:
         yield
         for cache in [app.state.audio_cache, app.state.document_cache, app.state.extraction_cache]:
             await cache.close()
+        await app.state.variant_completions.close()
         await app.state.redis_client.aclose()
         await close_db()
 
@@ -0,0 +1,207 @@
+"""Bulk synthesis jobs: planning, progress, and progress over SSE.
+
+A job is refused up front when its uncached blocks exceed the user's usage, skips
+cached blocks, and counts every other block as synthesized or failed. A block
+that raises stops the whole job, and no other block reports after that. An SSE
+subscriber gets the job's state right away, then every saved change, and the
+stream ends with the job.
+"""
+
+import asyncio
+import contextlib
+import json
+import time
+import uuid
+from uuid import UUID
+
+import pytest
+from redis.asyncio import Redis
+
+from yapit.contracts import TTS_AUDIO_CACHE
+from yapit.gateway import bulk_synthesis
+from yapit.gateway.bulk_synthesis import (
+    BulkJob,
+    BulkJobStatus,
+    _run_bulk_job,
+    bulk_job_events,
+    get_bulk_job,
+    save_bulk_job,
+    start_bulk_job,
+)
+from yapit.gateway.domain_models import BlockVariant, Document, TTSModel, Voice
+from yapit.gateway.synthesis import CachedResult, ErrorResult, QueuedResult, SynthesisResult
+
+
+def _job() -> BulkJob:
+    now = time.time()
+    return BulkJob(
+        job_id=str(uuid.uuid4()),
+        user_id="user-1",
+        document_id=uuid.uuid4(),
+        model_slug="kokoro",
+        voice_slug="af_heart",
+        block_start=0,
+        block_end=3,
+        total=3,
+        cached=1,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+@pytest.mark.asyncio
+async def test_events_follow_the_job_until_it_finishes(app):
+    redis: Redis = app.state.redis_client
+    job = _job()
+    await save_bulk_job(redis, job)
+
+    events = bulk_job_events(redis, job.job_id)
+    first = await anext(events)
+
+    job.synthesized = 1
+    await save_bulk_job(redis, job)
+    second = await asyncio.wait_for(anext(events), 5)
+
+    job.synthesized, job.status = 2, BulkJobStatus.DONE
+    await save_bulk_job(redis, job)
+    third = await asyncio.wait_for(anext(events), 5)
+
+    states = [json.loads(event.removeprefix("data: ")) for event in (first, second, third)]
+    assert [(s["cached"] + s["synthesized"], s["status"]) for s in states] == [
+        (1, "running"),
+        (2, "running"),
+        (3, "done"),
+    ]
+    with pytest.raises(StopAsyncIteration):
+        await anext(events)
+    assert (await get_bulk_job(redis, job.job_id)) == job
+
+
+@pytest.mark.asyncio
+async def test_events_for_unknown_job_end_at_once(app):
+    assert [event async for event in bulk_job_events(app.state.redis_client, "missing")] == []
+
+
+async def _document(client, session) -> Document:
+    r = await client.post(
+        "/v1/documents/text", json={"content": "First paragraph.\n\nSecond paragraph.\n\nThird paragraph."}
+    )
+    doc = await session.get(Document, UUID(r.json()["id"]))
+    assert len(doc.audio_texts) == 3
+    return doc
+
+
+async def _model_and_voice(session) -> tuple[TTSModel, Voice]:
+    model = TTSModel(slug="kokoro-bulk", name="Kokoro Bulk", description="")
+    voice = Voice(slug="bulk-voice", name="Bulk Voice", lang="en-us", description="", model=model)
+    session.add(model)
+    session.add(voice)
+    await session.commit()
+    return model, voice
+
+
+@pytest.mark.asyncio
+async def test_create_job_402_when_uncached_blocks_exceed_usage(client, as_test_user, session):
+    doc = await _document(client, session)
+    await _model_and_voice(session)
+
+    r = await client.post(
+        "/v1/synthesis-jobs", json={"document_id": str(doc.id), "model": "kokoro-bulk", "voice": "bulk-voice"}
+    )
+
+    assert r.status_code == 402
+
+
+@pytest.mark.asyncio
+async def test_job_skips_cached_blocks_and_counts_progress(client, app, as_test_user, session, monkeypatch):
+    redis: Redis = app.state.redis_client
+    doc = await _document(client, session)
+    model, voice = await _model_and_voice(session)
+    first, second, _ = (
+        BlockVariant.get_hash(text, model.slug, voice.slug, voice.parameters) for text in doc.audio_texts
+    )
+    await redis.set(TTS_AUDIO_CACHE.format(hash=first), b"audio")
+
+    requested: list[int] = []
+
+    async def request_synthesis(*, block_idx, **kwargs) -> SynthesisResult:
+        requested.append(block_idx)
+        return QueuedResult(variant_hash=second) if block_idx == 1 else ErrorResult(error="Usage limit exceeded")
+
+    async def wait_for_variant(redis, cache, completions, variant_hash, timeout_seconds) -> SynthesisResult:
+        return CachedResult(variant_hash=variant_hash)
+
+    monkeypatch.setattr(bulk_synthesis, "request_synthesis", request_synthesis)
+    monkeypatch.setattr(bulk_synthesis, "wait_for_variant", wait_for_variant)
+
+    job = await start_bulk_job(
+        session,
+        redis,
+        app.state.audio_cache,
+        app.state.variant_completions,
+        as_test_user.id,
+        doc,
+        model,
+        voice,
+        range(3),
+        billing_enabled=False,
+    )
+    assert (job.total, job.cached, job.status) == (3, 1, BulkJobStatus.RUNNING)
+    await asyncio.gather(*bulk_synthesis._background_tasks)
+
+    job = await get_bulk_job(redis, job.job_id)
+    assert sorted(requested) == [1, 2]
+    assert (job.cached, job.synthesized, job.failed, job.done) == (1, 1, 1, 3)
+    assert (job.status, job.error) == (BulkJobStatus.DONE, "Usage limit exceeded")
+
+
+@pytest.mark.asyncio
+async def test_block_that_raises_stops_the_job(app, monkeypatch):
+    redis: Redis = app.state.redis_client
+    job = _job()
+    await save_bulk_job(redis, job)
+    waiting = asyncio.Event()
+    cancelled: list[int] = []
+
+    @contextlib.asynccontextmanager
+    async def create_session():
+        yield None
+
+    async def request_synthesis(*, block_idx, **kwargs) -> SynthesisResult:
+        if block_idx == 2:
+            await waiting.wait()  # the other block is already waiting for its audio
+            raise RuntimeError("Redis went away")
+        return QueuedResult(variant_hash=f"hash-{block_idx}")
+
+    async def wait_for_variant(redis, cache, completions, variant_hash, timeout_seconds) -> SynthesisResult:
+        waiting.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(int(variant_hash.removeprefix("hash-")))
+            raise
+        raise AssertionError("unreachable")
+
+    monkeypatch.setattr(bulk_synthesis, "create_session", create_session)
+    monkeypatch.setattr(bulk_synthesis, "request_synthesis", request_synthesis)
+    monkeypatch.setattr(bulk_synthesis, "wait_for_variant", wait_for_variant)
+    model = TTSModel(slug="kokoro", name="Kokoro", description="")
+    voice = Voice(slug="af_heart", name="Heart", lang="en-us", description="", model=model)
+
+    await asyncio.wait_for(
+        _run_bulk_job(
+            redis,
+            app.state.audio_cache,
+            app.state.variant_completions,
+            job,
+            model,
+            voice,
+            [(1, "First."), (2, "Second.")],
+            billing_enabled=False,
+        ),
+        5,
+    )
+
+    assert cancelled == [1]
+    saved = await get_bulk_job(redis, job.job_id)
+    assert (saved.status, saved.synthesized, saved.failed) == (BulkJobStatus.FAILED, 0, 0)
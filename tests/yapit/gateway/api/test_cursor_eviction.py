@@ -0,0 +1,204 @@
+"""Tests for the single-script cursor eviction (Redis).
+
+Every pending block is evicted in one call: queued jobs leave the queue and free
+their inflight key, jobs a worker already pulled are marked for cancellation.
+A prefetch session keeps the blocks inside its window, and asks again for window
+blocks whose job ended without audio. A block requested again before its running
+job stops takes the cancellation mark back.
+"""
+
+import asyncio
+import json
+import threading
+import uuid
+
+import pytest
+from redis.asyncio import Redis
+
+from yapit import synth
+from yapit.contracts import (
+    TTS_CANCEL,
+    TTS_INFLIGHT,
+    TTS_JOB_INDEX,
+    TTS_JOBS,
+    TTS_PENDING,
+    TTS_SUBSCRIBERS,
+    SynthesisJob,
+    SynthesisParameters,
+    get_queue_name,
+)
+from yapit.gateway.api.v1.ws import (
+    WSBlockStatus,
+    WSCursorMoved,
+    WSPrefetchRequest,
+    _evict_pending,
+    _handle_cursor_moved,
+    _prefetch_window,
+    _PrefetchSession,
+)
+from yapit.gateway.constants import estimate_duration_ms
+from yapit.gateway.domain_models import BlockVariant, TTSModel, Voice
+from yapit.gateway.synthesis import _queue_job
+from yapit.queue import QueueConfig, pull_job, push_job
+
+QUEUE = get_queue_name("kokoro")
+CONFIG = QueueConfig(queue_name=QUEUE, jobs_key=TTS_JOBS, job_index_key=TTS_JOB_INDEX)
+
+
+class _StubWebSocket:
+    def __init__(self):
+        self.sent: list[dict] = []
+
+    async def send_text(self, data: str) -> None:
+        self.sent.append(json.loads(data))
+
+
+async def _queue_block(redis: Redis, user_id: str, document_id: uuid.UUID, block_idx: int) -> tuple[str, str]:
+    job_id, variant_hash = str(uuid.uuid4()), f"hash-{block_idx}"
+    await redis.set(TTS_INFLIGHT.format(hash=variant_hash), job_id)
+    await redis.sadd(TTS_PENDING.format(user_id=user_id, document_id=document_id), block_idx)
+    await push_job(
+        redis, CONFIG, job_id, b"{}", index_key=f"{user_id}:{document_id}:{block_idx}", variant_hash=variant_hash
+    )
+    return job_id, variant_hash
+
+
+@pytest.mark.asyncio
+async def test_queued_and_running_jobs_evicted(app, test_user):
+    redis: Redis = app.state.redis_client
+    document_id = uuid.uuid4()
+    running_id, running_hash = await _queue_block(redis, test_user.id, document_id, 0)
+    assert (await pull_job(redis, CONFIG, timeout=1)).job_id == running_id
+    queued_id, queued_hash = await _queue_block(redis, test_user.id, document_id, 1)
+    ws = _StubWebSocket()
+
+    await _handle_cursor_moved(ws, WSCursorMoved(document_id=document_id, cursor=10), test_user, redis)
+
+    assert sorted(ws.sent[0]["block_indices"]) == [0, 1]
+    assert await redis.zcard(QUEUE) == 0
+    assert await redis.hget(TTS_JOBS, queued_id) is None
+    assert await redis.get(TTS_INFLIGHT.format(hash=queued_hash)) is None
+    # The running job keeps its inflight key until the worker reports back
+    assert await redis.get(TTS_INFLIGHT.format(hash=running_hash)) == running_id.encode()
+    assert await redis.smembers(TTS_CANCEL.format(job_id=running_id)) == {f"{test_user.id}:{document_id}:0".encode()}
+    assert await redis.hlen(TTS_JOB_INDEX) == 0
+    assert not await redis.exists(TTS_PENDING.format(user_id=test_user.id, document_id=document_id))
+
+
+@pytest.mark.asyncio
+async def test_inflight_owned_by_other_job_kept(app, test_user):
+    redis: Redis = app.state.redis_client
+    document_id = uuid.uuid4()
+    _, variant_hash = await _queue_block(redis, test_user.id, document_id, 0)
+    await redis.set(TTS_INFLIGHT.format(hash=variant_hash), "someone-else")
+
+    await _handle_cursor_moved(_StubWebSocket(), WSCursorMoved(document_id=document_id, cursor=5), test_user, redis)
+
+    assert await redis.get(TTS_INFLIGHT.format(hash=variant_hash)) == b"someone-else"
+
+
+@pytest.mark.asyncio
+async def test_legacy_index_entry_treated_as_running(app, test_user):
+    redis: Redis = app.state.redis_client
+    document_id = uuid.uuid4()
+    await redis.sadd(TTS_PENDING.format(user_id=test_user.id, document_id=document_id), 2)
+    await redis.hset(TTS_JOB_INDEX, f"{test_user.id}:{document_id}:2", "legacy-job")
+
+    await _handle_cursor_moved(_StubWebSocket(), WSCursorMoved(document_id=document_id, cursor=5), test_user, redis)
+
+    assert await redis.scard(TTS_CANCEL.format(job_id="legacy-job")) == 1
+
+
+@pytest.mark.asyncio
+async def test_block_requested_again_keeps_its_running_job(app, test_user, monkeypatch):
+    redis: Redis = app.state.redis_client
+    monkeypatch.setattr(synth, "CANCEL_POLL_INTERVAL_S", 0.01)
+    document_id = uuid.uuid4()
+    running_id, running_hash = await _queue_block(redis, test_user.id, document_id, 0)
+    assert (await pull_job(redis, CONFIG, timeout=1)).job_id == running_id
+    entry = f"{test_user.id}:{document_id}:0"
+    await redis.sadd(TTS_SUBSCRIBERS.format(hash=running_hash), entry)
+    await _handle_cursor_moved(_StubWebSocket(), WSCursorMoved(document_id=document_id, cursor=10), test_user, redis)
+    assert await redis.sismember(TTS_CANCEL.format(job_id=running_id), entry)
+
+    await _queue_job(
+        db=None,
+        redis=redis,
+        user_id=test_user.id,
+        text="Hello.",
+        model=TTSModel(id=1, slug="kokoro", name="Kokoro"),
+        voice=Voice(id=1, model_id=1, slug="af_heart", name="Heart", lang="en"),
+        variant_hash=running_hash,
+        variant=BlockVariant(hash=running_hash, model_id=1, voice_id=1),
+        document_id=document_id,
+        block_idx=0,
+        track_for_websocket=True,
+        background=False,
+        canonicalized=False,
+    )
+
+    assert not await redis.exists(TTS_CANCEL.format(job_id=running_id))
+    job = SynthesisJob(
+        job_id=uuid.UUID(running_id),
+        variant_hash=running_hash,
+        user_id=test_user.id,
+        document_id=document_id,
+        block_idx=0,
+        model_slug="kokoro",
+        voice_slug="af_heart",
+        usage_multiplier=1.0,
+        synthesis_parameters=SynthesisParameters(model="kokoro", voice="af_heart", text="Hello."),
+    )
+    cancel = threading.Event()
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(synth._watch_for_cancel(redis, job, cancel), 0.2)
+    assert not cancel.is_set()
+
+
+@pytest.mark.asyncio
+async def test_nothing_pending_sends_nothing(app, test_user):
+    ws = _StubWebSocket()
+    await _handle_cursor_moved(ws, WSCursorMoved(document_id=uuid.uuid4(), cursor=0), test_user, app.state.redis_client)
+    assert ws.sent == []
+
+
+@pytest.mark.asyncio
+async def test_prefetch_window_kept(app, test_user):
+    redis: Redis = app.state.redis_client
+    document_id = uuid.uuid4()
+    for idx in range(4):
+        await _queue_block(redis, test_user.id, document_id, idx)
+    ws = _StubWebSocket()
+
+    await _evict_pending(ws, test_user, redis, document_id, keep=range(1, 3))
+
+    assert sorted(ws.sent[0]["block_indices"]) == [0, 3]
+    assert await redis.zcard(QUEUE) == 2
+    assert await redis.smembers(TTS_PENDING.format(user_id=test_user.id, document_id=document_id)) == {b"1", b"2"}
+
+
+def test_prefetch_window_uses_actual_durations():
+    texts = ["x" * 100] * 6
+    estimated_ms = estimate_duration_ms(100)
+    # Two synthesized blocks of 4s cover an 8s buffer on their own
+    assert _prefetch_window(texts, [4000, 4000, None, None], 2, 8) == range(2, 4)
+    # Unsynthesized blocks count with the length estimate
+    assert _prefetch_window(texts, [None] * 4, 2, estimated_ms * 2.5 / 1000) == range(2, 5)
+    # The window never reaches past the candidates
+    assert _prefetch_window(texts, [1000, 1000], 4, 60) == range(4, 6)
+
+
+def test_prefetch_forgets_blocks_that_ended_without_audio():
+    document_id = uuid.uuid4()
+    request = WSPrefetchRequest(document_id=document_id, model="kokoro", voice="af_heart", cursor=0, buffer_seconds=60)
+    session = _PrefetchSession(request, requested={0, 1, 2, 3})
+
+    def published(block_idx: int, status: str, doc_id: uuid.UUID = document_id) -> bytes:
+        return WSBlockStatus(document_id=doc_id, block_idx=block_idx, status=status).model_dump_json().encode()
+
+    session.forget_unfinished(published(0, "cached"))
+    session.forget_unfinished(published(1, "error"))
+    session.forget_unfinished(published(2, "cancelled"))
+    session.forget_unfinished(published(3, "skipped", doc_id=uuid.uuid4()))
+
+    assert session.requested == {0, 3}
@@ -5,7 +5,9 @@ from unittest.mock import patch
 
 import pytest
 
+from yapit.contracts import TTS_AUDIO_CACHE
 from yapit.gateway.api.v1.documents import (
+    AudioManifest,
     DocumentCreateResponse,
     DocumentPrepareResponse,
     ExtractionAcceptedResponse,
@@ -15,6 +17,7 @@ from yapit.gateway.api.v1.documents import (
 )
 from yapit.gateway.auth import authenticate_optional
 from yapit.gateway.document.types import ProcessorConfig
+from yapit.gateway.domain_models import BlockVariant, TTSModel, Voice
 
 FIXTURES_DIR = Path("tests/fixtures/documents")
 
@@ -416,3 +419,37 @@ async def test_owner_sees_full_document(client, as_test_user):
     assert r.json()["last_block_idx"] == 3
     # Consumers derive a local calendar date from this, so the offset has to be on the wire.
     assert datetime.fromisoformat(r.json()["created"]).tzinfo is not None
+
+
+@pytest.mark.asyncio
+async def test_audio_manifest(client, app, as_test_user, session):
+    """Blocks report cache status and actual duration once synthesized, estimates before."""
+    model = TTSModel(slug="manifest-model", name="Manifest Model", description="")
+    voice = Voice(slug="manifest-voice", name="Manifest Voice", lang="en-us", description="", model=model)
+    session.add(model)
+    session.add(voice)
+    await session.commit()
+    r = await client.post("/v1/documents/text", json={"content": "A single short sentence."})
+    doc_id = r.json()["id"]
+    url = f"/v1/documents/{doc_id}/audio-manifest?model=manifest-model&voice=manifest-voice"
+
+    manifest = AudioManifest.model_validate((await client.get(url)).json())
+    block = manifest.blocks[0]
+    assert (manifest.cached_blocks, block.cached, block.audio_url, block.duration_estimated) == (0, False, None, True)
+
+    session.add(BlockVariant(hash=block.variant_hash, model_id=model.id, voice_id=voice.id, duration_ms=1234))
+    await session.commit()
+    await app.state.redis_client.set(TTS_AUDIO_CACHE.format(hash=block.variant_hash), b"audio")
+
+    manifest = AudioManifest.model_validate((await client.get(url)).json())
+    block = manifest.blocks[0]
+    assert (manifest.cached_blocks, manifest.total_duration_ms) == (1, 1234)
+    assert block.audio_url == f"/v1/audio/{block.variant_hash}"
+    assert (block.duration_ms, block.duration_estimated) == (1234, False)
+
+
+@pytest.mark.asyncio
+async def test_audio_manifest_unknown_voice_404(client, as_test_user):
+    r = await client.post("/v1/documents/text", json={"content": "Some content"})
+    r = await client.get(f"/v1/documents/{r.json()['id']}/audio-manifest?model=nope&voice=nope")
+    assert r.status_code == 404
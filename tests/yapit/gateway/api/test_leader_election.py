@@ -0,0 +1,95 @@
+"""Tests for lease-based leader election of singleton loops (Redis).
+
+Exactly one candidate runs the loop; a leader that stops or loses its lease hands
+over, and a crash still surfaces to `supervised` instead of being retried.
+"""
+
+import asyncio
+
+import pytest
+from redis.asyncio import Redis
+
+from yapit.contracts import LEADER_LEASE
+from yapit.gateway.supervision import run_as_leader
+
+LEASE_S = 0.5
+RENEW_S = 0.05
+
+
+def _counting_loop(running: list[str], label: str):
+    async def loop() -> None:
+        running.append(label)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            running.remove(label)
+
+    return loop
+
+
+def _candidate(redis: Redis, running: list[str], label: str) -> asyncio.Task:
+    return asyncio.create_task(
+        run_as_leader(redis, "test-loop", _counting_loop(running, label), lease_s=LEASE_S, renew_interval_s=RENEW_S)
+    )
+
+
+async def _stop(*tasks: asyncio.Task) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_only_one_candidate_runs_the_loop(app):
+    redis: Redis = app.state.redis_client
+    running: list[str] = []
+    candidates = [_candidate(redis, running, label) for label in ("a", "b", "c")]
+
+    await asyncio.sleep(LEASE_S * 3)  # several renewals
+    assert len(running) == 1
+
+    await _stop(*candidates)
+
+
+@pytest.mark.asyncio
+async def test_stopped_leader_hands_over(app):
+    redis: Redis = app.state.redis_client
+    running: list[str] = []
+    first = _candidate(redis, running, "a")
+    await asyncio.sleep(RENEW_S * 2)
+    second = _candidate(redis, running, "b")
+    await asyncio.sleep(RENEW_S * 2)
+
+    await _stop(first)
+    await asyncio.sleep(RENEW_S * 3)  # released lease: no need to wait for expiry
+
+    assert running == ["b"]
+    await _stop(second)
+
+
+@pytest.mark.asyncio
+async def test_leader_steps_down_when_lease_taken_over(app):
+    redis: Redis = app.state.redis_client
+    running: list[str] = []
+    candidate = _candidate(redis, running, "a")
+    await asyncio.sleep(RENEW_S * 2)
+    assert running == ["a"]
+
+    await redis.set(LEADER_LEASE.format(name="test-loop"), "someone-else", px=60_000)
+    await asyncio.sleep(RENEW_S * 3)
+
+    assert running == []
+    await _stop(candidate)
+
+
+@pytest.mark.asyncio
+async def test_crash_propagates_and_releases_lease(app):
+    redis: Redis = app.state.redis_client
+
+    async def crashing_loop() -> None:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await run_as_leader(redis, "test-loop", crashing_loop, lease_s=LEASE_S, renew_interval_s=RENEW_S)
+
+    assert not await redis.exists(LEADER_LEASE.format(name="test-loop"))
@@ -0,0 +1,223 @@
+"""Tests for batched result finalization from the results stream (Redis).
+
+A batch is finalized exactly once per variant: audio buffered, every subscriber
+notified, one billing event and one persist entry per successful synthesis. A
+result is acked only with its effects, so one stranded by a dead gateway is
+finalized by whoever reclaims it. Audio that doesn't fit under the buffer cap
+goes straight to SQLite instead of Redis. Each finalized variant wakes whoever
+waits on it.
+"""
+
+import asyncio
+import base64
+import uuid
+
+import pytest
+from redis.asyncio import Redis
+
+from yapit.contracts import (
+    TTS_AUDIO_BUFFER,
+    TTS_AUDIO_BUFFER_BYTES,
+    TTS_AUDIO_CACHE,
+    TTS_AUDIO_META,
+    TTS_BILLING_STREAM,
+    TTS_INFLIGHT,
+    TTS_PENDING,
+    TTS_PERSIST,
+    TTS_RESULT_CLAIM,
+    TTS_RESULTS,
+    TTS_RESULTS_GROUP,
+    TTS_RESULTS_LEGACY,
+    TTS_STATUS_LOG,
+    TTS_SUBSCRIBERS,
+    AudioMeta,
+    WorkerResult,
+)
+from yapit.gateway import result_consumer
+from yapit.gateway.result_consumer import (
+    MAX_BATCH,
+    _claim_results,
+    _collect_batch,
+    _ensure_consumer_group,
+    _process_batch,
+    _recover,
+)
+from yapit.gateway.variant_completions import VariantCompletions
+from yapit.queue import push_result
+
+DOCUMENT_ID = uuid.uuid4()
+
+
+def _result(variant_hash: str, block_idx: int, **overrides) -> WorkerResult:
+    fields = {
+        "job_id": uuid.uuid4(),
+        "variant_hash": variant_hash,
+        "user_id": "user-1",
+        "document_id": DOCUMENT_ID,
+        "block_idx": block_idx,
+        "model_slug": "kokoro",
+        "voice_slug": "af_heart",
+        "text_length": 6,
+        "usage_multiplier": 1.0,
+        "worker_id": "worker-1",
+        "processing_time_ms": 100,
+        "queue_wait_ms": 10,
+        "audio_base64": base64.b64encode(b"audio").decode(),
+        "duration_ms": 500,
+    }
+    return WorkerResult(**(fields | overrides))
+
+
+async def _deliver(redis: Redis, *results: WorkerResult) -> list[tuple[bytes, WorkerResult]]:
+    await _ensure_consumer_group(redis)
+    for result in results:
+        await push_result(redis, TTS_RESULTS, result.model_dump_json())
+    return await _collect_batch(redis, "gateway-a")
+
+
+async def _subscribe(redis: Redis, result: WorkerResult) -> None:
+    await redis.set(TTS_INFLIGHT.format(hash=result.variant_hash), str(result.job_id))
+    await redis.sadd(TTS_SUBSCRIBERS.format(hash=result.variant_hash), f"user-1:{DOCUMENT_ID}:{result.block_idx}")
+    await redis.sadd(TTS_PENDING.format(user_id="user-1", document_id=DOCUMENT_ID), result.block_idx)
+
+
+@pytest.mark.asyncio
+async def test_batch_finalized(app):
+    redis: Redis = app.state.redis_client
+    ok, failed = _result("hash-ok", 0), _result("hash-err", 1, audio_base64=None, error="boom")
+    for result in (ok, failed):
+        await _subscribe(redis, result)
+
+    await _process_batch(redis, app.state.audio_cache, await _deliver(redis, ok, failed))
+
+    assert await redis.get(TTS_AUDIO_CACHE.format(hash="hash-ok")) == b"audio"
+    assert await redis.get(TTS_AUDIO_CACHE.format(hash="hash-err")) is None
+    meta = AudioMeta.from_cache(await redis.get(TTS_AUDIO_META.format(hash="hash-ok")))
+    assert meta.duration_ms == 500
+    assert await redis.lrange(TTS_PERSIST, 0, -1) == [b"hash-ok|1.0"]
+    assert await redis.xlen(TTS_BILLING_STREAM) == 1
+    assert await redis.scard(TTS_PENDING.format(user_id="user-1", document_id=DOCUMENT_ID)) == 0
+    # Both statuses are kept for a connection resuming after a drop
+    assert await redis.xlen(TTS_STATUS_LOG.format(user_id="user-1", document_id=DOCUMENT_ID)) == 2
+    for variant_hash in ("hash-ok", "hash-err"):
+        assert not await redis.exists(TTS_INFLIGHT.format(hash=variant_hash))
+        assert not await redis.exists(TTS_SUBSCRIBERS.format(hash=variant_hash))
+    assert await redis.xlen(TTS_RESULTS) == 0
+    assert (await redis.xpending(TTS_RESULTS, TTS_RESULTS_GROUP))["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_duplicate_in_batch_finalized_once(app):
+    redis: Redis = app.state.redis_client
+    first = _result("hash-1", 0)
+    await _subscribe(redis, first)
+
+    await _process_batch(
+        redis, app.state.audio_cache, await _deliver(redis, first, first.model_copy(update={"worker_id": "worker-2"}))
+    )
+
+    assert await redis.llen(TTS_PERSIST) == 1
+    assert await redis.xlen(TTS_BILLING_STREAM) == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_result_not_billed(app):
+    redis: Redis = app.state.redis_client
+    result = _result("hash-1", 0, audio_base64=None, cancelled=True)
+    await _subscribe(redis, result)
+
+    await _process_batch(redis, app.state.audio_cache, await _deliver(redis, result))
+
+    assert not await redis.exists(TTS_INFLIGHT.format(hash="hash-1"))
+    assert await redis.xlen(TTS_BILLING_STREAM) == 0
+
+
+@pytest.mark.asyncio
+async def test_collect_reads_up_to_max_batch(app):
+    redis: Redis = app.state.redis_client
+    await _ensure_consumer_group(redis)
+    for i in range(MAX_BATCH + 5):
+        await push_result(redis, TTS_RESULTS, _result(f"hash-{i}", i).model_dump_json())
+    await push_result(redis, TTS_RESULTS, "not json")
+
+    first = await _collect_batch(redis, "gateway-a")
+    second = await _collect_batch(redis, "gateway-a")
+
+    assert [r.block_idx for _, r in first] == list(range(MAX_BATCH))
+    assert [r.block_idx for _, r in second] == list(range(MAX_BATCH, MAX_BATCH + 5))
+    assert await redis.xlen(TTS_RESULTS) == MAX_BATCH + 5  # poison entry acked and deleted
+
+
+@pytest.mark.asyncio
+async def test_result_stranded_mid_batch_finalized_by_other_gateway(app, monkeypatch):
+    redis: Redis = app.state.redis_client
+    monkeypatch.setattr(result_consumer, "CLAIM_MIN_IDLE_MS", 0)
+    result = _result("hash-1", 0)
+    await _subscribe(redis, result)
+    # gateway-a claims the result, then dies before its finalization transaction
+    batch = await _deliver(redis, result)
+    await _claim_results(redis, batch)
+
+    await _recover(redis, app.state.audio_cache, "gateway-b")
+
+    assert await redis.get(TTS_AUDIO_CACHE.format(hash="hash-1")) == b"audio"
+    assert await redis.scard(TTS_PENDING.format(user_id="user-1", document_id=DOCUMENT_ID)) == 0
+    assert await redis.xlen(TTS_BILLING_STREAM) == 1
+    assert not await redis.exists(TTS_RESULT_CLAIM.format(job_id=result.job_id))
+    assert await redis.xlen(TTS_RESULTS) == 0
+
+
+@pytest.mark.asyncio
+async def test_legacy_list_results_forwarded(app):
+    redis: Redis = app.state.redis_client
+    await redis.lpush(TTS_RESULTS_LEGACY, _result("hash-1", 0).model_dump_json())
+
+    await _recover(redis, app.state.audio_cache, "gateway-a")
+
+    assert await redis.llen(TTS_RESULTS_LEGACY) == 0
+    assert [r.variant_hash for _, r in await _collect_batch(redis, "gateway-a")] == ["hash-1"]
+
+
+@pytest.mark.asyncio
+async def test_full_audio_buffer_spills_to_sqlite(app, monkeypatch):
+    redis: Redis = app.state.redis_client
+    cache = app.state.audio_cache
+    first, second, third = _result("hash-1", 0), _result("hash-2", 1), _result("hash-3", 2)
+    for result in (first, second, third):
+        await _subscribe(redis, result)
+    await _process_batch(redis, cache, await _deliver(redis, first))
+    entry_bytes = int(await redis.get(TTS_AUDIO_BUFFER_BYTES))
+    monkeypatch.setattr(result_consumer, "AUDIO_BUFFER_MAX_BYTES", entry_bytes)
+
+    await _process_batch(redis, cache, await _deliver(redis, second))
+
+    assert await redis.get(TTS_AUDIO_CACHE.format(hash="hash-2")) is None
+    assert await cache.retrieve_data("hash-2") == b"audio"
+    assert AudioMeta.from_cache(await cache.retrieve_meta("hash-2")).duration_ms == 500
+    assert await redis.lrange(TTS_PERSIST, 0, -1) == [b"hash-1|1.0"]
+    assert await redis.scard(TTS_PENDING.format(user_id="user-1", document_id=DOCUMENT_ID)) == 1
+    assert await redis.xlen(TTS_BILLING_STREAM) == 2
+
+    # Once hash-1's keys expire its bytes are released
+    await redis.zadd(TTS_AUDIO_BUFFER, {"hash-1": 0})
+    await _process_batch(redis, cache, await _deliver(redis, third))
+
+    assert await redis.get(TTS_AUDIO_CACHE.format(hash="hash-3")) == b"audio"
+    assert int(await redis.get(TTS_AUDIO_BUFFER_BYTES)) == entry_bytes
+
+
+@pytest.mark.asyncio
+async def test_finalized_status_wakes_waiters(app):
+    redis: Redis = app.state.redis_client
+    ok, failed = _result("hash-ok", 0), _result("hash-err", 1, audio_base64=None, error="boom")
+    for result in (ok, failed):
+        await _subscribe(redis, result)
+    completions = VariantCompletions(redis)
+    try:
+        async with completions.watch("hash-ok") as ok_done, completions.watch("hash-err") as err_done:
+            await _process_batch(redis, app.state.audio_cache, await _deliver(redis, ok, failed))
+
+            assert await asyncio.wait_for(ok_done, 2) == "cached"
+            assert await asyncio.wait_for(err_done, 2) == "error"
+    finally:
+        await completions.close()
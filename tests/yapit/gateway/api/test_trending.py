@@ -0,0 +1,97 @@
+"""Tests for trending-document tracking (Redis).
+
+A listener counts once per document and voice per half-life, the frontier only
+moves forward, and scores decay with time until a document is forgotten. A background job keeps its
+inflight key for as long as it may wait in the queue.
+"""
+
+import time
+import uuid
+
+import pytest
+from redis.asyncio import Redis
+
+from yapit.contracts import (
+    TTS_INFLIGHT,
+    TTS_TRENDING,
+    TTS_TRENDING_DECAYED_AT,
+    TTS_TRENDING_FRONTIER,
+    get_queue_name,
+)
+from yapit.gateway.domain_models import BlockVariant, TTSModel, Voice
+from yapit.gateway.synthesis import BACKGROUND_QUEUE_OFFSET_S, INFLIGHT_TTL_S, _queue_job
+from yapit.gateway.trending import TRENDING_HALF_LIFE_S, record_listen, trending_member, warm_trending
+
+DOCUMENT_ID = uuid.uuid4()
+MEMBER = trending_member(DOCUMENT_ID, "kokoro", "af_heart")
+
+
+@pytest.mark.asyncio
+async def test_listeners_counted_once_frontier_moves_forward(app):
+    redis: Redis = app.state.redis_client
+
+    await record_listen(redis, "user-1", DOCUMENT_ID, "kokoro", "af_heart", 5)
+    await record_listen(redis, "user-1", DOCUMENT_ID, "kokoro", "af_heart", 12)
+    await record_listen(redis, "user-2", DOCUMENT_ID, "kokoro", "af_heart", 3)
+    await record_listen(redis, "user-2", DOCUMENT_ID, "kokoro", "am_adam", 0)
+
+    assert await redis.zscore(TTS_TRENDING, MEMBER) == 2
+    assert await redis.hget(TTS_TRENDING_FRONTIER, MEMBER) == b"12"
+
+
+@pytest.mark.asyncio
+async def test_scores_decay_and_faded_documents_are_forgotten(app):
+    redis: Redis = app.state.redis_client
+    faded = trending_member(uuid.uuid4(), "kokoro", "af_heart")
+    await redis.zadd(TTS_TRENDING, {MEMBER: 4, faded: 0.15})
+    await redis.hset(TTS_TRENDING_FRONTIER, faded, 7)
+    await redis.set(TTS_TRENDING_DECAYED_AT, time.time() - TRENDING_HALF_LIFE_S)
+
+    await warm_trending(redis, app.state.audio_cache)
+
+    assert await redis.zscore(TTS_TRENDING, MEMBER) == pytest.approx(2, rel=0.01)
+    assert await redis.zscore(TTS_TRENDING, faded) is None
+    assert await redis.hget(TTS_TRENDING_FRONTIER, faded) is None
+
+
+@pytest.mark.asyncio
+async def test_background_job_keeps_its_inflight_key_while_queued(app):
+    redis: Redis = app.state.redis_client
+    model = TTSModel(id=1, slug="kokoro", name="Kokoro")
+    voice = Voice(id=1, model_id=1, slug="af_heart", name="Heart", lang="en")
+    variant = BlockVariant(hash="hash-bg", model_id=1, voice_id=1)
+    inflight_key = TTS_INFLIGHT.format(hash=variant.hash)
+    queue = get_queue_name("kokoro")
+
+    async def request(background: bool) -> None:
+        await _queue_job(
+            db=None,
+            redis=redis,
+            user_id="user-1",
+            text="Warm me.",
+            model=model,
+            voice=voice,
+            variant_hash=variant.hash,
+            variant=variant,
+            document_id=DOCUMENT_ID,
+            block_idx=0,
+            track_for_websocket=False,
+            background=background,
+            canonicalized=False,
+        )
+
+    await request(background=True)
+    [(job_id, score)] = await redis.zrange(queue, 0, -1, withscores=True)
+    # Still owned past the live TTL, as long as the job may wait behind live traffic
+    assert await redis.ttl(inflight_key) > BACKGROUND_QUEUE_OFFSET_S
+
+    # Asked for again after INFLIGHT_TTL_S (next trending tick, bulk re-run): no second job
+    await request(background=True)
+    assert await redis.zcard(queue) == 1
+
+    # A live request moves the job up, and its key back to the live TTL
+    await request(background=False)
+    [(promoted_id, promoted_score)] = await redis.zrange(queue, 0, -1, withscores=True)
+    assert promoted_id == job_id
+    assert promoted_score < score - BACKGROUND_QUEUE_OFFSET_S / 2
+    assert 0 < await redis.ttl(inflight_key) <= INFLIGHT_TTL_S
@@ -0,0 +1,74 @@
+"""Tests for variant completion notifications (Redis).
+
+Every waiter on a variant wakes with the status the result consumer publishes,
+through a single subscription per variant that lasts exactly as long as someone
+is waiting. A status only wakes those already waiting when it's published.
+"""
+
+import asyncio
+
+import pytest
+from redis.asyncio import Redis
+
+from yapit.contracts import TTS_VARIANT_DONE
+from yapit.gateway.variant_completions import VariantCompletions
+
+CHANNEL = TTS_VARIANT_DONE.format(hash="hash-1")
+
+
+async def _subscriber_count(redis: Redis) -> int:
+    return dict(await redis.pubsub_numsub(CHANNEL)).get(CHANNEL.encode(), 0)
+
+
+@pytest.mark.asyncio
+async def test_waiters_share_one_subscription(app):
+    redis: Redis = app.state.redis_client
+    completions = VariantCompletions(redis)
+    try:
+        async with completions.watch("hash-1") as first, completions.watch("hash-1") as second:
+            assert first is second
+            assert await _subscriber_count(redis) == 1
+
+            await redis.publish(CHANNEL, "cached")
+
+            assert await asyncio.wait_for(first, 2) == "cached"
+        assert await _subscriber_count(redis) == 0
+    finally:
+        await completions.close()
+
+
+@pytest.mark.asyncio
+async def test_late_waiter_gets_a_fresh_future(app):
+    redis: Redis = app.state.redis_client
+    completions = VariantCompletions(redis)
+    try:
+        async with completions.watch("hash-1") as done:
+            await redis.publish(CHANNEL, "error")
+            assert await asyncio.wait_for(done, 2) == "error"
+
+        async with completions.watch("hash-1") as done:
+            assert not done.done()
+    finally:
+        await completions.close()
+
+
+@pytest.mark.asyncio
+async def test_joiner_after_resolution_waits_for_the_next_status(app):
+    redis: Redis = app.state.redis_client
+    completions = VariantCompletions(redis)
+    try:
+        async with completions.watch("hash-1") as failed:
+            await redis.publish(CHANNEL, "error")
+            assert await asyncio.wait_for(failed, 2) == "error"
+
+            # Re-queued while the first waiter still holds the watch
+            async with completions.watch("hash-1") as retry:
+                assert retry is not failed
+                assert not retry.done()
+                assert await _subscriber_count(redis) == 1
+
+                await redis.publish(CHANNEL, "cached")
+                assert await asyncio.wait_for(retry, 2) == "cached"
+            assert await _subscriber_count(redis) == 0
+    finally:
+        await completions.close()
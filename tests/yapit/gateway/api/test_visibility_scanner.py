@@ -0,0 +1,210 @@
+"""Tests for the deadline-indexed visibility scanner (Redis).
+
+A job is requeued exactly when its lease deadline passes — not before, and not
+after the worker released it. Entries tracked without a lease are adopted, also
+when a pre-lease worker adds them after the scanner started.
+Once a lease is reclaimed, its holder's result is fenced off.
+"""
+
+import asyncio
+import contextlib
+import json
+import time
+import uuid
+
+import pytest
+from redis.asyncio import Redis
+
+from yapit.contracts import (
+    TTS_FENCES,
+    TTS_INFLIGHT,
+    TTS_JOBS,
+    TTS_LEASES,
+    SynthesisJob,
+    SynthesisParameters,
+    WorkerResult,
+    build_tts_dlq_error,
+    get_queue_name,
+)
+from yapit.gateway import visibility_scanner
+from yapit.gateway.result_consumer import _claim_results
+from yapit.gateway.visibility_scanner import _adopt_unleased_entries, _reclaim_expired_leases, run_visibility_scanner
+from yapit.queue import lease_member, release_processing, renew_lease, track_processing
+
+PROCESSING_KEY = "tts:processing:test-worker"
+QUEUE = get_queue_name("kokoro")
+DLQ = "tts:dlq:kokoro"
+
+
+def _raw_job() -> bytes:
+    job = SynthesisJob(
+        job_id=uuid.uuid4(),
+        variant_hash="abc",
+        user_id="user-1",
+        document_id=uuid.uuid4(),
+        block_idx=0,
+        model_slug="kokoro",
+        voice_slug="af_heart",
+        usage_multiplier=1.0,
+        synthesis_parameters=SynthesisParameters(model="kokoro", voice="af_heart", text="Hello."),
+    )
+    return job.model_dump_json().encode()
+
+
+def _result(job_id: str, lease_token: int | None) -> WorkerResult:
+    result = build_tts_dlq_error(_raw_job().decode(), "unused", worker_id="test-worker")
+    return result.model_copy(update={"job_id": uuid.UUID(job_id), "lease_token": lease_token})
+
+
+async def _track(redis: Redis, job_id: str, lease_s: float, retry_count: int = 0) -> None:
+    await track_processing(redis, PROCESSING_KEY, job_id, _raw_job(), retry_count, QUEUE, DLQ, TTS_LEASES, lease_s)
+
+
+class TestLeases:
+    @pytest.mark.asyncio
+    async def test_expired_lease_requeued(self, app):
+        redis: Redis = app.state.redis_client
+        await _track(redis, "job-1", lease_s=-1)
+
+        await _reclaim_expired_leases(redis, TTS_LEASES, TTS_JOBS, max_retries=3)
+
+        assert await redis.zscore(QUEUE, "job-1") is not None
+        assert json.loads(await redis.hget(TTS_JOBS, "job-1"))["retry_count"] == 1
+        assert await redis.hget(PROCESSING_KEY, "job-1") is None
+        assert await redis.zcard(TTS_LEASES) == 0
+
+    @pytest.mark.asyncio
+    async def test_live_lease_untouched(self, app):
+        redis: Redis = app.state.redis_client
+        await _track(redis, "job-1", lease_s=60)
+
+        await _reclaim_expired_leases(redis, TTS_LEASES, TTS_JOBS, max_retries=3)
+
+        assert await redis.zscore(QUEUE, "job-1") is None
+        assert await redis.hget(PROCESSING_KEY, "job-1") is not None
+
+    @pytest.mark.asyncio
+    async def test_released_job_not_requeued(self, app):
+        redis: Redis = app.state.redis_client
+        await _track(redis, "job-1", lease_s=-1)
+        await release_processing(redis, PROCESSING_KEY, TTS_LEASES, "job-1")
+
+        await _reclaim_expired_leases(redis, TTS_LEASES, TTS_JOBS, max_retries=3)
+
+        assert await redis.zscore(QUEUE, "job-1") is None
+
+    @pytest.mark.asyncio
+    async def test_renewal_extends_deadline(self, app):
+        redis: Redis = app.state.redis_client
+        await _track(redis, "job-1", lease_s=-1)
+
+        assert await renew_lease(redis, TTS_LEASES, PROCESSING_KEY, "job-1", lease_s=60)
+        await _reclaim_expired_leases(redis, TTS_LEASES, TTS_JOBS, max_retries=3)
+
+        assert await redis.zscore(QUEUE, "job-1") is None
+
+    @pytest.mark.asyncio
+    async def test_renewal_after_reclaim_reports_lost_lease(self, app):
+        redis: Redis = app.state.redis_client
+        await _track(redis, "job-1", lease_s=-1)
+        await _reclaim_expired_leases(redis, TTS_LEASES, TTS_JOBS, max_retries=3)
+
+        assert not await renew_lease(redis, TTS_LEASES, PROCESSING_KEY, "job-1", lease_s=60)
+        assert await redis.zcard(TTS_LEASES) == 0
+
+    @pytest.mark.asyncio
+    async def test_max_retries_moves_to_dlq(self, app):
+        redis: Redis = app.state.redis_client
+        await _track(redis, "job-1", lease_s=-1, retry_count=3)
+
+        await _reclaim_expired_leases(redis, TTS_LEASES, TTS_JOBS, max_retries=3)
+
+        assert await redis.zscore(QUEUE, "job-1") is None
+        assert await redis.llen(DLQ) == 1
+
+
+class TestAdoption:
+    @pytest.mark.asyncio
+    async def test_unleased_entry_gets_deadline_from_start(self, app):
+        redis: Redis = app.state.redis_client
+        started = time.time() - 30
+        entry = {"processing_started": started, "retry_count": 0, "job": "{}", "queue_name": QUEUE, "dlq_key": DLQ}
+        await redis.hset(PROCESSING_KEY, "legacy", json.dumps(entry))
+
+        assert await _adopt_unleased_entries(redis, "tts:processing:*", TTS_LEASES, visibility_timeout_s=20) == 1
+
+        deadline = await redis.zscore(TTS_LEASES, lease_member(PROCESSING_KEY, "legacy"))
+        assert deadline == pytest.approx(started + 20)
+
+    @pytest.mark.asyncio
+    async def test_entries_from_old_workers_adopted_after_startup(self, app, monkeypatch):
+        redis: Redis = app.state.redis_client
+        monkeypatch.setattr(visibility_scanner, "ADOPT_EVERY_N_SCANS", 1)
+        scanner = asyncio.create_task(
+            run_visibility_scanner(redis, TTS_LEASES, "tts:processing:*", TTS_JOBS, 20, 3, scan_interval_s=1)
+        )
+        try:
+            await asyncio.sleep(0.05)
+            # A worker from before the upgrade picks up a job while the scanner runs
+            entry = {
+                "processing_started": time.time(),
+                "retry_count": 0,
+                "job": "{}",
+                "queue_name": QUEUE,
+                "dlq_key": DLQ,
+            }
+            await redis.hset(PROCESSING_KEY, "late", json.dumps(entry))
+            for _ in range(300):
+                if await redis.zscore(TTS_LEASES, lease_member(PROCESSING_KEY, "late")) is not None:
+                    break
+                await asyncio.sleep(0.01)
+            else:
+                pytest.fail("late unleased entry never adopted")
+        finally:
+            scanner.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await scanner
+
+    @pytest.mark.asyncio
+    async def test_existing_lease_kept(self, app):
+        redis: Redis = app.state.redis_client
+        await _track(redis, "job-1", lease_s=60)
+        before = await redis.zscore(TTS_LEASES, lease_member(PROCESSING_KEY, "job-1"))
+
+        await _adopt_unleased_entries(redis, "tts:processing:*", TTS_LEASES, visibility_timeout_s=20)
+
+        assert await redis.zscore(TTS_LEASES, lease_member(PROCESSING_KEY, "job-1")) == before
+
+
+class TestFencing:
+    @pytest.mark.asyncio
+    async def test_tokens_increase_per_lease(self, app):
+        redis: Redis = app.state.redis_client
+        first = await track_processing(
+            redis, PROCESSING_KEY, "job-1", _raw_job(), 0, QUEUE, DLQ, TTS_LEASES, 10, fences_key=TTS_FENCES
+        )
+        second = await track_processing(
+            redis, PROCESSING_KEY, "job-2", _raw_job(), 0, QUEUE, DLQ, TTS_LEASES, 10, fences_key=TTS_FENCES
+        )
+        assert first is not None and second is not None
+        assert second > first
+        assert int(await redis.hget(TTS_FENCES, "job-2")) == second
+
+    @pytest.mark.asyncio
+    async def test_result_from_reclaimed_lease_rejected(self, app):
+        redis: Redis = app.state.redis_client
+        job_id = str(uuid.uuid4())
+        stale = await track_processing(
+            redis, PROCESSING_KEY, job_id, _raw_job(), 0, QUEUE, DLQ, TTS_LEASES, -1, fences_key=TTS_FENCES
+        )
+        await _reclaim_expired_leases(redis, TTS_LEASES, TTS_JOBS, max_retries=3, fences_key=TTS_FENCES)
+        current = await track_processing(
+            redis, "tts:processing:other", job_id, _raw_job(), 1, QUEUE, DLQ, TTS_LEASES, 10, fences_key=TTS_FENCES
+        )
+
+        await redis.set(TTS_INFLIGHT.format(hash="abc"), job_id)
+
+        claimed = await _claim_results(redis, [(b"1-0", _result(job_id, stale)), (b"2-0", _result(job_id, current))])
+
+        assert [item.result.lease_token for item in claimed] == [current]
+        assert await redis.hget(TTS_FENCES, job_id) is None
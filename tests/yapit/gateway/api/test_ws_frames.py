@@ -0,0 +1,151 @@
+"""Tests for the WebSocket wire options.
+
+Batched connections get one `statuses` frame per request instead of a frame per
+block. msgpack connections get every frame (built, relayed, replayed, errors) as
+binary msgpack with null fields left out; JSON connections get published statuses
+as is, with only the timestamps swapped for clients that want the JSON string.
+"""
+
+import json
+import time
+import uuid
+
+import msgpack
+import pytest
+from redis.asyncio import Redis
+
+from yapit.contracts import TTS_PENDING, TTS_STATUS_LOG
+from yapit.gateway.api.v1.ws import (
+    WSBlockStatus,
+    WSBlockStatuses,
+    WSCursorMoved,
+    WSError,
+    _handle_cursor_moved,
+    _replay_session,
+    _send_frame,
+    _SessionState,
+    _WireOptions,
+)
+from yapit.word_timestamps import encode_b64
+
+WORDS = [{"t": "Hello", "s": 0, "e": 400}, {"t": "world", "s": 450, "e": 900}]
+
+
+class _StubWebSocket:
+    def __init__(self):
+        self.text: list[str] = []
+        self.binary: list[bytes] = []
+
+    async def send_text(self, data: str) -> None:
+        self.text.append(data)
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.binary.append(data)
+
+
+def _statuses(document_id: uuid.UUID) -> WSBlockStatuses:
+    return WSBlockStatuses(
+        document_id=document_id,
+        statuses=[
+            WSBlockStatus(document_id=document_id, block_idx=0, status="cached", audio_url="/a", duration_ms=1200),
+            WSBlockStatus(document_id=document_id, block_idx=1, status="queued"),
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_json_frame_round_trips():
+    ws = _StubWebSocket()
+    frame = _statuses(uuid.uuid4())
+    await _send_frame(ws, frame, _WireOptions())
+    assert ws.binary == []
+    assert WSBlockStatuses.model_validate_json(ws.text[0]) == frame
+
+
+@pytest.mark.asyncio
+async def test_msgpack_frame_omits_null_fields():
+    ws = _StubWebSocket()
+    document_id = uuid.uuid4()
+    await _send_frame(ws, _statuses(document_id), _WireOptions(msgpack=True))
+    assert ws.text == []
+    decoded = msgpack.unpackb(ws.binary[0])
+    assert decoded["type"] == "statuses"
+    assert decoded["statuses"][1] == {
+        "type": "status",
+        "document_id": str(document_id),
+        "block_idx": 1,
+        "status": "queued",
+        "recoverable": True,
+    }
+    assert WSBlockStatuses.model_validate(decoded) == _statuses(document_id)
+
+
+@pytest.mark.asyncio
+async def test_evicted_frame_follows_encoding(app, test_user):
+    redis: Redis = app.state.redis_client
+    document_id = uuid.uuid4()
+    await redis.sadd(TTS_PENDING.format(user_id=test_user.id, document_id=document_id), 3)
+    ws = _StubWebSocket()
+
+    await _handle_cursor_moved(
+        ws, WSCursorMoved(document_id=document_id, cursor=0), test_user, redis, _WireOptions(msgpack=True)
+    )
+
+    assert msgpack.unpackb(ws.binary[0]) == {"type": "evicted", "document_id": str(document_id), "block_indices": [3]}
+
+
+def _published(document_id: uuid.UUID) -> bytes:
+    return (
+        WSBlockStatus(
+            document_id=document_id,
+            block_idx=2,
+            status="cached",
+            audio_url="/a",
+            word_timestamps_compact=encode_b64(WORDS),
+        )
+        .model_dump_json()
+        .encode()
+    )
+
+
+@pytest.mark.asyncio
+async def test_published_status_relayed_as_is_or_with_json_timestamps():
+    document_id = uuid.uuid4()
+    published = _published(document_id)
+
+    compact = _StubWebSocket()
+    await _send_frame(compact, published, _WireOptions(compact=True))
+    assert compact.text == [published.decode()]
+
+    plain = _StubWebSocket()
+    await _send_frame(plain, published, _WireOptions())
+    status = WSBlockStatus.model_validate_json(plain.text[0])
+    assert status.word_timestamps_compact is None
+    assert status.word_timestamps is not None and json.loads(status.word_timestamps) == WORDS
+    assert status.model_copy(update={"word_timestamps": None}) == WSBlockStatus.model_validate_json(
+        published
+    ).model_copy(update={"word_timestamps_compact": None})
+
+
+@pytest.mark.asyncio
+async def test_msgpack_connection_never_gets_json(app, test_user):
+    redis: Redis = app.state.redis_client
+    document_id = uuid.uuid4()
+    await redis.xadd(
+        TTS_STATUS_LOG.format(user_id=test_user.id, document_id=document_id), {"data": _published(document_id)}
+    )
+    state = _SessionState(user_id=test_user.id, document_ids=[document_id], disconnected_at=time.time())
+    wire = _WireOptions(compact=True, batched=True, msgpack=True)
+    ws = _StubWebSocket()
+
+    await _send_frame(ws, _statuses(document_id), wire)
+    await _send_frame(ws, _published(document_id), wire)
+    await _send_frame(ws, WSError(error="Invalid JSON"), wire)
+    await _replay_session(ws, redis, test_user, state, wire)
+
+    assert ws.text == []
+    frames = [msgpack.unpackb(frame) for frame in ws.binary]
+    assert [frame["type"] for frame in frames] == ["statuses", "status", "error", "status"]
+    assert frames[1] == frames[3]
+    assert frames[1]["word_timestamps_compact"] == encode_b64(WORDS)
+    assert "word_timestamps" not in frames[1]
@@ -0,0 +1,70 @@
+"""Tests for WebSocket session resume.
+
+A session is only resumed by the user it belongs to. Resuming replays the statuses
+logged since shortly before the drop and reports which blocks are still pending.
+"""
+
+import json
+import time
+import uuid
+
+import pytest
+from redis.asyncio import Redis
+
+from yapit.contracts import TTS_PENDING, TTS_STATUS_LOG
+from yapit.gateway.api.v1.ws import (
+    REPLAY_OVERLAP_S,
+    WSBlockStatus,
+    _load_session,
+    _replay_session,
+    _save_session,
+    _SessionState,
+    _WireOptions,
+)
+from yapit.gateway.stack_auth.users import User
+
+
+class _StubWebSocket:
+    def __init__(self):
+        self.sent: list[dict] = []
+
+    async def send_text(self, data: str) -> None:
+        self.sent.append(json.loads(data))
+
+
+async def _log_status(redis: Redis, user_id: str, document_id: uuid.UUID, block_idx: int, at: float) -> None:
+    status = WSBlockStatus(document_id=document_id, block_idx=block_idx, status="cached", audio_url=f"/a/{block_idx}")
+    await redis.xadd(
+        TTS_STATUS_LOG.format(user_id=user_id, document_id=document_id),
+        {"data": status.model_dump_json()},
+        id=f"{int(at * 1000)}-0",
+    )
+
+
+@pytest.mark.asyncio
+async def test_session_belongs_to_its_user(app, test_user):
+    redis: Redis = app.state.redis_client
+    await _save_session(redis, "sid", _SessionState(user_id=test_user.id))
+
+    assert await _load_session(redis, test_user, "sid") is not None
+    assert await _load_session(redis, test_user.model_copy(update={"id": "someone-else"}), "sid") is None
+    assert await _load_session(redis, test_user, "unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_replays_statuses_since_the_drop(app, test_user: User):
+    redis: Redis = app.state.redis_client
+    document_id = uuid.uuid4()
+    dropped_at = time.time() - 30
+    await _log_status(redis, test_user.id, document_id, 0, at=dropped_at - REPLAY_OVERLAP_S - 5)
+    await _log_status(redis, test_user.id, document_id, 1, at=dropped_at - 1)
+    await _log_status(redis, test_user.id, document_id, 2, at=dropped_at + 10)
+    await redis.sadd(TTS_PENDING.format(user_id=test_user.id, document_id=document_id), 4, 3)
+    state = _SessionState(user_id=test_user.id, document_ids=[document_id], disconnected_at=dropped_at)
+    ws = _StubWebSocket()
+
+    replayed, pending = await _replay_session(ws, redis, test_user, state, _WireOptions(compact=True))
+
+    assert replayed == 2
+    assert [status["block_idx"] for status in ws.sent] == [1, 2]
+    assert pending == {document_id: [3, 4]}
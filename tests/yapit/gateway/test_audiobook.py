@@ -0,0 +1,67 @@
+"""Audiobook splicing: per-block Ogg Opus files become one stream a decoder reads end
+to end, without re-encoding, with the chapters in its tags.
+"""
+
+import array
+import io
+import math
+import struct
+
+import av
+import pytest
+
+from yapit.gateway.audiobook import OpusSplicer, block_samples, ogg_crc, parse_pages
+
+SAMPLE_RATE = 24_000
+
+
+def _encode(seconds: float, freq: float) -> bytes:
+    """A tone encoded the way the Kokoro worker encodes blocks."""
+    n = int(SAMPLE_RATE * seconds)
+    pcm = array.array("h", (int(8000 * math.sin(2 * math.pi * freq * i / SAMPLE_RATE)) for i in range(n)))
+    buf = io.BytesIO()
+    output = av.open(buf, "w", format="ogg")
+    stream = output.add_stream("libopus", rate=SAMPLE_RATE)
+    frame = av.AudioFrame(format="s16", layout="mono", samples=n)
+    frame.planes[0].update(pcm.tobytes())
+    frame.sample_rate = SAMPLE_RATE
+    for packet in stream.encode(frame):
+        output.mux(packet)
+    for packet in stream.encode(None):
+        output.mux(packet)
+    output.close()
+    return buf.getvalue()
+
+
+@pytest.fixture(scope="module")
+def blocks() -> list[bytes]:
+    return [_encode(1.3, 440), _encode(2.0, 660), _encode(0.5, 330)]
+
+
+def test_crc_matches_encoder(blocks):
+    audio = blocks[0]
+    pos = 0
+    for page in parse_pages(audio):
+        size = 27 + len(page.lacing) + len(page.body)
+        raw = audio[pos : pos + size]
+        assert ogg_crc(raw[:22] + b"\0\0\0\0" + raw[26:]) == struct.unpack_from("<I", raw, 22)[0]
+        pos += size
+
+
+def test_spliced_stream_decodes_as_one(blocks):
+    splicer = OpusSplicer([(0, "Intro"), (block_samples(blocks[0]), "Chapter 1")])
+    spliced = b"".join(splicer.add(block) for block in blocks) + splicer.finish()
+
+    pages = list(parse_pages(spliced))
+    assert len({page.serial for page in pages}) == 1
+    assert [page.sequence for page in pages] == list(range(len(pages)))
+
+    container = av.open(io.BytesIO(spliced))
+    chapters = [(chapter["start"], chapter["metadata"]["title"]) for chapter in container.chapters()]
+    decoded = sum(frame.samples for frame in container.decode(audio=0))
+    container.close()
+
+    # Every block's samples, less the first block's pre-skip and the last block's end trim
+    assert sum(block_samples(block) for block in blocks) - decoded < 960 + 312
+    assert decoded / 48_000 == pytest.approx(3.8, abs=0.1)
+    assert chapters == [(0, "Intro"), ((block_samples(blocks[0]) - 312) * 1000 // 48_000, "Chapter 1")]
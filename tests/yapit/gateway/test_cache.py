@@ -1,12 +1,15 @@
 """Tests for SqliteCache LRU behavior and maintenance."""
 
 import asyncio
+import sqlite3
 import tempfile
+import time
 from pathlib import Path
 
 import pytest
 
-from yapit.gateway.cache import CacheConfig, SqliteCache
+from yapit.gateway import cache as cache_module
+from yapit.gateway.cache import CacheConfig, EvictionPolicy, SqliteCache
 
 
 @pytest.fixture
@@ -34,6 +37,15 @@ async def unlimited_cache(cache_dir):
     await cache.close()
 
 
+@pytest.fixture
+async def gdsf_cache(cache_dir):
+    """100 byte limit, cost-aware eviction."""
+    cache = SqliteCache(CacheConfig(path=cache_dir, eviction_policy=EvictionPolicy.GDSF))
+    cache._max_size_bytes = 100
+    yield cache
+    await cache.close()
+
+
 class TestBasicOperations:
     @pytest.mark.asyncio
     async def test_store_and_retrieve(self, unlimited_cache):
@@ -112,6 +124,57 @@ class TestLRUEviction:
         assert await small_cache.exists("c")
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policy", [EvictionPolicy.LRU, EvictionPolicy.GDSF])
+async def test_eviction_candidates_read_from_a_covering_index(cache_dir, policy):
+    cache = SqliteCache(CacheConfig(path=cache_dir, eviction_policy=policy))
+    db = await cache._get_reader()
+    query = cache_module._eviction_candidates_query(policy == EvictionPolicy.GDSF)
+    async with db.execute(f"EXPLAIN QUERY PLAN {query}", (10,)) as cursor:
+        plan = " ".join(row[-1] for row in await cursor.fetchall())
+    await cache.close()
+    assert "USING COVERING INDEX" in plan
+
+
+class TestGDSFEviction:
+    @pytest.mark.asyncio
+    async def test_expensive_entry_outlives_older_cheap_one(self, gdsf_cache):
+        await gdsf_cache.store("premium", b"x" * 40, cost=4.0)
+        await gdsf_cache.store("kokoro", b"y" * 40, cost=1.0)
+        await gdsf_cache.store("new", b"z" * 40, cost=1.0)
+
+        assert await gdsf_cache.exists("premium")
+        assert not await gdsf_cache.exists("kokoro")
+
+    @pytest.mark.asyncio
+    async def test_frequently_read_entry_outlives_recent_one_hit(self, gdsf_cache):
+        await gdsf_cache.store("popular", b"x" * 40)
+        await gdsf_cache.store("one-hit", b"y" * 40)
+        for _ in range(3):
+            await gdsf_cache.retrieve_data("popular")
+        await gdsf_cache.retrieve_data("one-hit")
+        await gdsf_cache._flush_lru()
+
+        gdsf_cache._max_size_bytes = 50
+        await gdsf_cache.commit()
+
+        assert await gdsf_cache.exists("popular")
+        assert not await gdsf_cache.exists("one-hit")
+
+    @pytest.mark.asyncio
+    async def test_eviction_ages_out_stale_hits(self, gdsf_cache):
+        await gdsf_cache.store("old", b"x" * 40)
+        for _ in range(2):
+            await gdsf_cache.retrieve_data("old")
+        await gdsf_cache._flush_lru()
+
+        # Each eviction raises the clock, so fresh entries soon outrank old hits
+        for i in range(10):
+            await gdsf_cache.store(f"fresh{i}", b"y" * 40)
+
+        assert not await gdsf_cache.exists("old")
+
+
 async def _read_last_accessed(cache, key: str = "key1"):
     import aiosqlite
 
@@ -218,6 +281,67 @@ class TestPinning:
         assert await small_cache.exists("p2")
         assert await small_cache.exists("u1")
 
+    @pytest.mark.asyncio
+    async def test_temporary_pins_lapse(self, unlimited_cache):
+        for key in ("lapsed", "current", "permanent"):
+            await unlimited_cache.store(key, b"x" * 10)
+        await unlimited_cache.pin(["permanent"])
+
+        now = time.time()
+        assert await unlimited_cache.pin(["lapsed", "current", "permanent"], until=now - 1) == 2
+        assert await unlimited_cache.pin(["current"], until=now + 3600) == 1
+        assert await unlimited_cache.unpin_all() == 1  # temporary pins stay
+
+        assert await unlimited_cache.unpin_expired() == 1
+        assert await unlimited_cache._read_unpinned_bytes() == 20  # "current" still pinned
+
+
+class TestSizeCounter:
+    @pytest.mark.asyncio
+    async def test_counter_tracks_every_write(self, unlimited_cache):
+        await unlimited_cache.store("a", b"x" * 10)
+        await unlimited_cache.store("b", b"y" * 20)
+        await unlimited_cache.store("a", b"x" * 15)  # overwrite replaces, not adds
+        assert await unlimited_cache._read_unpinned_bytes() == 35
+
+        await unlimited_cache.pin(["b"])
+        assert await unlimited_cache._read_unpinned_bytes() == 15
+
+        await unlimited_cache.store("p", b"z" * 50, pinned=True)
+        await unlimited_cache.delete("a")
+        assert await unlimited_cache._read_unpinned_bytes() == 0
+
+        await unlimited_cache.unpin_all()
+        assert await unlimited_cache._read_unpinned_bytes() == 70
+
+    @pytest.mark.asyncio
+    async def test_existing_db_seeded_on_open(self, cache_dir):
+        with sqlite3.connect(cache_dir / "cache.db") as db:
+            db.execute(
+                "CREATE TABLE cache (key TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, last_accessed REAL NOT NULL, pinned INTEGER NOT NULL DEFAULT 0)"
+            )
+            db.execute("INSERT INTO cache VALUES ('old', x'00', 40, 0, 0, 0), ('kept', x'00', 60, 0, 0, 1)")
+
+        cache = SqliteCache(CacheConfig(path=cache_dir))
+        try:
+            assert await cache._read_unpinned_bytes() == 40
+        finally:
+            await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_eviction_frees_to_low_water_mark_in_chunks(self, small_cache, monkeypatch):
+        monkeypatch.setattr(cache_module, "EVICT_CHUNK_ROWS", 2)
+        for i in range(10):
+            await small_cache.store(f"k{i}", b"x" * 10, commit=False)
+        await small_cache.commit()  # 100 bytes: at the limit, not over
+
+        await small_cache.store("k10", b"x" * 30)  # 130 > 100: evict down to 90
+
+        assert await small_cache._read_unpinned_bytes() == 90
+        assert not await small_cache.exists("k3")
+        assert await small_cache.exists("k4")
+
 
 class TestCacheStats:
     @pytest.mark.asyncio
@@ -264,3 +388,128 @@ class TestVacuum:
     async def test_vacuum_skips_empty_cache(self, unlimited_cache):
         vacuumed = await unlimited_cache.vacuum_if_needed(bloat_threshold=2.0)
         assert not vacuumed
+
+
+class TestIncrementalVacuum:
+    @pytest.fixture(autouse=True)
+    def no_quiet_period(self, monkeypatch):
+        monkeypatch.setattr(cache_module, "QUIET_PERIOD_S", 0)
+
+    async def _free_pages(self, cache: SqliteCache) -> int:
+        return await cache._pragma(await cache._get_writer(), "freelist_count")
+
+    @pytest.mark.asyncio
+    async def test_new_file_uses_incremental_auto_vacuum(self, unlimited_cache):
+        db = await unlimited_cache._get_writer()
+        assert await unlimited_cache._pragma(db, "auto_vacuum") == cache_module.AUTO_VACUUM_INCREMENTAL
+        assert await unlimited_cache._pragma(db, "page_size") == cache_module.PAGE_SIZE
+        assert not await unlimited_cache.vacuum_if_needed(bloat_threshold=0.0)
+
+    @pytest.mark.asyncio
+    async def test_idle_step_reclaims_free_pages(self, unlimited_cache, monkeypatch):
+        monkeypatch.setattr(cache_module, "INCREMENTAL_VACUUM_PAGES", 5)
+        for i in range(20):
+            await unlimited_cache.store(f"key{i}", b"x" * 100_000)
+        for i in range(20):
+            await unlimited_cache.delete(f"key{i}")
+        free_before = await self._free_pages(unlimited_cache)
+
+        await unlimited_cache.maintenance_step()
+
+        assert await self._free_pages(unlimited_cache) == free_before - 5
+
+    @pytest.mark.asyncio
+    async def test_step_skipped_while_writes_continue(self, unlimited_cache, monkeypatch):
+        await unlimited_cache.store("key1", b"x" * 100_000)
+        await unlimited_cache.delete("key1")
+        await unlimited_cache.maintenance_step()  # first sighting of the file's version
+        monkeypatch.setattr(cache_module, "QUIET_PERIOD_S", 3600)
+        await unlimited_cache.store("key2", b"y" * 100_000)
+        await unlimited_cache.delete("key2")
+        free_before = await self._free_pages(unlimited_cache)
+
+        await unlimited_cache.maintenance_step()
+
+        assert await self._free_pages(unlimited_cache) == free_before
+
+    @pytest.mark.asyncio
+    async def test_legacy_file_converted_by_full_vacuum(self, cache_dir):
+        with sqlite3.connect(cache_dir / "cache.db") as db:
+            db.execute("PRAGMA auto_vacuum=NONE")
+            db.execute("CREATE TABLE filler (data BLOB)")
+            db.executemany("INSERT INTO filler VALUES (?)", [(b"x" * 100_000,)] * 20)
+            db.execute("DROP TABLE filler")
+        cache = SqliteCache(CacheConfig(path=cache_dir))
+        await cache.store("key1", b"x" * 1000)
+
+        assert await cache.vacuum_if_needed(bloat_threshold=2.0)
+
+        assert await cache._pragma(await cache._get_writer(), "auto_vacuum") == cache_module.AUTO_VACUUM_INCREMENTAL
+        assert not await cache.vacuum_if_needed(bloat_threshold=2.0)
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_legacy_file_converted_by_first_idle_step(self, cache_dir):
+        with sqlite3.connect(cache_dir / "cache.db") as db:
+            db.execute("PRAGMA auto_vacuum=NONE")
+            db.execute("CREATE TABLE filler (data BLOB)")
+        cache = SqliteCache(CacheConfig(path=cache_dir))
+        await cache.store("key1", b"x" * 100_000)
+        assert (await cache.get_stats()).bloat_ratio < 2.0
+
+        await cache.maintenance_step()
+
+        assert await cache._pragma(await cache._get_writer(), "auto_vacuum") == cache_module.AUTO_VACUUM_INCREMENTAL
+        assert await cache.retrieve_data("key1") == b"x" * 100_000
+        await cache.close()
+
+
+class TestRecordMeta:
+    @pytest.mark.asyncio
+    async def test_record_and_meta_only_reads(self, unlimited_cache):
+        await unlimited_cache.store("key1", b"audio", meta=b'{"duration_ms": 500}')
+
+        record = await unlimited_cache.retrieve_record("key1")
+        assert record is not None
+        assert (record.data, record.meta) == (b"audio", b'{"duration_ms": 500}')
+        assert await unlimited_cache.retrieve_meta("key1") == b'{"duration_ms": 500}'
+        assert await unlimited_cache.retrieve_record("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_meta_replaced_and_deleted_with_entry(self, unlimited_cache):
+        await unlimited_cache.store("key1", b"audio", meta=b"old")
+        await unlimited_cache.store("key1", b"audio")
+        assert await unlimited_cache.retrieve_meta("key1") is None
+
+        await unlimited_cache.store("key2", b"audio", meta=b"meta")
+        await unlimited_cache.delete("key2")
+        assert await unlimited_cache.retrieve_meta("key2") is None
+
+    @pytest.mark.asyncio
+    async def test_meta_counts_toward_size(self, small_cache):
+        await small_cache.store("first", b"x" * 40, meta=b"m" * 30)
+        await small_cache.store("second", b"y" * 40)
+
+        assert not await small_cache.exists("first")
+
+    @pytest.mark.asyncio
+    async def test_legacy_timestamp_rows_folded_into_meta(self, unlimited_cache, monkeypatch):
+        monkeypatch.setattr(cache_module, "META_MIGRATION_CHUNK_ROWS", 2)
+        for i in range(3):
+            await unlimited_cache.store(f"hash{i}", b"audio")
+            await unlimited_cache.store(f"hash{i}:ts", b'[{"t": "Hi"}]')
+        await unlimited_cache.store("orphan:ts", b"[]")
+        # Readable through the fallback before the migration reaches them
+        assert await unlimited_cache.retrieve_meta("hash2") == b'[{"t": "Hi"}]'
+
+        for _ in range(3):
+            await unlimited_cache.maintenance_step()
+
+        assert unlimited_cache._meta_migrated_to is None
+        for i in range(3):
+            assert not await unlimited_cache.exists(f"hash{i}:ts")
+            assert await unlimited_cache.retrieve_meta(f"hash{i}") == b'[{"t": "Hi"}]'
+        assert not await unlimited_cache.exists("orphan:ts")
+        stats = await unlimited_cache.get_stats()
+        assert stats.entry_count == 3
+        assert stats.data_size_bytes == 3 * (len(b"audio") + len(b'[{"t": "Hi"}]'))
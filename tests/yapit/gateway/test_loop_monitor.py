@@ -0,0 +1,76 @@
+"""Tests for event-loop lag sampling and the blocking-call detector.
+
+The detector is only useful if the stack it reports points at the call that held
+the loop, so the test blocks inside a named helper and looks for it.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from yapit.gateway import loop_monitor
+from yapit.gateway.loop_monitor import lag_percentiles, run_blocking_call_detector, run_loop_lag_monitor
+
+
+@pytest.fixture
+def events(monkeypatch):
+    captured = []
+
+    async def fake_log_event(event_type, **kwargs):
+        captured.append((event_type, kwargs))
+
+    monkeypatch.setattr(loop_monitor, "log_event", fake_log_event)
+    return captured
+
+
+def test_percentiles_nearest_rank():
+    stats = lag_percentiles([float(i) for i in range(1, 101)])
+    assert stats == {"p50_ms": 50.0, "p95_ms": 95.0, "p99_ms": 99.0, "max_ms": 100.0}
+
+
+def test_percentiles_empty_window():
+    assert lag_percentiles([])["p99_ms"] == 0.0
+
+
+def _hold_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_lag_monitor_reports_blocked_time(events):
+    task = asyncio.create_task(run_loop_lag_monitor(sample_interval_s=0.01, report_interval_s=0.2))
+    await asyncio.sleep(0.05)
+    _hold_the_loop(0.1)
+    await asyncio.sleep(0.25)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    reports = [kwargs for event_type, kwargs in events if event_type == "event_loop_lag"]
+    assert reports
+    assert reports[0]["data"]["max_ms"] >= 80
+
+
+@pytest.mark.asyncio
+async def test_detector_captures_blocking_stack(events):
+    task = asyncio.create_task(run_blocking_call_detector(threshold_ms=40))
+    await asyncio.sleep(0.05)
+    _hold_the_loop(0.2)
+    await asyncio.sleep(0.05)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    blocked = [kwargs for event_type, kwargs in events if event_type == "event_loop_blocked"]
+    assert len(blocked) == 1
+    assert "_hold_the_loop" in blocked[0]["data"]["stack"]
+    assert blocked[0]["duration_ms"] >= 150
+
+
+@pytest.mark.asyncio
+async def test_detector_quiet_when_loop_is_free(events):
+    task = asyncio.create_task(run_blocking_call_detector(threshold_ms=40))
+    await asyncio.sleep(0.2)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert not [e for e in events if e[0] == "event_loop_blocked"]
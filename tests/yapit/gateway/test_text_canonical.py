@@ -0,0 +1,49 @@
+"""Tests for text canonicalization before hashing.
+
+Texts that differ only invisibly or typographically share one variant, canonical
+text keeps its old hash, and line breaks (Kokoro segment boundaries) survive.
+"""
+
+import hashlib
+
+import pytest
+
+from yapit.gateway.domain_models import BlockVariant
+from yapit.gateway.text_canonical import canonicalize
+
+CANONICAL = 'Don\'t say "never" in re-entrant code.'
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        CANONICAL,
+        "Don\u2019t say \u201cnever\u201d in re-entrant code.",
+        '  Don\'t  say "never"\tin re-entrant code. ',
+        'Don\'t say "never" in re-en\u00adtrant\u200b code.\ufeff',
+        'Don\'t\u00a0say "never" in re-entrant code.',
+    ],
+)
+def test_variants_share_one_hash(text):
+    assert canonicalize(text) == CANONICAL
+    assert BlockVariant.get_hash(text, "kokoro", "af_heart", {}) == BlockVariant.get_hash(
+        CANONICAL, "kokoro", "af_heart", {}
+    )
+
+
+def test_canonical_text_keeps_its_legacy_hash():
+    legacy = hashlib.sha256(f"{CANONICAL}|kokoro|af_heart|speed=1.0".encode()).hexdigest()
+    assert BlockVariant.get_hash(CANONICAL, "kokoro", "af_heart", {"speed": 1.0}) == legacy
+
+
+def test_line_breaks_collapse_but_stay():
+    assert canonicalize("First line. \n\n  Second line.\r\n") == "First line.\nSecond line."
+
+
+def test_combining_accents_compose():
+    assert canonicalize("cafe\u0301") == "caf\u00e9"
+
+
+def test_idempotent():
+    text = " \u201cA\u201d \u00ad b \n\n c "
+    assert canonicalize(canonicalize(text)) == canonicalize(text)
@@ -0,0 +1,53 @@
+"""Tests for the stack-sampling profiler.
+
+The profile is only useful if a function burning CPU on another thread shows up
+in the collapsed output under its own name, rooted at its thread.
+"""
+
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from yapit.profiler import ProfilerBusyError, format_collapsed, profile, sample_stacks
+
+
+def _spin_for(seconds: float) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_profile_captures_busy_thread():
+    worker = threading.Thread(target=_spin_for, args=(0.3,), name="busy-worker")
+    worker.start()
+    collapsed = await profile(0.2, interval_s=0.005)
+    worker.join()
+
+    busy = [line for line in collapsed.splitlines() if line.startswith("busy-worker;")]
+    assert busy
+    stack, count = busy[0].rsplit(" ", 1)
+    assert stack.endswith("test_profiler:_spin_for")
+    assert int(count) > 0
+
+
+def test_format_collapsed_orders_by_count():
+    assert format_collapsed(Counter({"t;a": 1, "t;a;b": 5})) == "t;a;b 5\nt;a 1\n"
+
+
+def test_concurrent_profile_rejected():
+    started = threading.Event()
+
+    def hold() -> None:
+        started.set()
+        sample_stacks(0.2)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    started.wait()
+    time.sleep(0.02)
+    with pytest.raises(ProfilerBusyError):
+        sample_stacks(0.01)
+    holder.join()
@@ -0,0 +1,119 @@
+"""Tests for cooperative cancellation in execute_job.
+
+A job stops at the adapter's next checkpoint once every block waiting on it was
+skipped, and runs to completion while anyone else still wants the audio.
+"""
+
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from yapit import synth
+from yapit.contracts import TTS_CANCEL, TTS_SUBSCRIBERS, SynthesisJob, SynthesisParameters
+from yapit.synth import SynthAdapter, execute_job, raise_if_cancelled
+
+CHUNKS = 20
+CHUNK_S = 0.02
+
+
+class _ChunkedAdapter(SynthAdapter):
+    """Synthesizes in a worker thread, checkpointing per chunk like Kokoro."""
+
+    def __init__(self):
+        self.chunks_done = 0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def synthesize(self, text: str, **kwargs) -> bytes:
+        return await asyncio.to_thread(self._run)
+
+    def _run(self) -> bytes:
+        for _ in range(CHUNKS):
+            raise_if_cancelled()
+            time.sleep(CHUNK_S)
+            self.chunks_done += 1
+        return b"audio"
+
+    def calculate_duration_ms(self, audio_bytes: bytes) -> int:
+        return 1000
+
+
+class _StubPipeline:
+    def __init__(self, sets: dict[str, set[bytes]]):
+        self.sets = sets
+        self.reads: list[str] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+    def smembers(self, key: str) -> None:
+        self.reads.append(key)
+
+    async def execute(self) -> list[set[bytes]]:
+        return [set(self.sets.get(key, set())) for key in self.reads]
+
+
+class _StubRedis:
+    def __init__(self, sets: dict[str, set[bytes]]):
+        self.sets = sets
+
+    def pipeline(self, transaction: bool = True) -> _StubPipeline:
+        return _StubPipeline(self.sets)
+
+
+def _job() -> SynthesisJob:
+    return SynthesisJob(
+        job_id=uuid.uuid4(),
+        variant_hash="abc",
+        user_id="user-1",
+        document_id=uuid.uuid4(),
+        block_idx=3,
+        model_slug="kokoro",
+        voice_slug="af_heart",
+        usage_multiplier=1.0,
+        synthesis_parameters=SynthesisParameters(model="kokoro", voice="af_heart", text="Hello."),
+    )
+
+
+@pytest.fixture(autouse=True)
+def fast_poll(monkeypatch):
+    monkeypatch.setattr(synth, "CANCEL_POLL_INTERVAL_S", 0.01)
+
+
+@pytest.mark.asyncio
+async def test_skipped_block_stops_at_next_chunk():
+    job = _job()
+    entry = f"{job.user_id}:{job.document_id}:{job.block_idx}".encode()
+    client = _StubRedis({TTS_CANCEL.format(job_id=job.job_id): {entry}, TTS_SUBSCRIBERS.format(hash="abc"): {entry}})
+    adapter = _ChunkedAdapter()
+
+    result = await execute_job(adapter, job, "worker-1", time.time(), client=client)
+
+    assert result.cancelled
+    assert result.error is None and result.audio_base64 is None
+    assert adapter.chunks_done < CHUNKS
+
+
+@pytest.mark.asyncio
+async def test_job_kept_while_another_block_waits():
+    job = _job()
+    entry = f"{job.user_id}:{job.document_id}:{job.block_idx}".encode()
+    other = b"user-2:00000000-0000-0000-0000-000000000000:0"
+    client = _StubRedis(
+        {TTS_CANCEL.format(job_id=job.job_id): {entry}, TTS_SUBSCRIBERS.format(hash="abc"): {entry, other}}
+    )
+
+    result = await execute_job(_ChunkedAdapter(), job, "worker-1", time.time(), client=client)
+
+    assert not result.cancelled
+    assert result.audio_base64 is not None
+
+
+def test_checkpoint_is_noop_outside_a_job():
+    raise_if_cancelled()
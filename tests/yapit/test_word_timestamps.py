@@ -0,0 +1,75 @@
+"""Tests for the compact word-timestamp encoding.
+
+Decoding gives back every word with millisecond-precision times, in order; the
+encoded form is much smaller than the JSON it replaces; anything that isn't a
+valid payload fails loudly instead of decoding to garbage.
+"""
+
+import json
+
+import pytest
+
+from yapit.contracts import AudioMeta
+from yapit.word_timestamps import (
+    FLAG_ZLIB,
+    TimestampDecodeError,
+    decode,
+    decode_b64,
+    encode,
+    encode_b64,
+)
+
+WORDS = [
+    {"t": "The", "s": 0.0, "e": 0.1625},
+    {"t": "cat", "s": 0.1625, "e": 0.4},
+    {"t": "sat", "s": 0.4, "e": 0.7125},
+    {"t": "on", "s": 0.7125, "e": 0.85},
+    {"t": "the", "s": 0.85, "e": 0.95},
+    {"t": "mat.", "s": 0.95, "e": 1.3875},
+]
+
+
+def _paragraph(n_words: int) -> list[dict]:
+    vocab = ["the", "a", "reader", "listens", "to", "every", "word", "of", "this", "long", "paragraph,"]
+    return [{"t": vocab[i % len(vocab)], "s": i * 0.31, "e": i * 0.31 + 0.27} for i in range(n_words)]
+
+
+def test_roundtrip_to_the_millisecond():
+    decoded = decode(encode(WORDS))
+
+    assert [w["t"] for w in decoded] == [w["t"] for w in WORDS]
+    for got, want in zip(decoded, WORDS):
+        assert got["s"] == pytest.approx(want["s"], abs=0.001)
+        assert got["e"] == pytest.approx(want["e"], abs=0.001)
+
+
+def test_unicode_tokens_and_out_of_order_starts():
+    words = [{"t": "größer", "s": 1.0, "e": 1.2}, {"t": "日本", "s": 0.5, "e": 0.9}]
+    assert decode(encode(words)) == [{"t": "größer", "s": 1.0, "e": 1.2}, {"t": "日本", "s": 0.5, "e": 0.9}]
+
+
+def test_far_smaller_than_json():
+    words = _paragraph(200)
+    encoded = encode(words)
+
+    assert encoded[0] & FLAG_ZLIB
+    assert len(encoded) * 5 < len(json.dumps(words))
+
+
+def test_base64_roundtrip():
+    assert [w["t"] for w in decode_b64(encode_b64(WORDS))] == [w["t"] for w in WORDS]
+
+
+@pytest.mark.parametrize("data", [b"", b"\x07abc", bytes([1 | FLAG_ZLIB]) + b"not zlib", b"\x01\x05"])
+def test_invalid_payload_raises(data):
+    with pytest.raises(TimestampDecodeError):
+        decode(data)
+
+
+def test_audio_meta_converts_between_forms():
+    legacy = AudioMeta.from_cache(json.dumps(WORDS).encode())
+    compact = legacy.compact_timestamps()
+    assert compact is not None
+
+    assert json.loads(AudioMeta(word_timestamps=compact).timestamps_json() or "null") == decode_b64(compact)
+    assert AudioMeta().compact_timestamps() is None
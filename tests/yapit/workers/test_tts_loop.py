@@ -0,0 +1,35 @@
+"""Tests for the TTS worker's adaptive lease budget.
+
+The budget has to grow with text length and shrink as the replica proves fast,
+without ever dropping below the base visibility timeout.
+"""
+
+from yapit.contracts import TTS_VISIBILITY_TIMEOUT_S
+from yapit.workers.tts_loop import BUDGET_FACTOR, MAX_BUDGET_S, ThroughputEstimate
+
+
+def test_short_text_gets_base_timeout():
+    assert ThroughputEstimate(chars_per_s=25).budget_s(10) == TTS_VISIBILITY_TIMEOUT_S
+
+
+def test_long_text_on_slow_replica_scales_with_length():
+    assert ThroughputEstimate(chars_per_s=10).budget_s(500) == 500 / 10 * BUDGET_FACTOR
+
+
+def test_budget_capped():
+    assert ThroughputEstimate(chars_per_s=1).budget_s(100_000) == MAX_BUDGET_S
+
+
+def test_observed_speed_moves_estimate():
+    estimate = ThroughputEstimate(chars_per_s=25)
+    for _ in range(30):
+        estimate.observe(text_length=1000, processing_time_ms=1000)
+    assert 990 < estimate.chars_per_s <= 1000
+    assert estimate.budget_s(1000) == TTS_VISIBILITY_TIMEOUT_S
+
+
+def test_failed_timing_ignored():
+    estimate = ThroughputEstimate(chars_per_s=25)
+    estimate.observe(text_length=0, processing_time_ms=500)
+    estimate.observe(text_length=100, processing_time_ms=0)
+    assert estimate.chars_per_s == 25
@@ -1,15 +1,24 @@
 """Contracts for Redis keys, queues, and job processing."""
 
+import json
 import uuid
 from typing import Annotated, Final
 
 import annotated_types
 from pydantic import BaseModel, ConfigDict, Field
 
+from yapit.word_timestamps import decode_b64, encode_b64
+
 TTS_INFLIGHT: Final[str] = "tts:inflight:{hash}"
 TTS_SUBSCRIBERS: Final[str] = "tts:subscribers:{hash}"
 TTS_CURSOR: Final[str] = "tts:cursor:{user_id}:{document_id}"
 TTS_PENDING: Final[str] = "tts:pending:{user_id}:{document_id}"
+TTS_CANCEL: Final[str] = "tts:cancel:{job_id}"  # set: subscriber entries evicted while the job was running
+TTS_STATUS_LOG: Final[str] = "tts:status_log:{user_id}:{document_id}"  # stream: published statuses, replayed on resume
+TTS_STATUS_LOG_TTL_S: Final[int] = 120
+TTS_WS_SESSION: Final[str] = "tts:ws_session:{session_id}"  # JSON: a WebSocket session's documents, for resume
+TTS_BULK_JOB: Final[str] = "tts:bulk_job:{job_id}"  # JSON: a bulk synthesis job's range and progress
+TTS_BULK_JOB_EVENTS: Final[str] = "tts:bulk_job_events:{job_id}"  # pubsub: the job's JSON on every change
 
 # Rate limiting
 RATELIMIT_EXTRACTION: Final[str] = "ratelimit:extraction:{user_id}"
@@ -27,24 +36,48 @@ MAX_EXTRACTION_PROMPT_LENGTH: Final[int] = 50_000
 # Queue structure (sorted set + hashes for efficient eviction)
 TTS_QUEUE: Final[str] = "tts:queue:{model}"  # sorted set: job_id -> timestamp
 TTS_JOBS: Final[str] = "tts:jobs"  # hash: job_id -> job_json
-TTS_JOB_INDEX: Final[str] = "tts:job_index"  # hash: "user_id:doc_id:block_idx" -> job_id
+TTS_JOB_INDEX: Final[str] = "tts:job_index"  # hash: "user_id:doc_id:block_idx" -> "job_id|queue|variant_hash"
 
-TTS_RESULTS: Final[str] = "tts:results"
+TTS_RESULTS: Final[str] = "tts:results:stream"  # stream: WorkerResult JSON under "data"
+TTS_RESULTS_GROUP: Final[str] = "result-consumers"
+TTS_RESULTS_LEGACY: Final[str] = "tts:results"  # list: workers predating the stream still LPUSH here
+TTS_RESULT_CLAIM: Final[str] = "tts:result_claim:{job_id}"  # set: subscribers taken by a claimed, unacked result
 TTS_BILLING_STREAM: Final[str] = "tts:billing:stream"
 TTS_BILLING_GROUP: Final[str] = "billing-consumers"
 TTS_BILLING_CONSUMER: Final[str] = "billing-consumer"
 TTS_AUDIO_CACHE: Final[str] = "tts:audio:{hash}"
-TTS_TIMESTAMPS_CACHE: Final[str] = "tts:timestamps:{hash}"
-TTS_PERSIST: Final[str] = "tts:persist"
+TTS_AUDIO_META: Final[str] = "tts:audio_meta:{hash}"  # AudioMeta JSON, same TTL as tts:audio
+TTS_TIMESTAMPS_LEGACY: Final[str] = "tts:timestamps:{hash}"  # bare timestamps JSON from gateways predating AudioMeta
+TTS_AUDIO_BUFFER: Final[str] = "tts:audio_buffer"  # zset: variant_hash -> expiry (ms) of its tts:audio entry
+TTS_AUDIO_BUFFER_SIZES: Final[str] = "tts:audio_buffer:sizes"  # hash: variant_hash -> audio + meta bytes
+TTS_AUDIO_BUFFER_BYTES: Final[str] = "tts:audio_buffer:bytes"  # counter: sum of tts:audio_buffer:sizes
+TTS_VARIANT_DONE: Final[str] = "tts:variant_done:{hash}"  # pubsub: finalized BlockStatus, for synthesize_and_wait
+TTS_PERSIST: Final[str] = "tts:persist"  # list: "variant_hash|usage_multiplier" awaiting SQLite
+TTS_TRENDING: Final[str] = "tts:trending"  # zset: "document_id|model|voice" -> decayed listener count (public docs)
+TTS_TRENDING_FRONTIER: Final[str] = "tts:trending:frontier"  # hash: same member -> furthest block requested
+TTS_TRENDING_SEEN: Final[str] = "tts:trending:seen:{member}:{user_id}"  # listener already counted this half-life
+TTS_TRENDING_DECAYED_AT: Final[str] = "tts:trending:decayed_at"  # epoch seconds the scores were last decayed to
 TTS_PROCESSING: Final[str] = "tts:processing:{worker_id}"
+TTS_LEASES: Final[str] = "tts:leases"  # sorted set: "{processing_key}|{job_id}" -> deadline
+TTS_FENCES: Final[str] = "tts:fences"  # hash: job_id -> fencing token of the current lease (counter at :seq)
 TTS_DLQ: Final[str] = "tts:dlq:{model}"
 
 YOLO_QUEUE: Final[str] = "yolo:queue"  # sorted set: job_id -> timestamp
 YOLO_JOBS: Final[str] = "yolo:jobs"  # hash: job_id -> job_json
 YOLO_PROCESSING: Final[str] = "yolo:processing:{worker_id}"
+YOLO_LEASES: Final[str] = "yolo:leases"  # sorted set: "{processing_key}|{job_id}" -> deadline
 YOLO_DLQ: Final[str] = "yolo:dlq"
 YOLO_RESULT: Final[str] = "yolo:result:{job_id}"  # list for BRPOP result delivery
 
+# Seconds a worker may hold a job before the visibility scanner requeues it.
+# Workers write the deadline, so these live here rather than in the gateway.
+# For TTS this is the minimum budget; workers scale it with text length (see tts_loop).
+TTS_VISIBILITY_TIMEOUT_S: Final[int] = 20
+YOLO_VISIBILITY_TIMEOUT_S: Final[int] = 10
+
+PROFILE_RESULT: Final[str] = "profile:{target}"  # collapsed stacks from a SIGUSR1 worker profile
+LEADER_LEASE: Final[str] = "leader:{name}"  # string: holder token, PX-expiring lease for a singleton loop
+
 
 def get_queue_name(model: str) -> str:
     return TTS_QUEUE.format(model=model)
@@ -93,11 +126,38 @@ class SynthesisJob(BaseModel):
 class SynthesisResult(BaseModel):
     audio: Annotated[bytes, annotated_types.MaxLen(10 * 1024 * 1024)]
     duration_ms: int
-    word_timestamps_json: str | None = None
+    word_timestamps: str | None = None  # base64, yapit.word_timestamps encoding
+
+
+class AudioMeta(BaseModel):
+    """What a player needs alongside a block's audio; cached in the same record."""
+
+    duration_ms: int | None = None
+    word_timestamps: str | None = None  # base64, yapit.word_timestamps encoding
+    word_timestamps_json: str | None = None  # records from before the compact encoding
+
+    @classmethod
+    def from_cache(cls, raw: bytes) -> "AudioMeta":
+        # Migrated "{hash}:ts" rows hold the bare timestamps list
+        if raw.startswith(b"["):
+            return cls(word_timestamps_json=raw.decode())
+        return cls.model_validate_json(raw)
+
+    def compact_timestamps(self) -> str | None:
+        if self.word_timestamps is None and self.word_timestamps_json:
+            return encode_b64(json.loads(self.word_timestamps_json))
+        return self.word_timestamps
+
+    def timestamps_json(self) -> str | None:
+        if self.word_timestamps_json is None and self.word_timestamps:
+            return json.dumps(decode_b64(self.word_timestamps))
+        return self.word_timestamps_json
 
 
 class WorkerResult(BaseModel):
-    """Pushed to tts:results by workers. Contains everything for finalization."""
+    """Added to tts:results:stream by workers (the tts:results list only carries
+    results from workers predating the stream). Contains everything for finalization.
+    """
 
     job_id: uuid.UUID
     variant_hash: str
@@ -115,9 +175,12 @@ class WorkerResult(BaseModel):
 
     audio_base64: str | None = None
     duration_ms: int | None = None
-    word_timestamps_json: str | None = None
+    word_timestamps: str | None = None  # base64, yapit.word_timestamps encoding
+    word_timestamps_json: str | None = None  # from workers predating the compact encoding
     error: str | None = None
     error_detail: str | None = None
+    lease_token: int | None = None  # fencing token of the lease the job ran under; None = not leased
+    cancelled: bool = False  # stopped early because every block waiting on it was skipped
 
 
 def build_tts_dlq_error(job_json: str, error: str, worker_id: str = "dlq") -> "WorkerResult":
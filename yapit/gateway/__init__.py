@@ -1,8 +1,10 @@
 import asyncio
 import datetime as dt
+from collections.abc import Callable, Coroutine
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any
 
 import redis.asyncio as redis
 from fastapi import FastAPI, Request
@@ -15,8 +17,13 @@ from sqlalchemy import func
 from sqlmodel import col, delete, select
 
 from yapit.contracts import (
+    TTS_FENCES,
     TTS_JOBS,
+    TTS_LEASES,
+    TTS_VISIBILITY_TIMEOUT_S,
     YOLO_JOBS,
+    YOLO_LEASES,
+    YOLO_VISIBILITY_TIMEOUT_S,
 )
 from yapit.gateway.api.v1 import routers as v1_routers
 from yapit.gateway.api_tts_dispatcher import run_api_tts_dispatcher
@@ -40,6 +47,7 @@ from yapit.gateway.logging_config import (
     configure_logging,
     unhandled_exception_handler,
 )
+from yapit.gateway.loop_monitor import run_blocking_call_detector, run_loop_lag_monitor
 from yapit.gateway.markdown.transformer import DocumentTransformer
 from yapit.gateway.metrics import init_metrics_db, start_metrics_writer, stop_metrics_writer
 from yapit.gateway.openai_tts_adapter import OpenAITTSAdapter
@@ -47,16 +55,17 @@ from yapit.gateway.rate_limit import limiter
 from yapit.gateway.result_consumer import run_result_consumer
 from yapit.gateway.stack_auth import close_stack_auth_client, init_stack_auth_client
 from yapit.gateway.storage import ImageStorage
-from yapit.gateway.supervision import supervised
+from yapit.gateway.supervision import host_scoped, run_as_leader, supervised
+from yapit.gateway.trending import run_trending_warmer
+from yapit.gateway.variant_completions import VariantCompletions
 from yapit.gateway.visibility_scanner import run_visibility_scanner
 
-# Scanner constants
-TTS_VISIBILITY_TIMEOUT_S = 20
-YOLO_VISIBILITY_TIMEOUT_S = 10
-VISIBILITY_SCAN_INTERVAL_S = 15
+# Scanner constants (visibility timeouts are in contracts — workers write the deadlines)
+VISIBILITY_SCAN_INTERVAL_S = 5
 MAX_RETRIES = 3
 USAGE_LOG_RETENTION_DAYS = 31
 GUEST_DOC_TTL_DAYS = 30
+CACHE_MAINTENANCE_INTERVAL_S = 10
 EXTRACTION_PROMPT_PATH = Path(__file__).parent / "document" / "prompts" / "extraction.txt"
 
 
@@ -73,6 +82,7 @@ async def lifespan(app: FastAPI):
 
     app.state.redis_client = await redis.from_url(settings.redis_url, decode_responses=False)
     app.state.audio_cache = create_cache(settings.audio_cache_type, settings.audio_cache_config)
+    app.state.variant_completions = VariantCompletions(app.state.redis_client)
     app.state.document_cache = create_cache(settings.document_cache_type, settings.document_cache_config)
     app.state.extraction_cache = create_cache(settings.extraction_cache_type, settings.extraction_cache_config)
     app.state.image_storage = create_image_storage(settings)
@@ -115,48 +125,67 @@ async def lifespan(app: FastAPI):
         app.state.ai_extractor = None
 
     background_tasks: list[asyncio.Task] = []
+    redis_client = app.state.redis_client
 
-    # TTS result consumer (hot path: Redis SET + notify, no SQLite, no Postgres)
+    def singleton(
+        name: str, loop_factory: Callable[[], Coroutine[Any, Any, None]], lease_name: str | None = None
+    ) -> asyncio.Task:
+        """Loops that must not run twice: one instance cluster-wide (per host for SQLite-bound ones)."""
+        return asyncio.create_task(supervised(name, run_as_leader(redis_client, lease_name or name, loop_factory)))
+
+    background_tasks.append(asyncio.create_task(supervised("loop-lag-monitor", run_loop_lag_monitor())))
+    if settings.loop_block_threshold_ms:
+        background_tasks.append(
+            asyncio.create_task(
+                supervised("blocking-call-detector", run_blocking_call_detector(settings.loop_block_threshold_ms))
+            )
+        )
+
+    # TTS result consumer (hot path: Redis SET + notify, no Postgres; SQLite only past the buffer cap)
     result_consumer_task = asyncio.create_task(
-        supervised("result-consumer", run_result_consumer(app.state.redis_client))
+        supervised("result-consumer", run_result_consumer(app.state.redis_client, app.state.audio_cache))
     )
     background_tasks.append(result_consumer_task)
 
     # Cache persister (drain-on-wake: Redis audio → batched SQLite writes)
-    cache_persister_task = asyncio.create_task(
-        supervised("cache-persister", run_cache_persister(app.state.redis_client, app.state.audio_cache))
+    background_tasks.append(
+        singleton(
+            "cache-persister",
+            lambda: run_cache_persister(redis_client, app.state.audio_cache),
+            lease_name=host_scoped("cache-persister"),
+        )
     )
-    background_tasks.append(cache_persister_task)
 
     # TTS billing consumer (cold path: Postgres on own connection pool)
-    billing_consumer_task = asyncio.create_task(
-        supervised("billing-consumer", run_billing_consumer(app.state.redis_client, settings.database_url))
+    background_tasks.append(
+        singleton("billing-consumer", lambda: run_billing_consumer(redis_client, settings.database_url))
     )
-    background_tasks.append(billing_consumer_task)
 
     # TTS visibility scanner
-    tts_visibility_task = asyncio.create_task(
-        supervised(
+    background_tasks.append(
+        singleton(
             "tts-visibility",
-            run_visibility_scanner(
-                app.state.redis_client,
+            lambda: run_visibility_scanner(
+                redis_client,
+                leases_key=TTS_LEASES,
                 processing_pattern="tts:processing:*",
                 jobs_key=TTS_JOBS,
                 visibility_timeout_s=TTS_VISIBILITY_TIMEOUT_S,
                 max_retries=MAX_RETRIES,
                 scan_interval_s=VISIBILITY_SCAN_INTERVAL_S,
                 name="tts-visibility",
+                fences_key=TTS_FENCES,
             ),
         )
     )
-    background_tasks.append(tts_visibility_task)
 
     # YOLO visibility scanner
-    yolo_visibility_task = asyncio.create_task(
-        supervised(
+    background_tasks.append(
+        singleton(
             "yolo-visibility",
-            run_visibility_scanner(
-                app.state.redis_client,
+            lambda: run_visibility_scanner(
+                redis_client,
+                leases_key=YOLO_LEASES,
                 processing_pattern="yolo:processing:*",
                 jobs_key=YOLO_JOBS,
                 visibility_timeout_s=YOLO_VISIBILITY_TIMEOUT_S,
@@ -166,7 +195,6 @@ async def lifespan(app: FastAPI):
             ),
         )
     )
-    background_tasks.append(yolo_visibility_task)
 
     # OpenAI-compatible TTS dispatcher (any /v1/audio/speech endpoint)
     if settings.openai_tts_base_url and not settings.openai_tts_model:
@@ -192,22 +220,29 @@ async def lifespan(app: FastAPI):
         logger.info(f"OpenAI TTS dispatcher started ({settings.openai_tts_model} @ {settings.openai_tts_base_url})")
 
     all_caches = [app.state.audio_cache, app.state.document_cache, app.state.extraction_cache]
-    maintenance_task = asyncio.create_task(supervised("cache-maintenance", _cache_maintenance_task(all_caches)))
-    background_tasks.append(maintenance_task)
+    background_tasks.append(
+        singleton(
+            "cache-maintenance",
+            lambda: _cache_maintenance_task(all_caches),
+            lease_name=host_scoped("cache-maintenance"),
+        )
+    )
 
-    background_tasks.append(asyncio.create_task(supervised("usage-log-cleanup", _usage_log_cleanup_task())))
     background_tasks.append(
-        asyncio.create_task(supervised("guest-cleanup", _guest_cleanup_task(app.state.image_storage)))
+        singleton(
+            "trending-warmer",
+            lambda: run_trending_warmer(redis_client, app.state.audio_cache),
+            lease_name=host_scoped("trending-warmer"),
+        )
     )
 
+    background_tasks.append(singleton("usage-log-cleanup", _usage_log_cleanup_task))
+    background_tasks.append(singleton("guest-cleanup", lambda: _guest_cleanup_task(app.state.image_storage)))
+
     if settings.stripe_secret_key:
+        stripe_secret_key = settings.stripe_secret_key
         background_tasks.append(
-            asyncio.create_task(
-                supervised(
-                    "billing-sync",
-                    run_billing_sync_loop(settings.stripe_secret_key, app.state.redis_client),
-                )
-            )
+            singleton("billing-sync", lambda: run_billing_sync_loop(stripe_secret_key, redis_client))
         )
 
     # Batch extraction poller (only for extractors that support batch)
@@ -237,6 +272,8 @@ async def lifespan(app: FastAPI):
     for cache in all_caches:
         await cache.close()
 
+    await app.state.variant_completions.close()
+
     await close_stack_auth_client()
     await close_defuddle_client()
     await stop_metrics_writer()
@@ -245,15 +282,15 @@ async def lifespan(app: FastAPI):
 
 
 async def _cache_maintenance_task(caches: list[Cache]) -> None:
-    """Background task to vacuum caches if bloated."""
+    """Reclaim cache space in small idle-time steps (the first one converts a legacy file)."""
     await asyncio.sleep(60)
     while True:
         for cache in caches:
             try:
-                await cache.vacuum_if_needed(bloat_threshold=2.0)
+                await cache.maintenance_step()
             except Exception as e:
-                logger.exception(f"Cache vacuum failed: {e}")
-        await asyncio.sleep(86400)
+                logger.exception(f"Cache maintenance failed: {e}")
+        await asyncio.sleep(CACHE_MAINTENANCE_INTERVAL_S)
 
 
 async def _usage_log_cleanup_task() -> None:
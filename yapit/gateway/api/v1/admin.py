@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from yapit.contracts import PROFILE_RESULT
+from yapit.gateway.deps import AdminUser, RedisClient
+from yapit.profiler import ProfilerBusyError, profile
+
+router = APIRouter(prefix="/v1/admin", tags=["Admin"])
+
+MAX_PROFILE_SECONDS = 60
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile_gateway(
+    _admin: AdminUser,
+    seconds: float = Query(default=10, gt=0, le=MAX_PROFILE_SECONDS),
+) -> str:
+    """Sample this gateway process for `seconds` and return collapsed stacks (flamegraph input)."""
+    try:
+        return await profile(seconds)
+    except ProfilerBusyError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+
+
+@router.get("/profile/{worker_id}", response_class=PlainTextResponse)
+async def get_worker_profile(worker_id: str, _admin: AdminUser, redis: RedisClient) -> str:
+    """Last profile stored by a worker after `docker kill -s USR1 <container>`."""
+    collapsed = await redis.get(PROFILE_RESULT.format(target=worker_id))
+    if collapsed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No profile stored for {worker_id}")
+    return collapsed.decode()
@@ -11,13 +11,14 @@ from html import escape as html_escape
 from html import unescape as html_unescape
 from pathlib import Path
 from typing import Annotated, Literal
+from urllib.parse import quote
 from uuid import UUID, uuid4
 from xml.etree import ElementTree as ET
 
 import httpx
 import pymupdf
 from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request, Response, UploadFile, status
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from loguru import logger
 from pydantic import BaseModel, Field, HttpUrl, StringConstraints, ValidationError
 from sqlmodel import col, func, select
@@ -31,6 +32,7 @@ from yapit.contracts import (
     MAX_STORAGE_PAID,
     RATELIMIT_EXTRACTION,
 )
+from yapit.gateway.audiobook import document_chapters, stream_audiobook
 from yapit.gateway.auth import authenticate
 from yapit.gateway.cache import Cache
 from yapit.gateway.constants import SUPPORTED_WEB_MIME_TYPES, estimate_duration_ms
@@ -38,6 +40,7 @@ from yapit.gateway.db import create_session
 from yapit.gateway.deps import (
     AiExtractorConfigDep,
     AiExtractorDep,
+    AudioCache,
     AuthenticatedUser,
     CurrentDoc,
     DbSession,
@@ -48,6 +51,8 @@ from yapit.gateway.deps import (
     OptionalUser,
     RedisClient,
     SettingsDep,
+    get_model,
+    get_voice,
 )
 from yapit.gateway.document.batch import BatchJobInfo, BatchJobStatus, get_batch_job, save_batch_job, submit_batch_job
 from yapit.gateway.document.batch_poller import create_document_from_batch
@@ -66,13 +71,27 @@ from yapit.gateway.document.types import (
     cpu_executor,
 )
 from yapit.gateway.document.website import extract_website_content
-from yapit.gateway.domain_models import Document, DocumentMetadata, UsageType, UserPreferences, UserSubscription
+from yapit.gateway.domain_models import (
+    BlockVariant,
+    Document,
+    DocumentMetadata,
+    UsageType,
+    UserPreferences,
+    UserSubscription,
+)
 from yapit.gateway.exceptions import APIError, ResourceNotFoundError
 from yapit.gateway.metrics import log_error, log_event
 from yapit.gateway.rate_limit import limiter
 from yapit.gateway.reservations import create_reservation, release_reservation
 from yapit.gateway.stack_auth.users import User
 from yapit.gateway.storage import ImageStorage
+from yapit.gateway.synthesis import (
+    CachedResult,
+    ErrorResult,
+    cached_variants,
+    get_variant_durations,
+    request_synthesis,
+)
 from yapit.gateway.usage import check_usage_limit
 
 
@@ -1544,6 +1563,165 @@ async def get_document_blocks(document_id: UUID, db: DbSession, user: OptionalUs
     return _get_audio_blocks(document)
 
 
+class ManifestBlock(BaseModel):
+    idx: int
+    variant_hash: str
+    cached: bool
+    duration_ms: int  # actual once synthesized and billed, estimated otherwise
+    duration_estimated: bool
+    audio_url: str | None  # set when cached
+
+
+class AudioManifest(BaseModel):
+    document_id: UUID
+    model: str
+    voice: str
+    cached_blocks: int
+    total_duration_ms: int
+    blocks: list[ManifestBlock]
+
+
+@public_router.get("/{document_id}/audio-manifest")
+async def get_audio_manifest(
+    document_id: UUID,
+    model: str,
+    voice: str,
+    db: DbSession,
+    user: OptionalUser,
+    redis: RedisClient,
+    cache: AudioCache,
+) -> AudioManifest:
+    """Cache status, duration and audio URL of every block for one voice, in one response.
+
+    Lets a client start a fully cached document without walking its blocks over the
+    WebSocket; blocks that aren't cached are still requested there. Public docs need
+    no auth; private docs require ownership.
+    """
+    document = await _get_document_with_optional_auth(document_id, db, user)
+    audio_blocks = _get_audio_blocks(document)
+    tts_model = await get_model(db, model)
+    tts_voice = await get_voice(db, model, voice)
+
+    hashes = [
+        BlockVariant.get_hash(block.text, tts_model.slug, tts_voice.slug, tts_voice.parameters)
+        for block in audio_blocks
+    ]
+    unique = list(dict.fromkeys(hashes))
+    cached = await cached_variants(redis, cache, unique)
+    durations = await get_variant_durations(db, unique)
+
+    blocks = [
+        ManifestBlock(
+            idx=block.idx,
+            variant_hash=variant_hash,
+            cached=variant_hash in cached,
+            duration_ms=durations.get(variant_hash, block.est_duration_ms),
+            duration_estimated=variant_hash not in durations,
+            audio_url=CachedResult(variant_hash=variant_hash).audio_url if variant_hash in cached else None,
+        )
+        for block, variant_hash in zip(audio_blocks, hashes, strict=True)
+    ]
+    return AudioManifest(
+        document_id=document.id,
+        model=tts_model.slug,
+        voice=tts_voice.slug,
+        cached_blocks=sum(block.cached for block in blocks),
+        total_duration_ms=sum(block.duration_ms for block in blocks),
+        blocks=blocks,
+    )
+
+
+AUDIOBOOK_QUEUE_BATCH = 200  # missing blocks queued per export request
+AUDIOBOOK_RETRY_AFTER_S = 30
+
+
+class AudiobookPending(BaseModel):
+    missing_blocks: int
+    queued_blocks: int  # by this request; the rest on the next ones
+
+
+@router.get(
+    "/{document_id}/audiobook",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"audio/ogg": {}}}, 202: {"model": AudiobookPending}},
+)
+@limiter.limit("10/minute")
+async def export_audiobook(
+    request: Request,
+    document_id: UUID,
+    model: str,
+    voice: str,
+    db: DbSession,
+    user: AuthenticatedUser,
+    redis: RedisClient,
+    cache: AudioCache,
+    settings: SettingsDep,
+    allow_missing: bool = False,
+) -> Response:
+    """The whole document as one Ogg Opus file, with a chapter per heading.
+
+    Streams the cached block audio spliced together (see audiobook.py). While blocks
+    are missing, queues them as background jobs (up to AUDIOBOOK_QUEUE_BATCH per call,
+    billed as usual) and returns 202; call again after Retry-After, the manifest shows
+    progress. allow_missing exports what's cached, e.g. when a block never yields audio.
+    """
+    document = await _get_document_with_optional_auth(document_id, db, user)
+    audio_blocks = _get_audio_blocks(document)
+    tts_model = await get_model(db, model)
+    tts_voice = await get_voice(db, model, voice)
+
+    hashes = [
+        BlockVariant.get_hash(block.text, tts_model.slug, tts_voice.slug, tts_voice.parameters)
+        for block in audio_blocks
+    ]
+    cached = await cached_variants(redis, cache, list(dict.fromkeys(hashes)))
+    missing = [block for block, variant_hash in zip(audio_blocks, hashes, strict=True) if variant_hash not in cached]
+
+    if missing and not allow_missing:
+        for block in missing[:AUDIOBOOK_QUEUE_BATCH]:
+            result = await request_synthesis(
+                db=db,
+                redis=redis,
+                cache=cache,
+                user_id=user.id,
+                text=block.text,
+                model=tts_model,
+                voice=tts_voice,
+                billing_enabled=settings.billing_enabled,
+                document_id=document.id,
+                block_idx=block.idx,
+                track_for_websocket=False,
+                background=True,
+            )
+            if isinstance(result, ErrorResult):
+                raise HTTPException(status_code=status.HTTP_402_PAYMENT_REQUIRED, detail=result.error)
+        pending = AudiobookPending(missing_blocks=len(missing), queued_blocks=min(len(missing), AUDIOBOOK_QUEUE_BATCH))
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=pending.model_dump(),
+            headers={"Retry-After": str(AUDIOBOOK_RETRY_AFTER_S)},
+        )
+
+    blocks = [(block.idx, h) for block, h in zip(audio_blocks, hashes, strict=True) if h in cached]
+    if not blocks:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No audio cached for this voice")
+    chapters = document_chapters(document)
+    await log_event(
+        "audiobook_export",
+        model_slug=tts_model.slug,
+        voice_slug=tts_voice.slug,
+        user_id=user.id,
+        document_id=str(document.id),
+        data={"blocks": len(blocks), "missing": len(missing), "chapters": len(chapters)},
+    )
+    filename = quote(f"{document.title or 'audiobook'}.opus")
+    return StreamingResponse(
+        stream_audiobook(redis, cache, blocks, chapters),
+        media_type="audio/ogg",
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{filename}"},
+    )
+
+
 class PositionUpdate(BaseModel):
     block_idx: int
     playing: bool = False
@@ -7,7 +7,15 @@ from sqlmodel import col, select
 
 from yapit.gateway.auth import authenticate
 from yapit.gateway.config import Settings, get_settings
-from yapit.gateway.deps import AudioCache, AuthenticatedUser, CurrentTTSModel, CurrentVoice, DbSession, RedisClient
+from yapit.gateway.deps import (
+    AudioCache,
+    AuthenticatedUser,
+    Completions,
+    CurrentTTSModel,
+    CurrentVoice,
+    DbSession,
+    RedisClient,
+)
 from yapit.gateway.domain_models import TTSModel
 from yapit.gateway.preview_sentences import N_PREVIEW_SENTENCES, preview_sentences
 from yapit.gateway.synthesis import synthesize_and_wait
@@ -115,6 +123,7 @@ async def get_voice_preview(
     db: DbSession,
     redis: RedisClient,
     cache: AudioCache,
+    completions: Completions,
     user: AuthenticatedUser,
     model: CurrentTTSModel,
     voice: CurrentVoice,
@@ -135,8 +144,8 @@ async def get_voice_preview(
         billing_enabled=settings.billing_enabled,
         document_id=VOICE_PREVIEW_DOCUMENT_ID,
         block_idx=sentence_idx,
+        completions=completions,
         timeout_seconds=15.0,
-        poll_interval=0.1,
     )
 
     return VoicePreviewResponse(
@@ -0,0 +1,93 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from sqlmodel import select
+
+from yapit.gateway.auth import authenticate
+from yapit.gateway.bulk_synthesis import BulkJob, bulk_job_events, get_bulk_job, start_bulk_job
+from yapit.gateway.deps import (
+    AudioCache,
+    AuthenticatedUser,
+    Completions,
+    DbSession,
+    RedisClient,
+    SettingsDep,
+    get_model,
+    get_voice,
+)
+from yapit.gateway.domain_models import Document
+from yapit.gateway.rate_limit import limiter
+from yapit.gateway.stack_auth.users import User
+
+router = APIRouter(prefix="/v1/synthesis-jobs", tags=["Synthesis jobs"], dependencies=[Depends(authenticate)])
+
+
+class BulkJobCreateRequest(BaseModel):
+    document_id: UUID
+    model: str
+    voice: str
+    block_start: int = Field(default=0, ge=0)
+    block_end: int | None = Field(default=None, gt=0)  # exclusive, None = to the end
+
+
+@router.post("", status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("10/minute")
+async def create_synthesis_job(
+    request: Request,
+    req: BulkJobCreateRequest,
+    db: DbSession,
+    user: AuthenticatedUser,
+    redis: RedisClient,
+    cache: AudioCache,
+    completions: Completions,
+    settings: SettingsDep,
+) -> BulkJob:
+    """Synthesize a document, or blocks [block_start, block_end) of it, in the background.
+
+    Uncached blocks are queued behind live listeners and billed as usual; 402 if they
+    exceed the remaining usage. Follow progress with GET /{job_id} or /{job_id}/events.
+    """
+    doc = (await db.exec(select(Document).where(Document.id == req.document_id))).first()
+    if not doc or (doc.user_id != user.id and not doc.is_public):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    model = await get_model(db, req.model)
+    voice = await get_voice(db, req.model, req.voice)
+    try:
+        n_blocks = len(doc.audio_texts)
+    except ValidationError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="This document was created with an older version and is no longer compatible. Please re-upload it.",
+        )
+    blocks = range(req.block_start, min(req.block_end or n_blocks, n_blocks))
+    if not blocks:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Block range is empty")
+
+    return await start_bulk_job(
+        db, redis, cache, completions, user.id, doc, model, voice, blocks, billing_enabled=settings.billing_enabled
+    )
+
+
+async def _get_own_job(redis: RedisClient, job_id: str, user: User) -> BulkJob:
+    job = await get_bulk_job(redis, job_id)
+    if job is None or job.user_id != user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Synthesis job not found")
+    return job
+
+
+@router.get("/{job_id}")
+async def get_synthesis_job(job_id: str, redis: RedisClient, user: AuthenticatedUser) -> BulkJob:
+    return await _get_own_job(redis, job_id, user)
+
+
+@router.get("/{job_id}/events", response_class=StreamingResponse)
+async def stream_synthesis_job_events(job_id: str, redis: RedisClient, user: AuthenticatedUser) -> StreamingResponse:
+    """Progress as server-sent events: one `data:` line with the job per change, until it finishes."""
+    await _get_own_job(redis, job_id, user)
+    return StreamingResponse(
+        bulk_job_events(redis, job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
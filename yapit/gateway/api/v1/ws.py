@@ -1,45 +1,117 @@
 import asyncio
+import contextlib
 import json
+import re
+import secrets
 import time
 import uuid
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from typing import Literal, cast
 
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+import msgpack
+from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
 from loguru import logger
 from pydantic import BaseModel, Field, ValidationError
 from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+from redis.exceptions import RedisError
 from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette.applications import Starlette
 
 from yapit.contracts import (
     MAX_TTS_BLOCKS_PER_MINUTE,
     RATELIMIT_TTS,
+    TTS_AUDIO_META,
+    TTS_CANCEL,
     TTS_INFLIGHT,
     TTS_JOB_INDEX,
     TTS_JOBS,
     TTS_PENDING,
-    TTS_TIMESTAMPS_CACHE,
-    SynthesisJob,
+    TTS_STATUS_LOG,
+    TTS_STATUS_LOG_TTL_S,
+    TTS_WS_SESSION,
+    AudioMeta,
     get_pubsub_channel,
-    get_queue_name,
 )
 from yapit.gateway.auth import authenticate_ws
 from yapit.gateway.backoff import Backoff
 from yapit.gateway.cache import Cache
 from yapit.gateway.config import Settings, get_settings
+from yapit.gateway.constants import estimate_duration_ms
 from yapit.gateway.db import create_session
 from yapit.gateway.deps import get_model, get_voice
-from yapit.gateway.domain_models import Document
+from yapit.gateway.domain_models import BlockVariant, Document, TTSModel, Voice
 from yapit.gateway.exceptions import ResourceNotFoundError
 from yapit.gateway.metrics import log_error, log_event
 from yapit.gateway.stack_auth.users import User
-from yapit.gateway.synthesis import CachedResult, ErrorResult, request_synthesis
+from yapit.gateway.synthesis import CachedResult, ErrorResult, get_variant_durations, request_synthesis
+from yapit.gateway.trending import record_listen
+from yapit.word_timestamps import decode_b64
 
 router = APIRouter(tags=["websocket"])
 
-BlockStatus = Literal["queued", "processing", "cached", "skipped", "error"]
+BlockStatus = Literal["queued", "processing", "cached", "skipped", "error", "cancelled"]
 
 PUBSUB_MAX_BACKOFF_S = 5.0  # pub/sub drops messages while nobody is listening
+CANCEL_TTL_S = 600  # outlives any job's lease budget
+
+MAX_PREFETCH_BUFFER_S = 600
+MAX_PREFETCH_BLOCKS = 32  # same bound as one synthesize message
+
+WS_SESSION_TTL_S = 3600  # while connected; a dropped session stays resumable for TTS_STATUS_LOG_TTL_S
+REPLAY_OVERLAP_S = 10  # statuses sent just before the drop may never have arrived
+
+# Cursor eviction in one atomic round trip — users scrubbing through a document fire
+# it constantly. Per pending block, the job index entry ("job_id|queue|variant_hash")
+# says where the job is without decoding it:
+# - still queued (ZREM succeeds): drop the job, and its inflight key if it owns it,
+#   so the next request for the variant queues a fresh job
+# - already pulled: add the block to the job's cancel set (cooperative cancellation)
+# Entries written before the queue was stored (bare job_id) are treated as pulled.
+# Blocks in [keep_from, keep_to) stay pending: a prefetch session's window.
+# KEYS: pending set, job index, jobs hash. ARGV: index key prefix, inflight key
+# prefix, cancel key prefix, cancel TTL, keep_from, keep_to. Returns the evicted
+# block indices.
+# Single-node Redis only: the queue, inflight and cancel keys it touches come out of
+# the job index, so they can't be declared in KEYS up front, and Redis Cluster would
+# reject them whenever they hash to another slot.
+_EVICT_PENDING_LUA = """
+local keep_from, keep_to = tonumber(ARGV[5]), tonumber(ARGV[6])
+local evicted = {}
+for _, idx in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    local block_idx = tonumber(idx)
+    if block_idx < keep_from or block_idx >= keep_to then
+        evicted[#evicted + 1] = idx
+    end
+end
+if #evicted == 0 then
+    return evicted
+end
+redis.call('SREM', KEYS[1], unpack(evicted))
+for _, idx in ipairs(evicted) do
+    local index_key = ARGV[1] .. idx
+    local entry = redis.call('HGET', KEYS[2], index_key)
+    if entry then
+        redis.call('HDEL', KEYS[2], index_key)
+        local job_id, queue, variant_hash = string.match(entry, '^([^|]+)|([^|]+)|(.*)$')
+        if job_id and redis.call('ZREM', queue, job_id) == 1 then
+            redis.call('HDEL', KEYS[3], job_id)
+            local inflight_key = ARGV[2] .. variant_hash
+            if redis.call('GET', inflight_key) == job_id then
+                redis.call('DEL', inflight_key)
+            end
+        else
+            local cancel_key = ARGV[3] .. (job_id or entry)
+            redis.call('SADD', cancel_key, index_key)
+            redis.call('EXPIRE', cancel_key, ARGV[4])
+        end
+    end
+end
+return evicted
+"""
+_EVICT_PENDING = AsyncScript(None, _EVICT_PENDING_LUA.encode())  # built once; each call passes its client
 
 
 class WSSynthesizeRequest(BaseModel):
@@ -56,6 +128,45 @@ class WSCursorMoved(BaseModel):
     cursor: int
 
 
+class WSPrefetchRequest(BaseModel):
+    """Opens (or replaces) the connection's prefetch session."""
+
+    type: Literal["prefetch"] = "prefetch"
+    document_id: uuid.UUID
+    model: str
+    voice: str
+    cursor: int = Field(ge=0)
+    buffer_seconds: float = Field(gt=0, le=MAX_PREFETCH_BUFFER_S)
+
+
+@dataclass
+class _SynthesisTarget:
+    doc: Document
+    model: TTSModel
+    voice: Voice
+    audio_texts: list[str]
+
+
+# Statuses after which a block has no audio and no job: prefetch requests it again
+_UNFINISHED_STATUSES = ("error", "skipped", "cancelled")
+_UNFINISHED_STATUS = re.compile(rb'"status":"(?:error|skipped|cancelled)"')
+
+
+@dataclass
+class _PrefetchSession:
+    request: WSPrefetchRequest
+    requested: set[int] = field(default_factory=set)  # blocks requested inside the current window
+    target: _SynthesisTarget | None = None  # loaded on the first top-up, reused on every cursor_moved
+
+    def forget_unfinished(self, published: bytes) -> None:
+        """Drop a block from `requested` when its published status ends it without audio."""
+        if not _UNFINISHED_STATUS.search(published):
+            return
+        status = WSBlockStatus.model_validate_json(published)
+        if status.document_id == self.request.document_id:
+            self.requested.discard(status.block_idx)
+
+
 class WSBlockStatus(BaseModel):
     type: Literal["status"] = "status"
     document_id: uuid.UUID
@@ -66,10 +177,60 @@ class WSBlockStatus(BaseModel):
     recoverable: bool = True
     model_slug: str | None = None
     voice_slug: str | None = None
-    word_timestamps: str | None = None
+    word_timestamps: str | None = None  # JSON list of {"t","s","e"}
+    word_timestamps_compact: str | None = None  # base64, yapit.word_timestamps encoding
     duration_ms: int | None = None
 
 
+class WSSession(BaseModel):
+    """First frame on every connection: the id to resume with, and whether this resumed one."""
+
+    type: Literal["session"] = "session"
+    session_id: str
+    resumed: bool = False
+    pending: dict[uuid.UUID, list[int]] = Field(default_factory=dict)  # resumed: blocks still in flight
+
+
+class _SessionState(BaseModel):
+    """What resuming a dropped connection needs (tts:ws_session:{session_id})."""
+
+    user_id: str
+    document_ids: list[uuid.UUID] = Field(default_factory=list)
+    prefetch: WSPrefetchRequest | None = None
+    disconnected_at: float | None = None  # unset if the gateway died with the connection
+
+
+class WSBlockStatuses(BaseModel):
+    """Statuses of all blocks one request resolved, in one frame (`?statuses=batched`)."""
+
+    type: Literal["statuses"] = "statuses"
+    document_id: uuid.UUID
+    statuses: list[WSBlockStatus]
+
+
+@dataclass(frozen=True)
+class _WireOptions:
+    """What a connection negotiated on connect."""
+
+    compact: bool = False  # word_timestamps_compact instead of the word_timestamps JSON string
+    batched: bool = False  # one `statuses` frame per request instead of one `status` per block
+    msgpack: bool = False  # every frame goes out as binary msgpack, null fields left out
+
+
+_JSON_WIRE = _WireOptions()
+
+# Published statuses carry compact timestamps (the result consumer serializes them
+# with WSBlockStatus.model_dump_json, so both fields are always there). Connections
+# that want the JSON string get just that field swapped.
+_COMPACT_TIMESTAMPS_MARKER = b'"word_timestamps_compact":"'
+_NO_JSON_TIMESTAMPS = b'"word_timestamps":null'
+
+
+class WSError(BaseModel):
+    type: Literal["error"] = "error"
+    error: str
+
+
 class WSEvicted(BaseModel):
     type: Literal["evicted"] = "evicted"
     document_id: uuid.UUID
@@ -81,8 +242,35 @@ async def tts_websocket(
     ws: WebSocket,
     user: User = Depends(authenticate_ws),
     settings: Settings = Depends(get_settings),
+    timestamps: Literal["json", "compact"] = Query("json"),
+    statuses: Literal["single", "batched"] = Query("single"),
+    encoding: Literal["json", "msgpack"] = Query("json"),
+    resume: str | None = Query(None),
 ):
-    """WebSocket endpoint for TTS control."""
+    """WebSocket endpoint for TTS control.
+
+    `?timestamps=compact` opts into `word_timestamps_compact` (binary, base64) on
+    status messages instead of the `word_timestamps` JSON string. A client that
+    reads whichever of the two is present works against either kind of server.
+
+    `?statuses=batched` answers each synthesize (or prefetch top-up) with one
+    `statuses` frame covering every block it resolved, instead of one `status`
+    frame per block. `?encoding=msgpack` sends every frame, relayed statuses and
+    errors included, as binary msgpack instead of JSON text. Client messages are
+    always JSON.
+
+    Instead of sending `synthesize` batches ahead of playback, a client can open a
+    prefetch session (`prefetch`: cursor, voice, buffer_seconds). The gateway then
+    keeps that much audio ahead of the cursor requested, and the client reports
+    playback progress and skips alike with `cursor_moved`.
+
+    Every connection starts with a `session` frame. A client that reconnects with
+    `?resume=<session_id>` within TTS_STATUS_LOG_TTL_S of the drop is resubscribed
+    to the session's documents and gets the statuses published meanwhile replayed,
+    then a `session` frame listing the blocks still in flight. Their jobs were never
+    dropped, so only blocks in neither need requesting again.
+    """
+    wire = _WireOptions(compact=timestamps == "compact", batched=statuses == "batched", msgpack=encoding == "msgpack")
     app = cast(Starlette, ws.app)
     redis: Redis = app.state.redis_client
     cache: Cache = app.state.audio_cache
@@ -95,6 +283,19 @@ async def tts_websocket(
     pubsub = redis.pubsub()
     subscribed_docs: set[str] = set()
     pubsub_task: asyncio.Task | None = None
+    prefetch: _PrefetchSession | None = None
+
+    state = await _load_session(redis, user, resume)
+    resumed = state is not None
+    if resume is None or state is None:
+        session_id, state = secrets.token_urlsafe(16), _SessionState(user_id=user.id)
+        await _save_session(redis, session_id, state)
+    else:
+        session_id = resume
+
+    def on_published(data: bytes) -> None:
+        if prefetch is not None:
+            prefetch.forget_unfinished(data)
 
     async def ensure_doc_subscribed(document_id: uuid.UUID) -> None:
         nonlocal pubsub_task
@@ -104,9 +305,31 @@ async def tts_websocket(
             subscribed_docs.add(doc_str)
             # Start listener after first subscription so listen() blocks properly
             if pubsub_task is None:
-                pubsub_task = asyncio.create_task(_pubsub_listener(ws, pubsub))
+                pubsub_task = asyncio.create_task(_pubsub_listener(ws, pubsub, wire, on_published))
+            if document_id not in state.document_ids:
+                state.document_ids.append(document_id)
+                await _save_session(redis, session_id, state)
 
     try:
+        pending: dict[uuid.UUID, list[int]] = {}
+        if resumed:
+            # Subscribe before replaying, so nothing falls between the two
+            for document_id in state.document_ids:
+                await ensure_doc_subscribed(document_id)
+            if state.prefetch is not None:
+                prefetch = _PrefetchSession(state.prefetch)
+            replayed, pending = await _replay_session(ws, redis, user, state, wire)
+            await log_event(
+                "ws_resume",
+                user_id=user.id,
+                data={
+                    "documents": len(state.document_ids),
+                    "replayed": replayed,
+                    "pending": sum(map(len, pending.values())),
+                },
+            )
+        await _send_frame(ws, WSSession(session_id=session_id, resumed=resumed, pending=pending), wire)
+
         while True:
             raw = await ws.receive_text()
             try:
@@ -116,24 +339,35 @@ async def tts_websocket(
                 if msg_type == "synthesize":
                     msg = WSSynthesizeRequest.model_validate(data)
                     await ensure_doc_subscribed(msg.document_id)
-                    await _handle_synthesize(ws, msg, user, redis, cache, settings)
+                    await _handle_synthesize(ws, msg, user, redis, cache, settings, wire)
+                elif msg_type == "prefetch":
+                    msg = WSPrefetchRequest.model_validate(data)
+                    await ensure_doc_subscribed(msg.document_id)
+                    prefetch = _PrefetchSession(msg)
+                    state.prefetch = msg
+                    await _save_session(redis, session_id, state)
+                    await _handle_prefetch(ws, prefetch, user, redis, cache, settings, wire)
                 elif msg_type == "cursor_moved":
                     msg = WSCursorMoved.model_validate(data)
-                    await _handle_cursor_moved(ws, msg, user, redis)
+                    if prefetch is not None and prefetch.request.document_id == msg.document_id:
+                        prefetch.request = prefetch.request.model_copy(update={"cursor": max(msg.cursor, 0)})
+                        await _handle_prefetch(ws, prefetch, user, redis, cache, settings, wire)
+                    else:
+                        await _handle_cursor_moved(ws, msg, user, redis, wire)
                 else:
-                    await ws.send_json({"type": "error", "error": f"Unknown message type: {msg_type}"})
+                    await _send_frame(ws, WSError(error=f"Unknown message type: {msg_type}"), wire)
 
             except ValidationError as e:
                 ws_log.error(f"WS validation error: {e}")
-                await ws.send_json({"type": "error", "error": str(e)})
+                await _send_frame(ws, WSError(error=str(e)), wire)
             except json.JSONDecodeError:
                 ws_log.error("WS invalid JSON")
-                await ws.send_json({"type": "error", "error": "Invalid JSON"})
+                await _send_frame(ws, WSError(error="Invalid JSON"), wire)
             except Exception as e:
                 ws_log.exception(f"Unexpected error handling WS message: {e}")
                 await log_error(f"WS message handling error: {e}", user_id=user.id)
                 try:
-                    await ws.send_json({"type": "error", "error": "Internal server error"})
+                    await _send_frame(ws, WSError(error="Internal server error"), wire)
                 except Exception:
                     pass
 
@@ -149,6 +383,43 @@ async def tts_websocket(
             except asyncio.CancelledError:
                 pass
         await pubsub.close()
+        # Pending jobs carry on; the session stays resumable while their statuses are logged
+        state.prefetch = prefetch.request if prefetch is not None else None
+        state.disconnected_at = time.time()
+        with contextlib.suppress(RedisError):
+            await _save_session(redis, session_id, state, ttl=TTS_STATUS_LOG_TTL_S)
+
+
+async def _load_session(redis: Redis, user: User, session_id: str | None) -> _SessionState | None:
+    if session_id is None:
+        return None
+    raw = await redis.get(TTS_WS_SESSION.format(session_id=session_id))
+    if raw is None:
+        return None
+    state = _SessionState.model_validate_json(raw)
+    return state if state.user_id == user.id else None
+
+
+async def _save_session(redis: Redis, session_id: str, state: _SessionState, ttl: int = WS_SESSION_TTL_S) -> None:
+    await redis.set(TTS_WS_SESSION.format(session_id=session_id), state.model_dump_json(), ex=ttl)
+
+
+async def _replay_session(
+    ws: WebSocket, redis: Redis, user: User, state: _SessionState, wire: _WireOptions
+) -> tuple[int, dict[uuid.UUID, list[int]]]:
+    """Relay the statuses logged since the drop; returns how many, and the blocks still pending."""
+    since_ms = int((state.disconnected_at - REPLAY_OVERLAP_S) * 1000) if state.disconnected_at else 0
+    replayed = 0
+    pending: dict[uuid.UUID, list[int]] = {}
+    for document_id in state.document_ids:
+        entries = await redis.xrange(TTS_STATUS_LOG.format(user_id=user.id, document_id=document_id), min=str(since_ms))
+        for _, fields in entries:
+            await _send_frame(ws, fields[b"data"], wire)
+        replayed += len(entries)
+        in_flight = await redis.smembers(TTS_PENDING.format(user_id=user.id, document_id=document_id))
+        if in_flight:
+            pending[document_id] = sorted(int(idx) for idx in in_flight)
+    return replayed, pending
 
 
 async def _handle_synthesize(
@@ -158,111 +429,228 @@ async def _handle_synthesize(
     redis: Redis,
     cache: Cache,
     settings: Settings,
+    wire: _WireOptions = _JSON_WIRE,
 ):
     """Handle synthesize request - queue blocks for synthesis."""
+    if await _rate_limited(ws, redis, user, len(msg.block_indices), wire):
+        return
+
+    async with create_session() as db:
+        target = await _load_target(ws, db, user, msg.document_id, msg.model, msg.voice, wire)
+        if target is not None:
+            await _synthesize_blocks(ws, db, user, redis, cache, settings, wire, target, msg.block_indices)
+
+
+async def _rate_limited(ws: WebSocket, redis: Redis, user: User, n_blocks: int, wire: _WireOptions) -> bool:
     # Rate limit TTS blocks per user (protects unlimited Kokoro from flooding)
     rate_key = RATELIMIT_TTS.format(user_id=user.id)
-    count = await redis.incrby(rate_key, len(msg.block_indices))
-    if count == len(msg.block_indices):
+    count = await redis.incrby(rate_key, n_blocks)
+    if count == n_blocks:
         await redis.expire(rate_key, 60)
     if count > MAX_TTS_BLOCKS_PER_MINUTE:
-        await ws.send_json({"type": "error", "error": "Rate limit exceeded. Please slow down."})
-        return
+        await _send_frame(ws, WSError(error="Rate limit exceeded. Please slow down."), wire)
+        return True
+    return False
 
-    async with create_session() as db:
-        # Validate document ownership
-        doc = (await db.exec(select(Document).where(Document.id == msg.document_id))).first()
-        if not doc or (doc.user_id != user.id and not doc.is_public):
-            await ws.send_json({"type": "error", "error": "Document not found or access denied"})
-            return
 
-        try:
-            model = await get_model(db, msg.model)
-            voice = await get_voice(db, msg.model, msg.voice)
-        except ResourceNotFoundError as e:
-            await ws.send_json({"type": "error", "error": str(e)})
-            return
+async def _load_target(
+    ws: WebSocket,
+    db: AsyncSession,
+    user: User,
+    document_id: uuid.UUID,
+    model_slug: str,
+    voice_slug: str,
+    wire: _WireOptions,
+) -> _SynthesisTarget | None:
+    """Loads the document, model and voice, or reports why they can't be synthesized."""
+    # Validate document ownership
+    doc = (await db.exec(select(Document).where(Document.id == document_id))).first()
+    if not doc or (doc.user_id != user.id and not doc.is_public):
+        await _send_frame(ws, WSError(error="Document not found or access denied"), wire)
+        return None
+
+    try:
+        model = await get_model(db, model_slug)
+        voice = await get_voice(db, model_slug, voice_slug)
+    except ResourceNotFoundError as e:
+        await _send_frame(ws, WSError(error=str(e)), wire)
+        return None
+
+    try:
+        audio_texts = doc.audio_texts
+    except ValidationError:
+        await _send_frame(
+            ws,
+            WSError(
+                error="This document was created with an older version and is no longer compatible. Please re-upload it."
+            ),
+            wire,
+        )
+        return None
+    return _SynthesisTarget(doc=doc, model=model, voice=voice, audio_texts=audio_texts)
+
+
+async def _synthesize_blocks(
+    ws: WebSocket,
+    db: AsyncSession,
+    user: User,
+    redis: Redis,
+    cache: Cache,
+    settings: Settings,
+    wire: _WireOptions,
+    target: _SynthesisTarget,
+    block_indices: list[int],
+) -> list[WSBlockStatus]:
+    """Request the blocks and report each one's status. Returns those statuses."""
+    doc, model, voice, audio_texts = target.doc, target.model, target.voice, target.audio_texts
+    resolved: list[WSBlockStatus] = []
+
+    async def report(status: WSBlockStatus) -> None:
+        resolved.append(status)
+        if not wire.batched:
+            await _send_frame(ws, status, wire)
+
+    if doc.is_public:
+        requested = [idx for idx in block_indices if 0 <= idx < len(audio_texts)]
+        if requested:
+            await record_listen(redis, user.id, doc.id, model.slug, voice.slug, max(requested))
+
+    for idx in block_indices:
+        if idx < 0 or idx >= len(audio_texts):
+            logger.bind(user_id=user.id, document_id=str(doc.id)).warning(f"Block {idx} not found")
+            await report(
+                WSBlockStatus(
+                    document_id=doc.id,
+                    block_idx=idx,
+                    status="skipped",
+                    model_slug=model.slug,
+                    voice_slug=voice.slug,
+                )
+            )
+            continue
 
         try:
-            audio_texts = doc.audio_texts
-        except ValidationError:
-            await ws.send_json(
-                {
-                    "type": "error",
-                    "error": "This document was created with an older version and is no longer compatible. Please re-upload it.",
-                }
+            result = await request_synthesis(
+                db=db,
+                redis=redis,
+                cache=cache,
+                user_id=user.id,
+                text=audio_texts[idx],
+                model=model,
+                voice=voice,
+                billing_enabled=settings.billing_enabled,
+                document_id=doc.id,
+                block_idx=idx,
+                track_for_websocket=True,
             )
-            return
 
-        for idx in msg.block_indices:
-            if idx < 0 or idx >= len(audio_texts):
-                logger.bind(user_id=user.id, document_id=str(msg.document_id)).warning(f"Block {idx} not found")
-                await ws.send_json(
-                    WSBlockStatus(
-                        document_id=msg.document_id,
-                        block_idx=idx,
-                        status="skipped",
-                        model_slug=model.slug,
-                        voice_slug=voice.slug,
-                    ).model_dump(mode="json")
-                )
-                continue
+            # Cache hits carry their metadata; read it without the audio
+            meta = AudioMeta()
+            if isinstance(result, CachedResult):
+                meta = await _cached_meta(redis, cache, result.variant_hash) or meta
 
-            try:
-                result = await request_synthesis(
-                    db=db,
-                    redis=redis,
-                    cache=cache,
-                    user_id=user.id,
-                    text=audio_texts[idx],
-                    model=model,
-                    voice=voice,
-                    billing_enabled=settings.billing_enabled,
-                    document_id=msg.document_id,
+            await report(
+                WSBlockStatus(
+                    document_id=doc.id,
                     block_idx=idx,
-                    track_for_websocket=True,
+                    status=result.status,
+                    audio_url=result.audio_url,
+                    error=getattr(result, "error", None),
+                    recoverable=not isinstance(result, ErrorResult),
+                    model_slug=model.slug,
+                    voice_slug=voice.slug,
+                    word_timestamps=None if wire.compact else meta.timestamps_json(),
+                    word_timestamps_compact=meta.compact_timestamps() if wire.compact else None,
+                    duration_ms=getattr(result, "duration_ms", None) or meta.duration_ms,
                 )
-
-                # Fetch word timestamps for cache hits
-                word_timestamps: str | None = None
-                if isinstance(result, CachedResult):
-                    ts_raw = await redis.get(TTS_TIMESTAMPS_CACHE.format(hash=result.variant_hash))
-                    if ts_raw is not None:
-                        word_timestamps = ts_raw.decode()
-                    else:
-                        ts_bytes = await cache.retrieve_data(f"{result.variant_hash}:ts")
-                        if ts_bytes is not None:
-                            word_timestamps = ts_bytes.decode()
-
-                await ws.send_json(
-                    WSBlockStatus(
-                        document_id=msg.document_id,
-                        block_idx=idx,
-                        status=result.status,
-                        audio_url=result.audio_url,
-                        error=getattr(result, "error", None),
-                        recoverable=not isinstance(result, ErrorResult),
-                        model_slug=model.slug,
-                        voice_slug=voice.slug,
-                        word_timestamps=word_timestamps,
-                        duration_ms=getattr(result, "duration_ms", None),
-                    ).model_dump(mode="json")
-                )
-            except Exception as e:
-                logger.bind(user_id=user.id, document_id=str(msg.document_id)).exception(
-                    f"Failed to process block {idx}: {e}"
-                )
-                await log_error(f"Block processing error: {e}", user_id=user.id, block_idx=idx)
-                await ws.send_json(
-                    WSBlockStatus(
-                        document_id=msg.document_id,
-                        block_idx=idx,
-                        status="error",
-                        error="Internal server error",
-                        model_slug=model.slug,
-                        voice_slug=voice.slug,
-                    ).model_dump(mode="json")
+            )
+        except Exception as e:
+            logger.bind(user_id=user.id, document_id=str(doc.id)).exception(f"Failed to process block {idx}: {e}")
+            await log_error(f"Block processing error: {e}", user_id=user.id, block_idx=idx)
+            await report(
+                WSBlockStatus(
+                    document_id=doc.id,
+                    block_idx=idx,
+                    status="error",
+                    error="Internal server error",
+                    model_slug=model.slug,
+                    voice_slug=voice.slug,
                 )
+            )
+
+    if wire.batched and resolved:
+        await _send_frame(ws, WSBlockStatuses(document_id=doc.id, statuses=resolved), wire)
+    return resolved
+
+
+async def _cached_meta(redis: Redis, cache: Cache, variant_hash: str) -> AudioMeta | None:
+    raw = await redis.get(TTS_AUDIO_META.format(hash=variant_hash))
+    if raw is None:
+        raw = await cache.retrieve_meta(variant_hash)
+    return AudioMeta.from_cache(raw) if raw is not None else None
+
+
+async def _handle_prefetch(
+    ws: WebSocket,
+    session: _PrefetchSession,
+    user: User,
+    redis: Redis,
+    cache: Cache,
+    settings: Settings,
+    wire: _WireOptions,
+) -> None:
+    """Fit the session's queue to the window at its cursor.
+
+    Pending blocks outside the window are evicted like on a plain cursor_moved,
+    those inside stay queued, and window blocks not requested yet (or whose job
+    ended without audio) are requested.
+    """
+    msg = session.request
+    async with create_session() as db:
+        if session.target is None:
+            session.target = await _load_target(ws, db, user, msg.document_id, msg.model, msg.voice, wire)
+        target = session.target
+        if target is None:
+            return
+        candidates = range(msg.cursor, min(msg.cursor + MAX_PREFETCH_BLOCKS, len(target.audio_texts)))
+        durations_ms = await _variant_durations(db, target, candidates)
+        window = _prefetch_window(target.audio_texts, durations_ms, msg.cursor, msg.buffer_seconds)
+        await _evict_pending(ws, user, redis, msg.document_id, keep=window, wire=wire)
+        session.requested &= set(window)
+
+        missing = [idx for idx in window if idx not in session.requested]
+        if not missing or await _rate_limited(ws, redis, user, len(missing), wire):
+            return
+        session.requested.update(missing)
+        statuses = await _synthesize_blocks(ws, db, user, redis, cache, settings, wire, target, missing)
+        session.requested -= {status.block_idx for status in statuses if status.status in _UNFINISHED_STATUSES}
+
+
+async def _variant_durations(db: AsyncSession, target: _SynthesisTarget, block_indices: range) -> list[int | None]:
+    """Actual durations of the blocks' synthesized variants (None where there is none yet)."""
+    voice = target.voice
+    hashes = [
+        BlockVariant.get_hash(target.audio_texts[idx], target.model.slug, voice.slug, voice.parameters)
+        for idx in block_indices
+    ]
+    durations = await get_variant_durations(db, hashes)
+    return [durations.get(variant_hash) for variant_hash in hashes]
+
+
+def _prefetch_window(
+    audio_texts: list[str], durations_ms: list[int | None], cursor: int, buffer_seconds: float
+) -> range:
+    """Blocks from the cursor until their audio covers buffer_seconds.
+
+    Synthesized blocks count with their actual duration (which reflects the voice's
+    speed), the rest with an estimate from their length. durations_ms starts at the cursor.
+    """
+    buffered_ms = 0.0
+    for offset, duration_ms in enumerate(durations_ms):
+        if buffered_ms >= buffer_seconds * 1000:
+            return range(cursor, cursor + offset)
+        buffered_ms += duration_ms or estimate_duration_ms(len(audio_texts[cursor + offset]))
+    return range(cursor, cursor + len(durations_ms))
 
 
 async def _handle_cursor_moved(
@@ -270,93 +658,63 @@ async def _handle_cursor_moved(
     msg: WSCursorMoved,
     user: User,
     redis: Redis,
+    wire: _WireOptions = _JSON_WIRE,
 ):
     """Handle cursor_moved - evict all pending blocks.
 
     The frontend cancels its own promises before sending cursor_moved,
     then re-requests exactly what it needs via the next synthesize message.
+    Queued jobs are removed; jobs a worker already pulled are asked to stop.
     """
-    pending_key = TTS_PENDING.format(user_id=user.id, document_id=msg.document_id)
-    pending_indices = await redis.smembers(pending_key)
-
-    if not pending_indices:
+    await _evict_pending(ws, user, redis, msg.document_id, keep=range(0), wire=wire)
+
+
+async def _evict_pending(
+    ws: WebSocket, user: User, redis: Redis, document_id: uuid.UUID, keep: range, wire: _WireOptions = _JSON_WIRE
+) -> None:
+    pending_key = TTS_PENDING.format(user_id=user.id, document_id=document_id)
+    evicted = await _EVICT_PENDING(
+        keys=[pending_key, TTS_JOB_INDEX, TTS_JOBS],
+        args=[
+            f"{user.id}:{document_id}:",
+            TTS_INFLIGHT.format(hash=""),
+            TTS_CANCEL.format(job_id=""),
+            CANCEL_TTL_S,
+            keep.start,
+            keep.stop,
+        ],
+        client=redis,
+    )
+    if not evicted:
         return
 
-    to_evict = [int(idx_bytes) for idx_bytes in pending_indices]
+    await _send_frame(ws, WSEvicted(document_id=document_id, block_indices=[int(idx) for idx in evicted]), wire)
 
-    await redis.srem(pending_key, *pending_indices)
 
-    # Pipeline 1: look up job IDs for all evicted blocks
-    index_keys = [f"{user.id}:{msg.document_id}:{idx}" for idx in to_evict]
-    async with redis.pipeline() as pipe:
-        for key in index_keys:
-            pipe.hget(TTS_JOB_INDEX, key)
-        job_ids = await pipe.execute()
+async def _send_frame(ws: WebSocket, frame: BaseModel | bytes, wire: _WireOptions) -> None:
+    """Every outbound frame goes through here, so a connection gets one encoding.
 
-    active: list[tuple[str, str]] = []  # (job_id_str, index_key)
-    for index_key, job_id in zip(index_keys, job_ids):
-        if job_id is not None:
-            active.append((job_id.decode(), index_key))
-
-    if not active:
-        await ws.send_json(WSEvicted(document_id=msg.document_id, block_indices=to_evict).model_dump(mode="json"))
+    A frame is a model, or a status the result consumer published as JSON bytes.
+    On JSON connections models are serialized once and published bytes are sent as
+    is (only swapping the timestamps field for a client that wants the JSON form).
+    msgpack connections get both packed, null fields left out.
+    """
+    if isinstance(frame, BaseModel):
+        if wire.msgpack:
+            await ws.send_bytes(msgpack.packb(frame.model_dump(mode="json", exclude_none=True)))
+        else:
+            await ws.send_text(frame.model_dump_json())
         return
 
-    # Pipeline 2: fetch job data
-    async with redis.pipeline() as pipe:
-        for job_id_str, _ in active:
-            pipe.hget(TTS_JOBS, job_id_str)
-        wrappers = await pipe.execute()
-
-    # Parse wrappers to figure out which queues to remove from
-    parsed: list[tuple[str, str, SynthesisJob | None]] = []  # (job_id_str, index_key, job_or_none)
-    for (job_id_str, index_key), wrapper_json in zip(active, wrappers):
-        if wrapper_json is not None:
-            wrapper = json.loads(wrapper_json)
-            parsed.append((job_id_str, index_key, SynthesisJob.model_validate_json(wrapper["job"])))
-        else:
-            parsed.append((job_id_str, index_key, None))
-
-    # Pipeline 3: remove from queues (1:1 with parsed entries that have jobs)
-    has_job = [(jid, ik, job) for jid, ik, job in parsed if job is not None]
-    async with redis.pipeline() as pipe:
-        for job_id_str, _, job in has_job:
-            pipe.zrem(get_queue_name(job.model_slug), job_id_str)
-        zrem_results = await pipe.execute()
-
-    # Pipeline 4: clean up index + job keys
-    async with redis.pipeline() as pipe:
-        for job_id_str, index_key, job in parsed:
-            pipe.hdel(TTS_JOB_INDEX, index_key)
-            if job is not None:
-                pipe.hdel(TTS_JOBS, job_id_str)
-        await pipe.execute()
-
-    # Pipeline 5: clean up inflight keys for jobs that were still in the queue
-    # (not yet pulled by a worker). Without this, future requests for the same
-    # variant see "already processing" but nobody is.
-    removed = [(jid, job) for (jid, _, job), was_removed in zip(has_job, zrem_results) if was_removed]
-    if removed:
-        async with redis.pipeline() as pipe:
-            for _, job in removed:
-                pipe.get(TTS_INFLIGHT.format(hash=job.variant_hash))
-            owners = await pipe.execute()
-
-        async with redis.pipeline() as pipe:
-            for (job_id_str, job), owner in zip(removed, owners):
-                if owner and owner.decode() == job_id_str:
-                    pipe.delete(TTS_INFLIGHT.format(hash=job.variant_hash))
-            await pipe.execute()
-
-    await ws.send_json(
-        WSEvicted(
-            document_id=msg.document_id,
-            block_indices=to_evict,
-        ).model_dump(mode="json")
-    )
+    if not wire.compact and _COMPACT_TIMESTAMPS_MARKER in frame:
+        frame = _with_json_timestamps(frame)
+    if wire.msgpack:
+        await ws.send_bytes(msgpack.packb({k: v for k, v in json.loads(frame).items() if v is not None}))
+    else:
+        await ws.send_text(frame.decode())
 
 
-async def _pubsub_listener(ws: WebSocket, pubsub):
+async def _pubsub_listener(ws: WebSocket, pubsub, wire: _WireOptions, on_published: Callable[[bytes], None]):
     """Listen for pubsub messages and forward to WebSocket.
 
     Restarts on transient errors (Redis disconnect, encoding issues).
@@ -368,9 +726,23 @@ async def _pubsub_listener(ws: WebSocket, pubsub):
             async for message in pubsub.listen():
                 backoff.reset()
                 if message["type"] == "message":
-                    await ws.send_text(message["data"].decode())
+                    on_published(message["data"])
+                    await _send_frame(ws, message["data"], wire)
         except WebSocketDisconnect:
             return
         except Exception:
             logger.exception("Pubsub listener error, restarting")
             await backoff.sleep()
+
+
+def _with_json_timestamps(raw: bytes) -> bytes:
+    """The published status with its compact timestamps as the JSON string instead.
+
+    Spliced in place: only the timestamps are decoded, not the whole status.
+    """
+    start = raw.index(_COMPACT_TIMESTAMPS_MARKER)
+    value_start = start + len(_COMPACT_TIMESTAMPS_MARKER)
+    value_end = raw.index(b'"', value_start)
+    timestamps = json.dumps(json.dumps(decode_b64(raw[value_start:value_end].decode())))
+    raw = raw[:start] + b'"word_timestamps_compact":null' + raw[value_end + 1 :]
+    return raw.replace(_NO_JSON_TIMESTAMPS, b'"word_timestamps":' + timestamps.encode(), 1)
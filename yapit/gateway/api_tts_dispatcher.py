@@ -14,7 +14,7 @@ from yapit.contracts import (
 )
 from yapit.gateway.backoff import Backoff
 from yapit.gateway.metrics import log_error
-from yapit.queue import QueueConfig, pull_job
+from yapit.queue import QueueConfig, pull_job, push_result
 from yapit.synth import SynthAdapter, execute_job
 
 
@@ -44,8 +44,8 @@ async def run_api_tts_dispatcher(redis_url: str, model: str, adapter: SynthAdapt
 
     async def process_job(raw_job: bytes, queued_at: float) -> None:
         job = SynthesisJob.model_validate_json(raw_job)
-        worker_result = await execute_job(adapter, job, worker_id, queued_at)
-        await client.lpush(TTS_RESULTS, worker_result.model_dump_json())
+        worker_result = await execute_job(adapter, job, worker_id, queued_at, client=client)
+        await push_result(client, TTS_RESULTS, worker_result.model_dump_json())
 
     backoff = Backoff()
     try:
@@ -0,0 +1,273 @@
+"""Whole-document audiobook export: cached blocks spliced into one Ogg Opus stream.
+
+Every block is cached as its own Ogg Opus file (OpusHead and OpusTags pages, then
+audio pages). Chained Ogg (the files back to back) is valid, but many players stop
+or stutter at each link, so the export rewrites the pages into one logical stream
+instead, without decoding:
+- the OpusHead comes from the first block. The OpusTags page is built here and
+  carries the chapters (Vorbis-comment CHAPTERxxx, one per HeadingBlock).
+- every later block's header pages are dropped. Its audio pages get the export's
+  serial number and page sequence, with BOS/EOS cleared and CRC recomputed.
+- granule positions are recounted from the Opus packets (TOC byte) so they run on
+  across blocks. Only the last block keeps its end trim, and later blocks' pre-skip
+  plays as a few ms of encoder warm-up. Every block is one model and voice, so the
+  channel layout matches the first block's header.
+
+Chapter offsets must be in the header, so when the document has headings the
+blocks before the last one are scanned for their sample counts first. Blocks are
+read one at a time and streamed out, so memory stays at one block however long
+the book is.
+"""
+
+import random
+import struct
+import zlib
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass
+
+from loguru import logger
+from redis.asyncio import Redis
+
+from yapit.contracts import TTS_AUDIO_CACHE
+from yapit.gateway.cache import Cache
+from yapit.gateway.domain_models import Document
+from yapit.gateway.markdown.models import HeadingBlock, StructuredDocument
+
+OPUS_SAMPLE_RATE = 48_000  # granule positions are always 48kHz samples
+OGG_MAGIC = b"OggS"
+VENDOR = b"yapit"
+
+_PAGE_HEADER = struct.Struct("<4sBBqIIIB")
+_CONTINUED, _BOS, _EOS = 0x01, 0x02, 0x04
+_NO_GRANULE = -1  # page on which no packet ends
+_MAX_SEGMENTS = 255
+# Samples per Opus frame by TOC config (RFC 6716 3.1): SILK 10/20/40/60ms,
+# hybrid 10/20ms, CELT 2.5/5/10/20ms
+_FRAME_SAMPLES = [480, 960, 1920, 2880] * 3 + [480, 960] * 2 + [120, 240, 480, 960] * 4
+# zlib's CRC-32 is bit-reflected; Ogg's isn't. Reflected CRC over bit-reversed bytes
+# is the bit-reversal of the plain CRC, which keeps the checksum in C.
+_REVERSE_BITS = bytes(int(f"{i:08b}"[::-1], 2) for i in range(256))
+
+
+@dataclass
+class OggPage:
+    flags: int
+    granule: int
+    serial: int
+    sequence: int
+    lacing: bytes
+    body: bytes
+
+    def encode(self) -> bytes:
+        header = _PAGE_HEADER.pack(
+            OGG_MAGIC, 0, self.flags, self.granule, self.serial, self.sequence, 0, len(self.lacing)
+        )
+        page = header + self.lacing + self.body
+        return page[:22] + struct.pack("<I", ogg_crc(page)) + page[26:]
+
+
+def ogg_crc(page: bytes) -> int:
+    reflected = ~zlib.crc32(page.translate(_REVERSE_BITS), 0xFFFFFFFF) & 0xFFFFFFFF
+    return int(f"{reflected:032b}"[::-1], 2)
+
+
+def parse_pages(data: bytes) -> Iterator[OggPage]:
+    pos = 0
+    while pos < len(data):
+        magic, _, flags, granule, serial, sequence, _, n_segments = _PAGE_HEADER.unpack_from(data, pos)
+        if magic != OGG_MAGIC:
+            raise ValueError(f"No Ogg page at offset {pos}")
+        lacing_end = pos + _PAGE_HEADER.size + n_segments
+        lacing = data[pos + _PAGE_HEADER.size : lacing_end]
+        body_end = lacing_end + sum(lacing)
+        yield OggPage(flags, granule, serial, sequence, lacing, data[lacing_end:body_end])
+        pos = body_end
+
+
+def packet_samples(packet_start: bytes) -> int:
+    """48kHz samples in an Opus packet, from its first two bytes."""
+    toc = packet_start[0]
+    frames = (1, 2, 2, packet_start[1] & 0x3F if len(packet_start) > 1 else 0)[toc & 0x03]
+    return _FRAME_SAMPLES[toc >> 3] * frames
+
+
+def _split_block(audio: bytes) -> tuple[bytes, list[OggPage]]:
+    """The block's OpusHead packet and its audio pages."""
+    pages = iter(parse_pages(audio))
+    head = next(pages)
+    # OpusTags ends its last page; audio starts on a fresh one
+    for page in pages:
+        if page.lacing[-1] < _MAX_SEGMENTS:
+            break
+    return head.body, list(pages)
+
+
+def _page_samples(page: OggPage) -> tuple[int, bool]:
+    """Samples of the packets ending on the page, and whether any does.
+
+    A packet continued from the previous page was counted there: a continued
+    packet's first page segment is always a full 255 bytes, TOC included.
+    """
+    samples, ends, pos = 0, False, 0
+    starting = not page.flags & _CONTINUED
+    for segment in page.lacing:
+        if starting:
+            samples += packet_samples(page.body[pos : pos + 2])
+        pos += segment
+        starting = segment < _MAX_SEGMENTS
+        ends = ends or starting
+    return samples, ends
+
+
+def block_samples(audio: bytes) -> int:
+    return sum(_page_samples(page)[0] for page in _split_block(audio)[1])
+
+
+def _timestamp(ms: int) -> str:
+    hours, rest = divmod(ms, 3_600_000)
+    minutes, rest = divmod(rest, 60_000)
+    return f"{hours:02d}:{minutes:02d}:{rest // 1000:02d}.{rest % 1000:03d}"
+
+
+def opus_tags(chapters: list[tuple[int, str]]) -> bytes:
+    """OpusTags packet with (start ms, title) chapters as Vorbis chapter comments."""
+    comments = []
+    for n, (start_ms, title) in enumerate(chapters, start=1):
+        comments += [f"CHAPTER{n:03d}={_timestamp(start_ms)}", f"CHAPTER{n:03d}NAME={title}"]
+    encoded = [c.encode() for c in comments]
+    return (
+        b"OpusTags"
+        + struct.pack("<I", len(VENDOR))
+        + VENDOR
+        + struct.pack("<I", len(encoded))
+        + b"".join(struct.pack("<I", len(c)) + c for c in encoded)
+    )
+
+
+class OpusSplicer:
+    """Rewrites per-block Ogg Opus files into one logical stream, one block at a time."""
+
+    def __init__(self, chapters: list[tuple[int, str]]) -> None:
+        self._chapters = chapters
+        self._serial = random.getrandbits(32)
+        self._sequence = 0
+        self._granule = 0
+        self._held: tuple[OggPage, int] | None = None  # last page so far, and its original granule offset
+
+    def add(self, audio: bytes) -> bytes:
+        """Pages for this block. The very last page is held back until finish()."""
+        head, pages = _split_block(audio)
+        out = b"" if self._sequence else self._headers(head)
+        block_start = self._granule
+        for page in pages:
+            samples, ends = _page_samples(page)
+            self._granule += samples
+            rewritten = OggPage(
+                flags=page.flags & _CONTINUED,
+                granule=self._granule if ends else _NO_GRANULE,
+                serial=self._serial,
+                sequence=0,
+                lacing=page.lacing,
+                body=page.body,
+            )
+            out += self._release()
+            # The block's own granule keeps its end trim, should this be the last page
+            self._held = rewritten, min(block_start + page.granule, self._granule)
+        return out
+
+    def finish(self) -> bytes:
+        """The held last page, flagged end of stream with its end trim."""
+        if self._held is None:
+            return b""
+        page, trimmed_granule = self._held
+        self._held = None
+        page.flags |= _EOS
+        page.granule = trimmed_granule
+        return self._emit(page)
+
+    def _release(self) -> bytes:
+        if self._held is None:
+            return b""
+        page, _ = self._held
+        self._held = None
+        return self._emit(page)
+
+    def _headers(self, head: bytes) -> bytes:
+        pre_skip = struct.unpack_from("<H", head, 10)[0]
+        # Chapter starts are given in block samples; playback time starts after pre-skip
+        chapters = [(max(start - pre_skip, 0) * 1000 // OPUS_SAMPLE_RATE, title) for start, title in self._chapters]
+        out = self._emit(OggPage(_BOS, 0, self._serial, 0, bytes([len(head)]), head))
+        tags = opus_tags(chapters)
+        for page in _packet_pages(tags, self._serial):
+            out += self._emit(page)
+        return out
+
+    def _emit(self, page: OggPage) -> bytes:
+        page.sequence = self._sequence
+        self._sequence += 1
+        return page.encode()
+
+
+def _packet_pages(packet: bytes, serial: int) -> Iterator[OggPage]:
+    """A header packet paged on its own, granule 0, across as many pages as it needs."""
+    lacing = bytes([_MAX_SEGMENTS] * (len(packet) // _MAX_SEGMENTS) + [len(packet) % _MAX_SEGMENTS])
+    pos = 0
+    for i in range(0, len(lacing), _MAX_SEGMENTS):
+        page_lacing = lacing[i : i + _MAX_SEGMENTS]
+        body = packet[pos : pos + sum(page_lacing)]
+        pos += len(body)
+        ends = page_lacing[-1] < _MAX_SEGMENTS
+        yield OggPage(_CONTINUED if i else 0, 0 if ends else _NO_GRANULE, serial, 0, page_lacing, body)
+
+
+def document_chapters(doc: Document) -> list[tuple[int, str]]:
+    """(first audio block, spoken title) of every heading that is read out, whatever its
+    level: CHAPTER comments form a flat list, and h2/h3 sections are often a book's
+    only real divisions.
+    """
+    structured = StructuredDocument.model_validate_json(doc.structured_content)
+    return [
+        (block.audio_chunks[0].audio_block_idx, " ".join(chunk.text for chunk in block.audio_chunks))
+        for block in structured.blocks
+        if isinstance(block, HeadingBlock) and block.audio_chunks
+    ]
+
+
+async def _read_audio(redis: Redis, cache: Cache, variant_hash: str) -> bytes | None:
+    audio = await redis.get(TTS_AUDIO_CACHE.format(hash=variant_hash))
+    if audio is None:
+        audio = await cache.retrieve_data(variant_hash)
+    if audio is None:
+        # Evicted since the export checked; the book goes on without the block
+        logger.warning(f"Audio for variant {variant_hash} left the cache during export, skipping it")
+    return audio
+
+
+async def stream_audiobook(
+    redis: Redis, cache: Cache, blocks: list[tuple[int, str]], chapters: list[tuple[int, str]]
+) -> AsyncIterator[bytes]:
+    """Yields the spliced Ogg Opus stream of `blocks` ((index, variant hash), in order), a block at a time.
+
+    `chapters` are (block index, title); a chapter starts with the first block
+    exported at or after its index.
+    """
+    samples_before: list[int] = []  # per chapter
+    samples = 0
+    pending = iter(chapters)
+    chapter = next(pending, None)
+    for idx, variant_hash in blocks:
+        while chapter is not None and chapter[0] <= idx:
+            samples_before.append(samples)
+            chapter = next(pending, None)
+        if chapter is None:
+            break
+        audio = await _read_audio(redis, cache, variant_hash)
+        samples += block_samples(audio) if audio is not None else 0
+    samples_before += [samples] * (len(chapters) - len(samples_before))
+
+    splicer = OpusSplicer([(start, title) for start, (_, title) in zip(samples_before, chapters, strict=True)])
+    for _, variant_hash in blocks:
+        audio = await _read_audio(redis, cache, variant_hash)
+        if audio is not None:
+            yield splicer.add(audio)
+    yield splicer.finish()
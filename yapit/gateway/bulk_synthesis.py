@@ -0,0 +1,263 @@
+"""Bulk synthesis: a whole document (or a block range) pre-rendered as one tracked job.
+
+Pre-rendering otherwise means driving the WebSocket block by block. A bulk job is
+started over REST and runs in the gateway process that accepted it, like document
+extraction. Uncached blocks go through the normal queue as background jobs, so they
+wait behind every live listener. At most BULK_JOB_CONCURRENCY of a job's blocks are
+in flight at once, so one book doesn't fill the queue and several users' jobs take
+turns. Each block is requested with the job owner as user: usage limits are checked
+per block (and for the whole range up front), and the result consumer puts every
+synthesized block on the billing stream as usual.
+
+Batch priority means a block runs whenever live traffic leaves room. A block is
+waited for as long as its background job can stay queued (its inflight key's
+lifetime), so a busy day delays the job instead of failing its blocks; `failed`
+only counts blocks whose synthesis errored. The DB session is only held to queue a
+block, never for the wait.
+
+Progress lives in tts:bulk_job:{id}, and every change is also published on
+tts:bulk_job_events:{id} for the SSE endpoint. A gateway that dies mid-job leaves it
+"running" until its TTL. Starting the job again skips what's already cached.
+"""
+
+import asyncio
+import time
+import uuid
+from collections.abc import AsyncIterator
+from enum import StrEnum
+
+from loguru import logger
+from pydantic import BaseModel
+from redis.asyncio import Redis
+from redis.asyncio.client import PubSub
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from yapit.contracts import TTS_BULK_JOB, TTS_BULK_JOB_EVENTS
+from yapit.gateway.cache import Cache
+from yapit.gateway.db import create_session
+from yapit.gateway.domain_models import BlockVariant, Document, TTSModel, Voice
+from yapit.gateway.metrics import log_error, log_event
+from yapit.gateway.synthesis import (
+    BACKGROUND_INFLIGHT_TTL_S,
+    CachedResult,
+    ErrorResult,
+    QueuedResult,
+    cached_variants,
+    request_synthesis,
+    usage_type_for,
+    wait_for_variant,
+)
+from yapit.gateway.usage import check_usage_limit
+from yapit.gateway.variant_completions import VariantCompletions
+
+BULK_JOB_TTL_S = 48 * 60 * 60
+BULK_JOB_CONCURRENCY = 4  # blocks in flight per job
+BULK_BLOCK_TIMEOUT_S = float(BACKGROUND_INFLIGHT_TTL_S)  # as long as a background job may wait in the queue
+SSE_KEEPALIVE_S = 15.0
+
+_background_tasks: set[asyncio.Task] = set()
+
+
+class BulkJobStatus(StrEnum):
+    RUNNING = "running"
+    DONE = "done"  # every block tried; `failed` counts those without audio
+    FAILED = "failed"  # stopped early, see `error`
+
+
+class BulkJob(BaseModel):
+    job_id: str
+    user_id: str
+    document_id: uuid.UUID
+    model_slug: str
+    voice_slug: str
+    block_start: int
+    block_end: int  # exclusive
+    total: int
+    cached: int = 0  # already cached when the job started
+    synthesized: int = 0
+    failed: int = 0
+    status: BulkJobStatus = BulkJobStatus.RUNNING
+    error: str | None = None  # why it stopped, or the last block error
+    created_at: float
+    updated_at: float
+
+    @property
+    def done(self) -> int:
+        return self.cached + self.synthesized + self.failed
+
+
+async def get_bulk_job(redis: Redis, job_id: str) -> BulkJob | None:
+    data = await redis.get(TTS_BULK_JOB.format(job_id=job_id))
+    return BulkJob.model_validate_json(data) if data else None
+
+
+async def save_bulk_job(redis: Redis, job: BulkJob) -> None:
+    job.updated_at = time.time()
+    data = job.model_dump_json()
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.set(TTS_BULK_JOB.format(job_id=job.job_id), data, ex=BULK_JOB_TTL_S)
+        pipe.publish(TTS_BULK_JOB_EVENTS.format(job_id=job.job_id), data)
+        await pipe.execute()
+
+
+async def start_bulk_job(
+    db: AsyncSession,
+    redis: Redis,
+    cache: Cache,
+    completions: VariantCompletions,
+    user_id: str,
+    doc: Document,
+    model: TTSModel,
+    voice: Voice,
+    blocks: range,
+    billing_enabled: bool,
+) -> BulkJob:
+    """Plans the job and starts it in the background.
+
+    Raises UsageLimitExceededError up front when the uncached blocks exceed the
+    user's remaining usage.
+    """
+    texts = doc.audio_texts[blocks.start : blocks.stop]
+    hashes = [BlockVariant.get_hash(text, model.slug, voice.slug, voice.parameters) for text in texts]
+    cached = await cached_variants(redis, cache, list(dict.fromkeys(hashes)))
+    missing = [
+        (blocks.start + i, text) for i, (text, h) in enumerate(zip(texts, hashes, strict=True)) if h not in cached
+    ]
+
+    # Distinct texts only: a repeated block is synthesized (and billed) once
+    chars = sum(len(text) for text in {text for _, text in missing})
+    await check_usage_limit(
+        user_id, usage_type_for(model), int(chars * model.usage_multiplier), db, billing_enabled=billing_enabled
+    )
+
+    now = time.time()
+    job = BulkJob(
+        job_id=str(uuid.uuid4()),
+        user_id=user_id,
+        document_id=doc.id,
+        model_slug=model.slug,
+        voice_slug=voice.slug,
+        block_start=blocks.start,
+        block_end=blocks.stop,
+        total=len(texts),
+        cached=len(texts) - len(missing),
+        created_at=now,
+        updated_at=now,
+    )
+    if not missing:
+        job.status = BulkJobStatus.DONE
+    await save_bulk_job(redis, job)
+
+    if missing:
+        task = asyncio.create_task(
+            _run_bulk_job(redis, cache, completions, job, model, voice, missing, billing_enabled)
+        )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    return job
+
+
+async def _run_bulk_job(
+    redis: Redis,
+    cache: Cache,
+    completions: VariantCompletions,
+    job: BulkJob,
+    model: TTSModel,
+    voice: Voice,
+    missing: list[tuple[int, str]],
+    billing_enabled: bool,
+) -> None:
+    start = time.monotonic()
+    slots = asyncio.Semaphore(BULK_JOB_CONCURRENCY)
+
+    async def synthesize(block_idx: int, text: str) -> None:
+        async with slots:
+            async with create_session() as db:
+                result = await request_synthesis(
+                    db=db,
+                    redis=redis,
+                    cache=cache,
+                    user_id=job.user_id,
+                    text=text,
+                    model=model,
+                    voice=voice,
+                    billing_enabled=billing_enabled,
+                    document_id=job.document_id,
+                    block_idx=block_idx,
+                    track_for_websocket=False,
+                    background=True,
+                )
+            if isinstance(result, QueuedResult):
+                result = await wait_for_variant(
+                    redis, cache, completions, result.variant_hash, BULK_BLOCK_TIMEOUT_S
+                ) or ErrorResult(error="Synthesis timed out")
+        if isinstance(result, CachedResult):
+            job.synthesized += 1
+        else:
+            job.failed += 1
+            job.error = result.error
+        await save_bulk_job(redis, job)
+
+    try:
+        # A block that raises cancels the others, so a failed job stops queueing and
+        # saving progress once it is reported finished.
+        async with asyncio.TaskGroup() as blocks:
+            for block_idx, text in missing:
+                blocks.create_task(synthesize(block_idx, text))
+        job.status = BulkJobStatus.DONE
+    except* Exception as group:
+        logger.bind(user_id=job.user_id, document_id=str(job.document_id)).exception(f"Bulk job {job.job_id} failed")
+        await log_error(f"Bulk synthesis job failed: {group.exceptions[0]}")
+        job.status = BulkJobStatus.FAILED
+        job.error = "Bulk synthesis stopped unexpectedly"
+    await save_bulk_job(redis, job)
+    await log_event(
+        "bulk_synthesis",
+        model_slug=job.model_slug,
+        voice_slug=job.voice_slug,
+        user_id=job.user_id,
+        document_id=str(job.document_id),
+        duration_ms=int((time.monotonic() - start) * 1000),
+        data={"blocks": job.total, "cached": job.cached, "synthesized": job.synthesized, "failed": job.failed},
+    )
+
+
+async def bulk_job_events(redis: Redis, job_id: str) -> AsyncIterator[str]:
+    """Server-sent events: the job's state now and on every change, until it finishes.
+
+    Subscribes before reading the state, so no change falls in between. Without news
+    for SSE_KEEPALIVE_S the state is re-read (a change may have been published by a
+    gateway this one missed): a keepalive comment if unchanged, the end of the stream
+    if the job expired.
+    """
+    pubsub = redis.pubsub()
+    await pubsub.subscribe(TTS_BULK_JOB_EVENTS.format(job_id=job_id))
+    try:
+        job = await get_bulk_job(redis, job_id)
+        sent: BulkJob | None = None
+        while job is not None:
+            if sent is not None and job.updated_at == sent.updated_at:
+                yield ": keepalive\n\n"
+            else:
+                yield f"data: {job.model_dump_json()}\n\n"
+                sent = job
+            if job.status != BulkJobStatus.RUNNING:
+                return
+            message = await _next_message(pubsub, SSE_KEEPALIVE_S)
+            if message is not None:
+                job = BulkJob.model_validate_json(message["data"])
+            else:
+                job = await get_bulk_job(redis, job_id)
+    finally:
+        await pubsub.aclose()
+
+
+async def _next_message(pubsub: PubSub, timeout_s: float) -> dict | None:
+    # get_message returns early (None) on the subscribe confirmation
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_s
+    while (remaining := deadline - loop.time()) > 0:
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+        if message is not None:
+            return message
+    return None
@@ -2,6 +2,8 @@ import abc
 import asyncio
 import sqlite3
 import time
+from collections import Counter
+from dataclasses import dataclass
 from enum import StrEnum, auto
 from pathlib import Path
 
@@ -14,15 +16,97 @@ from yapit.gateway.supervision import supervised
 
 LRU_FLUSH_INTERVAL_S = 10
 
+# Entries are ~10-100KB audio blobs: larger pages mean fewer overflow pages per
+# entry. Only takes effect for new files; WAL mode pins an existing file's size.
+PAGE_SIZE = 16384
+MMAP_SIZE = 256 * 1024 * 1024
+# Pages of WAL before a commit checkpoints inline. Raised from SQLite's 1000 so a
+# write burst rarely pays for a checkpoint; maintenance_step checkpoints when idle.
+WAL_AUTOCHECKPOINT_PAGES = 4000
+# A passive checkpoint leaves the WAL file at its high-water mark; truncate past this.
+WAL_TRUNCATE_BYTES = 64 * 1024 * 1024
+
+# Space is reclaimed in steps of this many free pages, and only once no connection
+# has written for QUIET_PERIOD_S — each step holds the write lock while it moves pages.
+INCREMENTAL_VACUUM_PAGES = 512
+QUIET_PERIOD_S = 30
+AUTO_VACUUM_INCREMENTAL = 2  # PRAGMA auto_vacuum value
+
+# Eviction starts when unpinned bytes cross max_size and frees down to this fraction
+# of it, so the stores that follow don't each trigger another round.
+EVICT_TARGET_RATIO = 0.9
+# Rows per eviction transaction: the writer is released between chunks.
+EVICT_CHUNK_ROWS = 200
+
+# cache.pinned values. Permanent pins are the warm_cache CLI's (cleared by
+# unpin_all); temporary ones, with pinned_until, are the trending warmer's.
+PIN_PERMANENT = 1
+PIN_TEMPORARY = 2
+
+# GDSF: priority = clock + hits * cost / size, where cost is what re-creating the entry
+# costs (the model's usage_multiplier for audio). Evicting raises the clock to the
+# highest priority evicted, so entries that stop being read age out relative to new
+# ones instead of keeping the hits they earned long ago.
+_GDSF_CLOCK = "(SELECT value FROM cache_meta WHERE name = 'gdsf_clock')"
+
+# Keep cache_meta.unpinned_bytes equal to SUM(size) WHERE pinned=0 in the same
+# transaction as every write. Needs upserts rather than REPLACE: REPLACE's implicit
+# delete doesn't fire DELETE triggers.
+_SIZE_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS cache_size_insert AFTER INSERT ON cache WHEN NEW.pinned = 0
+    BEGIN
+        UPDATE cache_meta SET value = value + NEW.size WHERE name = 'unpinned_bytes';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS cache_size_delete AFTER DELETE ON cache WHEN OLD.pinned = 0
+    BEGIN
+        UPDATE cache_meta SET value = value - OLD.size WHERE name = 'unpinned_bytes';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS cache_size_update AFTER UPDATE OF size, pinned ON cache
+    BEGIN
+        UPDATE cache_meta
+        SET value = value
+            - CASE WHEN OLD.pinned = 0 THEN OLD.size ELSE 0 END
+            + CASE WHEN NEW.pinned = 0 THEN NEW.size ELSE 0 END
+        WHERE name = 'unpinned_bytes';
+    END
+    """,
+)
+
+
+# Metadata lives in its own table so it can be read without touching the entry's
+# blob, and goes when its entry goes — however the entry is deleted.
+_META_CASCADE = """
+    CREATE TRIGGER IF NOT EXISTS cache_entry_meta_delete AFTER DELETE ON cache
+    BEGIN
+        DELETE FROM cache_entry_meta WHERE key = OLD.key;
+    END
+"""
+
+# Before entries carried metadata, the audio cache stored word timestamps as a
+# sibling row "{key}:ts". maintenance_step folds those into cache_entry_meta.
+LEGACY_META_SUFFIX = ":ts"
+META_MIGRATION_CHUNK_ROWS = 1000
+
 
 class Caches(StrEnum):
     SQLITE = auto()
 
 
+class EvictionPolicy(StrEnum):
+    LRU = auto()  # oldest last_accessed first
+    GDSF = auto()  # lowest GreedyDual-Size-Frequency priority first
+
+
 class CacheConfig(BaseModel):
     path: Path | str | None = None
     max_size_mb: int | None = None
     max_item_size_mb: int | None = None
+    eviction_policy: EvictionPolicy = EvictionPolicy.LRU
 
 
 class CacheStats(BaseModel):
@@ -34,13 +118,32 @@ class CacheStats(BaseModel):
     bloat_ratio: float  # file_size / data_size (1.0 = no bloat)
 
 
+@dataclass
+class CacheRecord:
+    data: bytes
+    meta: bytes | None
+
+
 class Cache(abc.ABC):
     def __init__(self, config: CacheConfig) -> None:
         self.config = config
 
     @abc.abstractmethod
-    async def store(self, key: str, data: bytes, *, commit: bool = True, pinned: bool = False) -> str | None:
-        """Store `data` under `key`. Return cache_ref or None on failure."""
+    async def store(
+        self,
+        key: str,
+        data: bytes,
+        *,
+        commit: bool = True,
+        pinned: bool = False,
+        cost: float = 1.0,
+        meta: bytes | None = None,
+    ) -> str | None:
+        """Store `data` under `key`, with optional small `meta` readable on its own.
+        `cost` weighs re-creating the entry, for cost-aware eviction.
+
+        Return cache_ref or None on failure.
+        """
 
     @abc.abstractmethod
     async def commit(self) -> None:
@@ -66,6 +169,14 @@ class Cache(abc.ABC):
     async def retrieve_data(self, key: str) -> bytes | None:
         """Return raw bytes for `key`, or None if missing."""
 
+    @abc.abstractmethod
+    async def retrieve_record(self, key: str) -> CacheRecord | None:
+        """Return data and meta for `key` in one read, or None if missing."""
+
+    @abc.abstractmethod
+    async def retrieve_meta(self, key: str) -> bytes | None:
+        """Return only the meta stored with `key`, without reading its data."""
+
     @abc.abstractmethod
     async def delete(self, key: str) -> bool:
         """Delete `key`. Return True if deleted or not present, False on error."""
@@ -79,18 +190,41 @@ class Cache(abc.ABC):
         """Vacuum the cache if bloat ratio exceeds threshold. Returns True if vacuumed."""
 
     @abc.abstractmethod
-    async def pin(self, keys: list[str]) -> int:
-        """Mark keys as pinned (exempt from LRU eviction). Returns count updated."""
+    async def maintenance_step(self) -> None:
+        """Do one bounded slice of background upkeep, if the cache is idle."""
+
+    @abc.abstractmethod
+    async def pin(self, keys: list[str], until: float | None = None) -> int:
+        """Mark keys as pinned (exempt from LRU eviction). Returns count updated.
+
+        With `until` (epoch seconds) the pin is temporary: it extends any earlier
+        temporary pin, never demotes a permanent one, and lapses via unpin_expired.
+        """
 
     @abc.abstractmethod
     async def unpin_all(self) -> int:
-        """Clear the pinned flag on every entry. Returns count updated."""
+        """Clear every permanent pin. Returns count updated."""
+
+    @abc.abstractmethod
+    async def unpin_expired(self) -> int:
+        """Clear temporary pins whose time is up. Returns count updated."""
 
     @abc.abstractmethod
     async def close(self) -> None:
         """Release resources. Called during shutdown."""
 
 
+def _eviction_candidates_query(gdsf: bool) -> str:
+    """Next unpinned entries to evict, as (key, size, priority).
+
+    Selects only columns the policy's index covers, so the table rows (and their
+    blobs) are never read. LRU has no use for priority.
+    """
+    if gdsf:
+        return "SELECT key, size, priority FROM cache WHERE pinned=0 ORDER BY priority ASC, last_accessed ASC LIMIT ?"
+    return "SELECT key, size, 0 FROM cache WHERE pinned=0 ORDER BY last_accessed ASC LIMIT ?"
+
+
 class SqliteCache(Cache):
     """SQLite-backed cache with dual connections (reader + writer) and batched LRU.
 
@@ -100,8 +234,19 @@ class SqliteCache(Cache):
     Writer connection: all mutations (store, delete, eviction, LRU flush, vacuum).
     Uses busy_timeout as safety net for any residual lock contention.
 
-    LRU updates are batched: retrieve_data records accessed keys in memory,
-    a background task flushes them to the DB every ~10s.
+    LRU updates are batched: retrieve_data counts accessed keys in memory,
+    a background task flushes them to the DB every ~10s — last_accessed, plus the
+    hit count and priority the GDSF policy evicts by.
+
+    Size limit: the unpinned byte total lives in cache_meta, maintained by
+    triggers, and is mirrored in memory after each commit — checking the limit is
+    a primary-key lookup rather than a scan of a multi-GB table.
+
+    Space reclaim: files use auto_vacuum=INCREMENTAL, so freed pages are returned
+    to the OS a few hundred at a time by maintenance_step while nobody is writing,
+    instead of by a full VACUUM that blocks the writer for the whole rewrite.
+    Files created before that are converted by the first idle maintenance_step,
+    with the one full VACUUM the switch takes.
     """
 
     def __init__(self, config: CacheConfig):
@@ -112,9 +257,14 @@ class SqliteCache(Cache):
 
         self._reader: aiosqlite.Connection | None = None
         self._writer: aiosqlite.Connection | None = None
-        self._lru_pending: set[str] = set()
+        self._lru_pending: Counter[str] = Counter()
         self._lru_task: asyncio.Task | None = None
+        self._unpinned_bytes = 0
+        self._evicting = False
         self._closed = False
+        self._data_version: int | None = None
+        self._last_change = time.monotonic()
+        self._meta_migrated_to: str | None = ""  # last legacy key folded; None once done
 
         self._init_schema()
 
@@ -122,6 +272,9 @@ class SqliteCache(Cache):
         """Create tables synchronously at startup (idempotent)."""
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         with sqlite3.connect(self.db_path) as db:
+            # Both only apply to a file without tables yet; no-ops otherwise.
+            db.execute(f"PRAGMA page_size={PAGE_SIZE}")
+            db.execute("PRAGMA auto_vacuum=INCREMENTAL")
             db.execute(
                 """
                 CREATE TABLE IF NOT EXISTS cache (
@@ -139,13 +292,45 @@ class SqliteCache(Cache):
                 db.execute("ALTER TABLE cache ADD COLUMN pinned INTEGER NOT NULL DEFAULT 0")
             except sqlite3.OperationalError:
                 pass  # column already exists
+            # Migrate existing DBs that predate cost-aware eviction. Their rows keep
+            # priority 0 until next read, so GDSF evicts them first, oldest first.
+            for column in (
+                "hits INTEGER NOT NULL DEFAULT 1",
+                "cost REAL NOT NULL DEFAULT 1.0",
+                "priority REAL NOT NULL DEFAULT 0",
+                "pinned_until REAL",
+            ):
+                try:
+                    db.execute(f"ALTER TABLE cache ADD COLUMN {column}")
+                except sqlite3.OperationalError:
+                    pass  # column already exists
             db.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_accessed ON cache(last_accessed)")
+            # Covers eviction's candidate query: size and pinned sit after the blob in
+            # each row, so reading them from the table would walk its overflow pages.
+            db.execute("CREATE INDEX IF NOT EXISTS idx_cache_eviction ON cache(pinned, last_accessed, size, key)")
+            if self.config.eviction_policy == EvictionPolicy.GDSF:
+                db.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_cache_gdsf ON cache(pinned, priority, last_accessed, size, key)"
+                )
+            db.execute("CREATE TABLE IF NOT EXISTS cache_meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            db.execute("INSERT OR IGNORE INTO cache_meta(name, value) VALUES ('gdsf_clock', 0)")
+            for trigger in _SIZE_TRIGGERS:
+                db.execute(trigger)
+            db.execute("CREATE TABLE IF NOT EXISTS cache_entry_meta (key TEXT PRIMARY KEY, meta BLOB NOT NULL)")
+            db.execute(_META_CASCADE)
+            # Seed the counter once, after the triggers exist: rows written meanwhile
+            # are either in the SUM or counted by a trigger, never both.
+            db.execute(
+                "INSERT OR IGNORE INTO cache_meta(name, value) "
+                "SELECT 'unpinned_bytes', COALESCE(SUM(size), 0) FROM cache WHERE pinned=0"
+            )
             db.execute("PRAGMA journal_mode=WAL")
 
     async def _get_reader(self) -> aiosqlite.Connection:
         if self._reader is None:
             self._reader = await aiosqlite.connect(self.db_path)
             await self._reader.execute("PRAGMA journal_mode=WAL")
+            await self._reader.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
         return self._reader
 
     async def _get_writer(self) -> aiosqlite.Connection:
@@ -153,6 +338,8 @@ class SqliteCache(Cache):
             self._writer = await aiosqlite.connect(self.db_path)
             await self._writer.execute("PRAGMA journal_mode=WAL")
             await self._writer.execute("PRAGMA busy_timeout=5000")
+            await self._writer.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            await self._writer.execute(f"PRAGMA wal_autocheckpoint={WAL_AUTOCHECKPOINT_PAGES}")
         return self._writer
 
     def _ensure_lru_task(self) -> None:
@@ -168,39 +355,80 @@ class SqliteCache(Cache):
     async def _flush_lru(self) -> None:
         if not self._lru_pending:
             return
-        keys = self._lru_pending.copy()
+        counts = self._lru_pending.copy()
         self._lru_pending.clear()
+        by_hits: dict[int, list[str]] = {}
+        for key, hits in counts.items():
+            by_hits.setdefault(hits, []).append(key)
         try:
             db = await self._get_writer()
-            placeholders = ",".join("?" for _ in keys)
-            await db.execute(
-                f"UPDATE cache SET last_accessed=? WHERE key IN ({placeholders})",
-                (time.time(), *keys),
-            )
+            now = time.time()
+            for hits, keys in by_hits.items():
+                for i in range(0, len(keys), 999):
+                    chunk = keys[i : i + 999]
+                    placeholders = ",".join("?" for _ in chunk)
+                    await db.execute(
+                        f"UPDATE cache SET last_accessed=?, hits=hits+?, "
+                        f"priority={_GDSF_CLOCK} + (hits+?) * cost / MAX(size, 1) "
+                        f"WHERE key IN ({placeholders})",
+                        (now, hits, hits, *chunk),
+                    )
             await db.commit()
         except Exception as e:
             logger.exception(f"LRU flush failed for {self.db_path}")
             await log_error(f"Cache LRU flush failed for {self.db_path}: {e}")
 
-    async def store(self, key: str, data: bytes, *, commit: bool = True, pinned: bool = False) -> str | None:
+    async def store(
+        self,
+        key: str,
+        data: bytes,
+        *,
+        commit: bool = True,
+        pinned: bool = False,
+        cost: float = 1.0,
+        meta: bytes | None = None,
+    ) -> str | None:
         ts = time.time()
+        size = len(data) + len(meta or b"")
         db = await self._get_writer()
         await db.execute(
-            "REPLACE INTO cache(key, data, size, created_at, last_accessed, pinned) VALUES(?, ?, ?, ?, ?, ?)",
-            (key, data, len(data), ts, ts, int(pinned)),
+            "INSERT INTO cache(key, data, size, created_at, last_accessed, pinned, hits, cost, priority) "
+            f"VALUES(?, ?, ?, ?, ?, ?, 1, ?, {_GDSF_CLOCK} + ?) "
+            "ON CONFLICT(key) DO UPDATE SET data=excluded.data, size=excluded.size, "
+            "created_at=excluded.created_at, last_accessed=excluded.last_accessed, pinned=excluded.pinned, "
+            "cost=excluded.cost, priority=excluded.priority",
+            (key, data, size, ts, ts, int(pinned), cost, cost / max(size, 1)),
         )
+        if meta is None:
+            await db.execute("DELETE FROM cache_entry_meta WHERE key=?", (key,))
+        else:
+            await db.execute(
+                "INSERT INTO cache_entry_meta(key, meta) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET meta=excluded.meta",
+                (key, meta),
+            )
         if commit:
             await db.commit()
-            if self._max_size_bytes:
-                await self._enforce_max_size()
+            await self._after_commit()
         return key
 
     async def commit(self) -> None:
         db = await self._get_writer()
         await db.commit()
-        if self._max_size_bytes:
+        await self._after_commit()
+
+    async def _after_commit(self) -> None:
+        if not self._max_size_bytes:
+            return
+        self._unpinned_bytes = await self._read_unpinned_bytes()
+        if self._unpinned_bytes > self._max_size_bytes:
             await self._enforce_max_size()
 
+    async def _read_unpinned_bytes(self) -> int:
+        db = await self._get_writer()
+        async with db.execute("SELECT value FROM cache_meta WHERE name='unpinned_bytes'") as cursor:
+            row = await cursor.fetchone()
+        return row[0] if row else 0
+
     async def exists(self, key: str) -> bool:
         db = await self._get_reader()
         async with db.execute("SELECT 1 FROM cache WHERE key=?", (key,)) as cursor:
@@ -246,10 +474,63 @@ class SqliteCache(Cache):
         async with db.execute("SELECT data FROM cache WHERE key=?", (key,)) as cursor:
             row = await cursor.fetchone()
         if row:
-            self._lru_pending.add(key)
+            self._lru_pending[key] += 1
             self._ensure_lru_task()
         return row[0] if row else None
 
+    async def retrieve_record(self, key: str) -> CacheRecord | None:
+        db = await self._get_reader()
+        async with db.execute(
+            "SELECT cache.data, cache_entry_meta.meta FROM cache "
+            "LEFT JOIN cache_entry_meta USING (key) WHERE cache.key=?",
+            (key,),
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        self._lru_pending[key] += 1
+        self._ensure_lru_task()
+        meta = row[1] if row[1] is not None else await self._legacy_meta(key)
+        return CacheRecord(data=row[0], meta=meta)
+
+    async def retrieve_meta(self, key: str) -> bytes | None:
+        db = await self._get_reader()
+        async with db.execute("SELECT meta FROM cache_entry_meta WHERE key=?", (key,)) as cursor:
+            row = await cursor.fetchone()
+        return row[0] if row else await self._legacy_meta(key)
+
+    async def _legacy_meta(self, key: str) -> bytes | None:
+        if self._meta_migrated_to is None:
+            return None
+        db = await self._get_reader()
+        async with db.execute("SELECT data FROM cache WHERE key=?", (key + LEGACY_META_SUFFIX,)) as cursor:
+            row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def _migrate_legacy_meta(self) -> None:
+        """Fold one chunk of "{key}:ts" rows into their entry's meta, walking keys in order."""
+        db = await self._get_writer()
+        async with db.execute(
+            "SELECT key, data FROM cache WHERE key > ? AND key LIKE ? ORDER BY key LIMIT ?",
+            (self._meta_migrated_to, "%" + LEGACY_META_SUFFIX, META_MIGRATION_CHUNK_ROWS),
+        ) as cursor:
+            rows = list(await cursor.fetchall())
+        for legacy_key, meta in rows:
+            owner = legacy_key.removesuffix(LEGACY_META_SUFFIX)
+            cursor = await db.execute(
+                "INSERT OR IGNORE INTO cache_entry_meta(key, meta) SELECT key, ? FROM cache WHERE key=?",
+                (meta, owner),
+            )
+            if cursor.rowcount:
+                await db.execute("UPDATE cache SET size = size + ? WHERE key=?", (len(meta), owner))
+            await db.execute("DELETE FROM cache WHERE key=?", (legacy_key,))
+        await db.commit()
+        if len(rows) < META_MIGRATION_CHUNK_ROWS:
+            self._meta_migrated_to = None
+            logger.info(f"Cache {self.db_path}: legacy metadata rows migrated")
+        else:
+            self._meta_migrated_to = rows[-1][0]
+
     async def delete(self, key: str) -> bool:
         db = await self._get_writer()
         cursor = await db.execute("DELETE FROM cache WHERE key=?", (key,))
@@ -257,35 +538,53 @@ class SqliteCache(Cache):
         return cursor.rowcount > 0
 
     async def _enforce_max_size(self) -> int:
-        """Evict oldest unpinned entries (by last_accessed) until under max_size_bytes."""
-        if not self._max_size_bytes:
-            return 0
-
-        db = await self._get_writer()
-        async with db.execute("SELECT COALESCE(SUM(size), 0) FROM cache WHERE pinned=0") as cursor:
-            row = await cursor.fetchone()
-            assert row is not None
-            unpinned_size = row[0]
+        """Evict unpinned entries in policy order down to the low-water mark.
 
-        if unpinned_size <= self._max_size_bytes:
+        Each chunk is its own transaction, so a large eviction doesn't hold the
+        writer: the persister's batches (and other processes) get in between chunks.
+        """
+        if not self._max_size_bytes or self._evicting:
             return 0
 
-        excess = unpinned_size - self._max_size_bytes
-        async with db.execute("SELECT AVG(size) FROM cache WHERE pinned=0") as cursor:
-            row = await cursor.fetchone()
-            assert row is not None
-            avg_size = row[0] or 1
-
-        # Overshoot so the next few store() calls don't each re-trigger eviction
-        estimate = int(excess / avg_size * 1.2) + 1
-
-        cursor = await db.execute(
-            "DELETE FROM cache WHERE key IN (SELECT key FROM cache WHERE pinned=0 ORDER BY last_accessed ASC LIMIT ?)",
-            (estimate,),
-        )
-        evicted = cursor.rowcount
-        await db.commit()
-        return evicted
+        self._evicting = True
+        try:
+            target = int(self._max_size_bytes * EVICT_TARGET_RATIO)
+            gdsf = self.config.eviction_policy == EvictionPolicy.GDSF
+            db = await self._get_writer()
+            evicted = 0
+            while self._unpinned_bytes > target:
+                async with db.execute(
+                    _eviction_candidates_query(gdsf),
+                    (EVICT_CHUNK_ROWS,),
+                ) as cursor:
+                    rows = await cursor.fetchall()
+                if not rows:
+                    break
+
+                excess = self._unpinned_bytes - target
+                keys: list[str] = []
+                freed = 0
+                clock = 0.0
+                for key, size, priority in rows:
+                    keys.append(key)
+                    freed += size
+                    clock = max(clock, priority)
+                    if freed >= excess:
+                        break
+
+                placeholders = ",".join("?" for _ in keys)
+                cursor = await db.execute(f"DELETE FROM cache WHERE key IN ({placeholders})", keys)
+                evicted += cursor.rowcount
+                if gdsf:
+                    await db.execute(
+                        "UPDATE cache_meta SET value = MAX(value, ?) WHERE name = 'gdsf_clock'",
+                        (clock,),
+                    )
+                await db.commit()
+                self._unpinned_bytes = await self._read_unpinned_bytes()
+            return evicted
+        finally:
+            self._evicting = False
 
     async def get_stats(self) -> CacheStats:
         db = await self._get_reader()
@@ -304,20 +603,38 @@ class SqliteCache(Cache):
             bloat_ratio=bloat_ratio,
         )
 
+    async def _pragma(self, db: aiosqlite.Connection, pragma: str) -> int:
+        async with db.execute(f"PRAGMA {pragma}") as cursor:
+            row = await cursor.fetchone()
+        assert row is not None
+        return row[0]
+
     async def vacuum_if_needed(self, bloat_threshold: float = 2.0) -> bool:
-        stats = await self.get_stats()
+        """Full VACUUM, only for files still on auto_vacuum=NONE.
+
+        Incremental files never need one: maintenance_step returns their free pages
+        (and converts legacy files on its first idle pass).
+        """
+        db = await self._get_writer()
+        if await self._pragma(db, "auto_vacuum") == AUTO_VACUUM_INCREMENTAL:
+            return False
 
+        stats = await self.get_stats()
         if stats.bloat_ratio <= bloat_threshold or stats.data_size_bytes == 0:
             return False
+        await self._convert_to_incremental(db, stats)
+        return True
 
+    async def _convert_to_incremental(self, db: aiosqlite.Connection, stats: CacheStats) -> None:
+        """Switch a legacy file to auto_vacuum=INCREMENTAL; the switch takes a full VACUUM."""
         logger.info(
             f"Cache vacuum starting: {self.db_path} "
             f"(bloat_ratio={stats.bloat_ratio:.2f}, file={stats.file_size_bytes / 1024 / 1024:.1f}MB, "
-            f"data={stats.data_size_bytes / 1024 / 1024:.1f}MB)"
+            f"data={stats.data_size_bytes / 1024 / 1024:.1f}MB, converting to incremental auto_vacuum)"
         )
 
         start = time.time()
-        db = await self._get_writer()
+        await db.execute("PRAGMA auto_vacuum=INCREMENTAL")
         await db.execute("VACUUM")
         await db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
         await db.commit()
@@ -331,33 +648,96 @@ class SqliteCache(Cache):
             f"reclaimed={(stats.file_size_bytes - new_stats.file_size_bytes) / 1024 / 1024:.1f}MB)"
         )
 
-        return True
+    async def _is_quiet(self) -> bool:
+        """True once no connection — any process — has committed for QUIET_PERIOD_S.
+
+        data_version changes whenever another connection commits, including this
+        cache's own writer, so the reader sees every write to the file.
+        """
+        version = await self._pragma(await self._get_reader(), "data_version")
+        if version != self._data_version:
+            self._data_version = version
+            self._last_change = time.monotonic()
+        return time.monotonic() - self._last_change >= QUIET_PERIOD_S
+
+    async def maintenance_step(self) -> None:
+        """Migrate a chunk of legacy metadata rows; when idle, return up to
+        INCREMENTAL_VACUUM_PAGES free pages and checkpoint the WAL.
+
+        A file still on auto_vacuum=NONE is converted on the first idle pass,
+        whatever its bloat: until then its free pages can't be returned at all.
+        """
+        if self._meta_migrated_to is not None:
+            await self._migrate_legacy_meta()
+        if not await self._is_quiet():
+            return
 
-    async def pin(self, keys: list[str]) -> int:
+        db = await self._get_writer()
+        if await self._pragma(db, "auto_vacuum") != AUTO_VACUUM_INCREMENTAL:
+            await self._convert_to_incremental(db, await self.get_stats())
+        else:
+            free_pages = await self._pragma(db, "freelist_count")
+            if free_pages:
+                # The pragma frees one page per step; fetchall runs it to completion.
+                async with db.execute(f"PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES})") as cursor:
+                    await cursor.fetchall()
+                await db.commit()
+                logger.debug(f"Cache {self.db_path}: reclaimed {min(free_pages, INCREMENTAL_VACUUM_PAGES)} pages")
+
+        wal_path = self.db_path.with_name(self.db_path.name + "-wal")
+        wal_size = wal_path.stat().st_size if wal_path.exists() else 0
+        mode = "TRUNCATE" if wal_size > WAL_TRUNCATE_BYTES else "PASSIVE"
+        async with db.execute(f"PRAGMA wal_checkpoint({mode})") as cursor:
+            await cursor.fetchall()
+
+        # Our own writes above must not count as activity.
+        self._data_version = await self._pragma(await self._get_reader(), "data_version")
+
+    async def pin(self, keys: list[str], until: float | None = None) -> int:
         if not keys:
             return 0
         db = await self._get_writer()
         total = 0
-        for i in range(0, len(keys), 999):
-            chunk = keys[i : i + 999]
+        for i in range(0, len(keys), 998):
+            chunk = keys[i : i + 998]
             placeholders = ",".join("?" for _ in chunk)
-            cursor = await db.execute(
-                f"UPDATE cache SET pinned=1 WHERE key IN ({placeholders}) AND pinned=0",
-                chunk,
-            )
+            if until is None:
+                cursor = await db.execute(
+                    f"UPDATE cache SET pinned={PIN_PERMANENT}, pinned_until=NULL "
+                    f"WHERE key IN ({placeholders}) AND pinned!={PIN_PERMANENT}",
+                    chunk,
+                )
+            else:
+                cursor = await db.execute(
+                    f"UPDATE cache SET pinned={PIN_TEMPORARY}, pinned_until=MAX(COALESCE(pinned_until, 0), ?) "
+                    f"WHERE key IN ({placeholders}) AND pinned!={PIN_PERMANENT}",
+                    [until, *chunk],
+                )
             total += cursor.rowcount
         await db.commit()
         return total
 
     async def unpin_all(self) -> int:
         db = await self._get_writer()
-        cursor = await db.execute("UPDATE cache SET pinned=0 WHERE pinned=1")
+        cursor = await db.execute(f"UPDATE cache SET pinned=0 WHERE pinned={PIN_PERMANENT}")
+        await db.commit()
+        return cursor.rowcount
+
+    async def unpin_expired(self) -> int:
+        db = await self._get_writer()
+        cursor = await db.execute(
+            f"UPDATE cache SET pinned=0, pinned_until=NULL WHERE pinned={PIN_TEMPORARY} AND pinned_until < ?",
+            (time.time(),),
+        )
         await db.commit()
         return cursor.rowcount
 
     async def close(self) -> None:
         self._closed = True
         if self._lru_task and not self._lru_task.done():
+            # A task cancelled before its first step never starts the loop coroutine
+            # it was given, which then warns as never awaited: let it start first.
+            await asyncio.sleep(0)
             self._lru_task.cancel()
             try:
                 await self._lru_task
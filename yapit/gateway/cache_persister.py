@@ -2,6 +2,12 @@
 
 Same drain-on-wake pattern as the billing consumer: BRPOP blocks until one
 arrives, RPOP drains the rest, then one SQLite transaction for the whole batch.
+Each variant becomes one cache record: the audio, with its AudioMeta (duration,
+word timestamps) as the record's meta.
+
+Entries are "variant_hash|cost", cost being the model's usage_multiplier, so the
+cache can weigh what evicting the audio would cost to re-synthesize. Bare hashes
+(pushed before the cost was added) are stored at cost 1.0.
 """
 
 import asyncio
@@ -10,7 +16,7 @@ import time
 from loguru import logger
 from redis.asyncio import Redis
 
-from yapit.contracts import TTS_AUDIO_CACHE, TTS_PERSIST, TTS_TIMESTAMPS_CACHE
+from yapit.contracts import TTS_AUDIO_CACHE, TTS_AUDIO_META, TTS_PERSIST, TTS_TIMESTAMPS_LEGACY, AudioMeta
 from yapit.gateway.backoff import Backoff
 from yapit.gateway.cache import Cache
 from yapit.gateway.metrics import log_error, log_event
@@ -18,29 +24,49 @@ from yapit.gateway.metrics import log_error, log_event
 MAX_BATCH = 200
 
 
+def persist_entry(variant_hash: str, cost: float) -> str:
+    return f"{variant_hash}|{cost}"
+
+
+def _parse_entry(entry: str) -> tuple[str, float]:
+    variant_hash, _, cost = entry.partition("|")
+    try:
+        return variant_hash, float(cost) if cost else 1.0
+    except ValueError:
+        return variant_hash, 1.0
+
+
 async def run_cache_persister(redis: Redis, cache: Cache) -> None:
     logger.info("Cache persister starting")
 
     backoff = Backoff()
     while True:
         try:
-            hashes = await _collect_batch(redis)
-            if not hashes:
+            entries = await _collect_batch(redis)
+            if not entries:
                 continue
 
-            audio_keys = [TTS_AUDIO_CACHE.format(hash=h) for h in hashes]
-            ts_keys = [TTS_TIMESTAMPS_CACHE.format(hash=h) for h in hashes]
-            audio_values = await redis.mget(audio_keys)
-            ts_values = await redis.mget(ts_keys)
+            hashes = [h for h, _ in entries]
+            costs = [c for _, c in entries]
+            # One round trip for audio, metadata, and the legacy timestamps key
+            values = await redis.mget(
+                [TTS_AUDIO_CACHE.format(hash=h) for h in hashes]
+                + [TTS_AUDIO_META.format(hash=h) for h in hashes]
+                + [TTS_TIMESTAMPS_LEGACY.format(hash=h) for h in hashes]
+            )
+            n = len(hashes)
+            audio_values, meta_values, legacy_ts_values = values[:n], values[n : 2 * n], values[2 * n :]
 
             start = time.time()
             persisted = 0
-            for variant_hash, audio, ts_json in zip(hashes, audio_values, ts_values):
+            for variant_hash, cost, audio, meta, legacy_ts in zip(
+                hashes, costs, audio_values, meta_values, legacy_ts_values
+            ):
                 if audio is None:
                     continue
-                await cache.store(variant_hash, audio, commit=False)
-                if ts_json:
-                    await cache.store(f"{variant_hash}:ts", ts_json, commit=False)
+                if meta is None and legacy_ts is not None:
+                    meta = AudioMeta(word_timestamps_json=legacy_ts.decode()).model_dump_json().encode()
+                await cache.store(variant_hash, audio, commit=False, cost=cost, meta=meta)
                 persisted += 1
             await cache.commit()
             batch_ms = int((time.time() - start) * 1000)
@@ -61,15 +87,15 @@ async def run_cache_persister(redis: Redis, cache: Cache) -> None:
             await backoff.sleep()
 
 
-async def _collect_batch(redis: Redis) -> list[str]:
+async def _collect_batch(redis: Redis) -> list[tuple[str, float]]:
     result = await redis.brpop(TTS_PERSIST, timeout=5)
     if result is None:
         return []
 
-    hashes = [result[1].decode()]
-    while len(hashes) < MAX_BATCH:
+    entries = [_parse_entry(result[1].decode())]
+    while len(entries) < MAX_BATCH:
         raw = await redis.rpop(TTS_PERSIST)
         if raw is None:
             break
-        hashes.append(raw.decode())
-    return hashes
+        entries.append(_parse_entry(raw.decode()))
+    return entries
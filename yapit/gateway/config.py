@@ -86,6 +86,9 @@ class Settings(BaseSettings):
     metrics_database_url: str | None = None
     log_dir: str
 
+    # Debug: log the stack of any callback holding the event loop longer than this (off when unset)
+    loop_block_threshold_ms: int | None = None
+
     model_config = SettingsConfigDict(
         env_prefix="",
         env_file=[os.getenv("ENV_FILE", ""), ".env"],
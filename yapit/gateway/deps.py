@@ -26,6 +26,7 @@ from yapit.gateway.exceptions import ResourceNotFoundError
 from yapit.gateway.markdown.transformer import DocumentTransformer
 from yapit.gateway.stack_auth.users import User
 from yapit.gateway.storage import ImageStorage, LocalImageStorage, R2ImageStorage
+from yapit.gateway.variant_completions import VariantCompletions
 
 SettingsDep = Annotated[Settings, Depends(get_settings)]
 
@@ -64,6 +65,10 @@ async def get_audio_cache(request: Request) -> Cache:
     return request.app.state.audio_cache
 
 
+async def get_variant_completions(request: Request) -> VariantCompletions:
+    return request.app.state.variant_completions
+
+
 async def get_document_cache(request: Request) -> Cache:
     return request.app.state.document_cache
 
@@ -95,6 +100,15 @@ async def get_doc(
     return doc
 
 
+async def get_admin_user(user: AuthenticatedUser, settings: SettingsDep) -> User:
+    # Self-hosted instances run without auth; whoever reaches the gateway is the operator
+    if not settings.auth_enabled:
+        return user
+    if user.server_metadata is None or not user.server_metadata.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return user
+
+
 async def get_model(
     db: DbSession,
     model_slug: str,
@@ -163,6 +177,7 @@ RedisClient = Annotated[Redis, Depends(get_redis_client)]
 AiExtractorConfigDep = Annotated[ProcessorConfig | None, Depends(get_ai_extractor_config)]
 AiExtractorDep = Annotated[Extractor | None, Depends(get_ai_extractor)]
 AudioCache = Annotated[Cache, Depends(get_audio_cache)]
+Completions = Annotated[VariantCompletions, Depends(get_variant_completions)]
 DocumentCache = Annotated[Cache, Depends(get_document_cache)]
 ExtractionCache = Annotated[Cache, Depends(get_extraction_cache)]
 ImageStorageDep = Annotated[ImageStorage, Depends(get_image_storage)]
@@ -170,6 +185,7 @@ CurrentDoc = Annotated[Document, Depends(get_doc)]
 CurrentVoice = Annotated[Voice, Depends(get_voice)]
 CurrentBlockVariant = Annotated[BlockVariant, Depends(get_block_variant)]
 AuthenticatedUser = Annotated[User, Depends(authenticate)]
+AdminUser = Annotated[User, Depends(get_admin_user)]
 OptionalUser = Annotated[User | None, Depends(authenticate_optional)]
 DocumentTransformerDep = Annotated[DocumentTransformer, Depends(get_document_transformer)]
 StripeClient = Annotated[stripe.StripeClient | None, Depends(get_stripe_client)]
@@ -28,7 +28,7 @@ from yapit.gateway.domain_models import Document, DocumentMetadata, UsageType
 from yapit.gateway.markdown.transformer import DocumentTransformer
 from yapit.gateway.metrics import log_event
 from yapit.gateway.reservations import release_reservation
-from yapit.gateway.supervision import supervised
+from yapit.gateway.supervision import run_as_leader, supervised
 from yapit.gateway.usage import record_usage
 
 POLL_INTERVAL_SECONDS = 15
@@ -244,7 +244,9 @@ class BatchPoller:
         if self._running:
             return
         self._running = True
-        self._task = asyncio.create_task(supervised("batch-poller", self._poll_loop()))
+        self._task = asyncio.create_task(
+            supervised("batch-poller", run_as_leader(self._redis, "batch-poller", self._poll_loop))
+        )
         logger.info("Batch poller started")
 
     async def stop(self) -> None:
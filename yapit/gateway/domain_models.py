@@ -13,6 +13,7 @@ from sqlalchemy.types import JSON
 from sqlmodel import TEXT, Column, DateTime, Field, Relationship, SQLModel
 
 from yapit.gateway.markdown.models import StructuredDocument
+from yapit.gateway.text_canonical import canonicalize
 
 # NOTE: Forward annotations do not work with SQLModel
 
@@ -166,8 +167,9 @@ class BlockVariant(SQLModel, table=True):
 
     @staticmethod
     def get_hash(text: str, model_slug: str, voice_slug: str, parameters: dict) -> str:
+        """Hash of the canonical text (what gets synthesized), model, voice and parameters."""
         hasher = hashlib.sha256()
-        hasher.update(text.encode("utf-8"))
+        hasher.update(canonicalize(text).encode("utf-8"))
         hasher.update(f"|{model_slug}".encode())
         hasher.update(f"|{voice_slug}".encode())
         for key, value in sorted(parameters.items()):
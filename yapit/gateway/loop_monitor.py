@@ -0,0 +1,117 @@
+"""Event-loop lag sampling and blocking-call detection.
+
+The gateway runs every WebSocket, consumer and request handler on one event loop,
+so any sync call that holds it (a large `write_bytes`, validating a big cached
+document, regexes over a whole document) stalls all of them at once.
+
+- `run_loop_lag_monitor` — always on. Sleeps a fixed interval and measures how
+  late it wakes up; the overshoot is the time other callbacks held the loop.
+  Percentiles are reported as one `event_loop_lag` event per window.
+- `run_blocking_call_detector` — opt-in debug mode (`LOOP_BLOCK_THRESHOLD_MS`).
+  A watchdog thread captures the loop thread's stack while it is stuck, which is
+  the only moment the offending call is still on it. The stack is logged from
+  the thread, and reported as an `event_loop_blocked` event once the loop runs again.
+"""
+
+import asyncio
+import math
+import sys
+import threading
+import time
+import traceback
+
+from loguru import logger
+
+from yapit.gateway.metrics import log_event
+
+LAG_SAMPLE_INTERVAL_S = 0.5
+LAG_REPORT_INTERVAL_S = 60.0
+
+# Frames kept per captured stack; the blocking call is at the innermost end.
+MAX_STACK_FRAMES = 30
+
+
+def lag_percentiles(samples_ms: list[float]) -> dict[str, float]:
+    """Nearest-rank p50/p95/p99 plus max. Empty input reports zeros."""
+    if not samples_ms:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples_ms)
+
+    def rank(p: float) -> float:
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+    return {
+        "p50_ms": round(rank(50), 1),
+        "p95_ms": round(rank(95), 1),
+        "p99_ms": round(rank(99), 1),
+        "max_ms": round(ordered[-1], 1),
+    }
+
+
+async def run_loop_lag_monitor(
+    sample_interval_s: float = LAG_SAMPLE_INTERVAL_S,
+    report_interval_s: float = LAG_REPORT_INTERVAL_S,
+) -> None:
+    loop = asyncio.get_running_loop()
+    samples: list[float] = []
+    window_start = loop.time()
+
+    while True:
+        before = loop.time()
+        await asyncio.sleep(sample_interval_s)
+        now = loop.time()
+        samples.append(max(0.0, (now - before - sample_interval_s) * 1000))
+
+        if now - window_start >= report_interval_s:
+            stats = lag_percentiles(samples)
+            # p99 goes in the duration_ms column so it lands in the continuous aggregates
+            await log_event(
+                "event_loop_lag",
+                duration_ms=int(stats["p99_ms"]),
+                data={**stats, "samples": len(samples)},
+            )
+            samples.clear()
+            window_start = now
+
+
+async def run_blocking_call_detector(threshold_ms: int) -> None:
+    """Log the stack of any callback that holds the loop longer than `threshold_ms`.
+
+    The loop ticks a heartbeat every quarter threshold; the watchdog thread reads
+    it at the same cadence, so a stall is caught within ~1.25x the threshold.
+    """
+    assert threshold_ms > 0
+    threshold_s = threshold_ms / 1000
+    tick_s = threshold_s / 4
+    loop_thread_id = threading.get_ident()
+    last_tick = time.monotonic()
+    stalled_stack: str | None = None
+    stopped = threading.Event()
+
+    def watchdog() -> None:
+        nonlocal stalled_stack
+        while not stopped.wait(tick_s):
+            stalled_s = time.monotonic() - last_tick
+            if stalled_s < threshold_s or stalled_stack is not None:
+                continue
+            frame = sys._current_frames().get(loop_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame, limit=MAX_STACK_FRAMES))
+            stalled_stack = stack
+            logger.warning(f"Event loop blocked for >{stalled_s * 1000:.0f}ms, loop thread stack:\n{stack}")
+
+    thread = threading.Thread(target=watchdog, name="blocking-call-detector", daemon=True)
+    thread.start()
+    logger.info(f"Blocking-call detector started (threshold={threshold_ms}ms)")
+
+    try:
+        while True:
+            await asyncio.sleep(tick_s)
+            previous_tick, last_tick = last_tick, time.monotonic()
+            if stalled_stack is not None:
+                blocked_ms = int((last_tick - previous_tick - tick_s) * 1000)
+                stack, stalled_stack = stalled_stack, None
+                await log_event("event_loop_blocked", duration_ms=blocked_ms, data={"stack": stack})
+    finally:
+        stopped.set()
@@ -15,7 +15,7 @@ from yapit.gateway.backoff import (
     delay_for,
 )
 from yapit.gateway.metrics import log_event
-from yapit.synth import SynthAdapter
+from yapit.synth import SynthAdapter, raise_if_cancelled
 
 OGG_MAGIC = b"OggS"
 
@@ -47,6 +47,8 @@ class OpenAITTSAdapter(SynthAdapter):
         assert self._client is not None, "Adapter not initialized"
         last_error: Exception | None = None
         for attempt in range(API_MAX_RETRIES):
+            if attempt > 0:
+                raise_if_cancelled()  # the block may have been skipped while we backed off
             try:
                 response = await self._client.audio.speech.create(
                     model=self._model,
@@ -1,36 +1,187 @@
 """Hot path: consumes worker results, buffers audio in Redis, notifies subscribers.
 
-No Postgres, no SQLite. Audio is SET in Redis (sub-ms) for immediate serving,
-then queued for batch persistence to SQLite via tts:persist.
+No Postgres. Audio is SET in Redis (sub-ms) for immediate serving, then queued
+for batch persistence to SQLite via tts:persist.
 Billing events are pushed to tts:billing for the billing consumer.
+
+The Redis audio buffer is capped at AUDIO_BUFFER_MAX_BYTES (audio + meta, until
+the keys expire). A burst of long blocks would otherwise grow Redis memory
+without bound while the persister catches up. Past the cap, audio skips Redis and
+is stored straight into the SQLite cache before subscribers are told it's ready;
+that's slower, but it's the only point where SQLite is on the hot path.
+
+Results arrive on a Redis Stream read through a consumer group, so any number of
+gateway processes can share the work and a result stays pending until the
+finalization transaction that acks it commits. A gateway that dies mid-batch
+leaves its entries pending; another consumer takes them over with XAUTOCLAIM once
+they've been idle for CLAIM_MIN_IDLE_MS.
+
+A batch costs three round trips however large it is: one pipeline of claim
+scripts, one pipeline of buffer scripts that SET the audio, then one MULTI/EXEC
+with every notification, billing event, persist entry and the ack. At most MAX_CONCURRENT_BATCHES are finalized at once; further
+results wait in the stream.
 """
 
 import asyncio
 import base64
+import json
+import os
+import socket
 import time
 import uuid
+from dataclasses import dataclass
 
 from loguru import logger
 from pydantic import BaseModel
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.commands.core import AsyncScript
+from redis.exceptions import ResponseError
 
 from yapit.contracts import (
+    TTS_AUDIO_BUFFER,
+    TTS_AUDIO_BUFFER_BYTES,
+    TTS_AUDIO_BUFFER_SIZES,
     TTS_AUDIO_CACHE,
+    TTS_AUDIO_META,
     TTS_BILLING_STREAM,
+    TTS_FENCES,
     TTS_INFLIGHT,
     TTS_PENDING,
     TTS_PERSIST,
+    TTS_RESULT_CLAIM,
     TTS_RESULTS,
+    TTS_RESULTS_GROUP,
+    TTS_RESULTS_LEGACY,
+    TTS_STATUS_LOG,
+    TTS_STATUS_LOG_TTL_S,
     TTS_SUBSCRIBERS,
-    TTS_TIMESTAMPS_CACHE,
+    TTS_VARIANT_DONE,
+    AudioMeta,
     WorkerResult,
     get_pubsub_channel,
 )
 from yapit.gateway.api.v1.ws import BlockStatus, WSBlockStatus
 from yapit.gateway.backoff import Backoff
+from yapit.gateway.cache import Cache
+from yapit.gateway.cache_persister import persist_entry
 from yapit.gateway.metrics import log_error, log_event
+from yapit.word_timestamps import encode_b64
 
 AUDIO_CACHE_TTL_S = 300
+AUDIO_BUFFER_MAX_BYTES = 256 * 1024 * 1024
+MAX_BATCH = 50
+MAX_CONCURRENT_BATCHES = 4
+
+RECOVERY_INTERVAL_S = 15
+CLAIM_MIN_IDLE_MS = 30_000  # finalizing a batch takes milliseconds; 30s idle means its consumer died
+CONSUMER_EXPIRY_MS = 3_600_000  # consumers idle this long with nothing pending are gone for good
+RESULT_CLAIM_TTL_S = 600
+STATUS_LOG_MAXLEN = 200  # per user and document; a resume replays what's still in it
+
+# Claims one result atomically. A fenced result must still hold its job's fence
+# token (-1 otherwise), so a result from a reclaimed lease can't finalize the
+# variant under the job's new holder. Whoever deletes the inflight key finalizes
+# (0 = already finalized). The winner moves the subscriber set to a claim record,
+# so a block subscribing for a follow-up job isn't wiped out by our cleanup, and a
+# redelivery of the same stream entry (its consumer died before acking) finds its
+# subscribers there. The record is tagged with '#' .. entry id, which subscriber
+# entries ("user:doc:idx") can never collide with.
+_CLAIM_RESULT_LUA = """
+if redis.call('EXISTS', KEYS[4]) == 1 then
+    if redis.call('SISMEMBER', KEYS[4], '#' .. ARGV[4]) == 0 then
+        return {0}
+    end
+else
+    if ARGV[2] ~= '' then
+        if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2] then
+            return {-1}
+        end
+        redis.call('HDEL', KEYS[1], ARGV[1])
+    end
+    if redis.call('DEL', KEYS[2]) == 0 then
+        return {0}
+    end
+    if redis.call('EXISTS', KEYS[3]) == 1 then
+        redis.call('RENAME', KEYS[3], KEYS[4])
+    end
+    redis.call('SADD', KEYS[4], '#' .. ARGV[4])
+    redis.call('EXPIRE', KEYS[4], ARGV[3])
+end
+return {1, redis.call('SMEMBERS', KEYS[4])}
+"""
+
+# Workers deployed before the stream still LPUSH to the old list. Move whatever
+# they left into the stream atomically, so a rollout loses nothing.
+_FORWARD_LEGACY_LUA = """
+local moved = 0
+while moved < tonumber(ARGV[1]) do
+    local raw = redis.call('RPOP', KEYS[1])
+    if not raw then
+        break
+    end
+    redis.call('XADD', KEYS[2], '*', 'data', raw)
+    moved = moved + 1
+end
+return moved
+"""
+
+# Drops buffer accounting for entries whose tts:audio keys have expired.
+# KEYS: buffer zset, sizes hash, bytes counter. ARGV[1]: now (ms).
+_PRUNE_AUDIO_BUFFER_LUA = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+for _, variant_hash in ipairs(expired) do
+    local size = redis.call('HGET', KEYS[2], variant_hash)
+    if size then
+        redis.call('DECRBY', KEYS[3], size)
+        redis.call('HDEL', KEYS[2], variant_hash)
+    end
+end
+if #expired > 0 then
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+end
+"""
+
+# SETs a variant's audio and meta if the buffer has room for them (1), else
+# leaves Redis untouched (0). A redelivered result replaces its own entry rather
+# than counting twice. KEYS 4-5: audio and meta keys. ARGV: now (ms), TTL (s),
+# cap (bytes), variant hash, audio, meta.
+_BUFFER_AUDIO_LUA = (
+    _PRUNE_AUDIO_BUFFER_LUA
+    + """
+local size = string.len(ARGV[5]) + string.len(ARGV[6])
+local previous = tonumber(redis.call('HGET', KEYS[2], ARGV[4]) or '0')
+local total = tonumber(redis.call('GET', KEYS[3]) or '0') - previous
+if total + size > tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('SET', KEYS[4], ARGV[5], 'EX', ARGV[2])
+redis.call('SET', KEYS[5], ARGV[6], 'EX', ARGV[2])
+redis.call('ZADD', KEYS[1], tonumber(ARGV[1]) + tonumber(ARGV[2]) * 1000, ARGV[4])
+redis.call('HSET', KEYS[2], ARGV[4], size)
+redis.call('INCRBY', KEYS[3], size - previous)
+return 1
+"""
+)
+
+_AUDIO_BUFFER_USAGE_LUA = (
+    _PRUNE_AUDIO_BUFFER_LUA
+    + """
+return {tonumber(redis.call('GET', KEYS[3]) or '0'), redis.call('ZCARD', KEYS[1])}
+"""
+)
+
+# Built once per process, not per call: each call passes the client (or pipeline)
+# to run on, and the script is loaded into Redis on first use.
+_CLAIM_RESULT = AsyncScript(None, _CLAIM_RESULT_LUA.encode())
+_FORWARD_LEGACY = AsyncScript(None, _FORWARD_LEGACY_LUA.encode())
+_BUFFER_AUDIO = AsyncScript(None, _BUFFER_AUDIO_LUA.encode())
+_AUDIO_BUFFER_USAGE = AsyncScript(None, _AUDIO_BUFFER_USAGE_LUA.encode())
+
+_AUDIO_BUFFER_KEYS = [TTS_AUDIO_BUFFER, TTS_AUDIO_BUFFER_SIZES, TTS_AUDIO_BUFFER_BYTES]
+
+_CLAIM_STALE = -1
+_CLAIM_DUPLICATE = 0
 
 _background_tasks: set[asyncio.Task] = set()
 
@@ -53,21 +204,40 @@ class BillingEvent(BaseModel):
     block_idx: int
 
 
-async def run_result_consumer(redis: Redis) -> None:
-    logger.info("Result consumer starting")
+@dataclass
+class _ClaimedResult:
+    result: WorkerResult
+    subscribers: list[bytes]
 
+
+async def run_result_consumer(redis: Redis, cache: Cache) -> None:
+    consumer = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info(f"Result consumer {consumer} starting")
+
+    slots = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
     backoff = Backoff()
+    next_recovery = 0.0
     while True:
         try:
-            result = await redis.brpop(TTS_RESULTS, timeout=5)
-            if result is None:
-                continue
-
-            _, result_json = result
-            worker_result = WorkerResult.model_validate_json(result_json)
-            task = asyncio.create_task(_process_result(redis, worker_result))
-            _background_tasks.add(task)
-            task.add_done_callback(_background_tasks.discard)
+            if time.time() >= next_recovery:
+                await _recover(redis, cache, consumer)
+                await _report_audio_buffer(redis)
+                next_recovery = time.time() + RECOVERY_INTERVAL_S
+
+            # Wait for a free slot before reading, so a backlog stays in the stream
+            # (visible to report.sh) rather than piling up as gateway tasks
+            await slots.acquire()
+            task = None
+            try:
+                batch = await _collect_batch(redis, consumer)
+                if batch:
+                    task = asyncio.create_task(_process_batch(redis, cache, batch))
+                    _background_tasks.add(task)
+                    task.add_done_callback(_background_tasks.discard)
+                    task.add_done_callback(lambda _: slots.release())
+            finally:
+                if task is None:
+                    slots.release()
 
             backoff.reset()
 
@@ -80,74 +250,310 @@ async def run_result_consumer(redis: Redis) -> None:
             await backoff.sleep()
 
 
-async def _process_result(redis: Redis, result: WorkerResult) -> None:
-    result_log = logger.bind(
-        variant_hash=result.variant_hash,
-        user_id=result.user_id,
-        model_slug=result.model_slug,
-        voice_slug=result.voice_slug,
-        job_id=str(result.job_id),
-        worker_id=result.worker_id,
-    )
+async def _ensure_consumer_group(redis: Redis) -> None:
     try:
-        if result.error:
-            await _handle_error(redis, result)
-        else:
-            await _handle_success(redis, result)
-    except Exception as e:
-        result_log.exception(f"Error processing result: {e}")
-        await log_error(
-            f"Result processing failed for variant {result.variant_hash}: {e}",
-            variant_hash=result.variant_hash,
-            model_slug=result.model_slug,
-            voice_slug=result.voice_slug,
-            user_id=result.user_id,
-            document_id=str(result.document_id),
-            block_idx=result.block_idx,
+        await redis.xgroup_create(TTS_RESULTS, TTS_RESULTS_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def _recover(redis: Redis, cache: Cache, consumer: str) -> None:
+    """Take over results stranded by dead consumers, and report who holds what.
+
+    Also re-creates the group after a Redis reset, and forwards results from
+    workers still pushing to the legacy list.
+    """
+    await _ensure_consumer_group(redis)
+
+    forwarded = await _FORWARD_LEGACY(keys=[TTS_RESULTS_LEGACY, TTS_RESULTS], args=[MAX_BATCH], client=redis)
+    while forwarded == MAX_BATCH:
+        forwarded = await _FORWARD_LEGACY(keys=[TTS_RESULTS_LEGACY, TTS_RESULTS], args=[MAX_BATCH], client=redis)
+
+    reclaimed = 0
+    cursor = "0-0"
+    while True:
+        cursor, entries, _deleted = await redis.xautoclaim(
+            TTS_RESULTS, TTS_RESULTS_GROUP, consumer, CLAIM_MIN_IDLE_MS, start_id=cursor, count=MAX_BATCH
+        )
+        batch = await _parse_entries(redis, entries)
+        if batch:
+            await _process_batch(redis, cache, batch)
+            reclaimed += len(batch)
+        if cursor in (b"0-0", "0-0"):
+            break
+
+    pending_by_consumer: dict[str, int] = {}
+    for info in await redis.xinfo_consumers(TTS_RESULTS, TTS_RESULTS_GROUP):
+        name = info["name"].decode() if isinstance(info["name"], bytes) else info["name"]
+        if info["pending"] == 0 and info["idle"] > CONSUMER_EXPIRY_MS and name != consumer:
+            await redis.xgroup_delconsumer(TTS_RESULTS, TTS_RESULTS_GROUP, name)
+            continue
+        pending_by_consumer[name] = info["pending"]
+
+    total_pending = sum(pending_by_consumer.values())
+    if reclaimed:
+        logger.warning(f"Reclaimed {reclaimed} results from dead consumers")
+    if total_pending or reclaimed:
+        await log_event(
+            "result_stream_pending",
+            queue_type="tts",
+            data={"pending": total_pending, "reclaimed": reclaimed, "consumers": pending_by_consumer},
         )
-        await _notify_subscribers(redis, result, status="error", error="Synthesis failed")
 
 
-async def _handle_success(redis: Redis, result: WorkerResult) -> None:
-    log = logger.bind(
-        variant_hash=result.variant_hash,
-        user_id=result.user_id,
-        model_slug=result.model_slug,
-        voice_slug=result.voice_slug,
-        job_id=str(result.job_id),
-        worker_id=result.worker_id,
-    )
+async def _collect_batch(redis: Redis, consumer: str) -> list[tuple[bytes, WorkerResult]]:
+    """Block until results arrive, read up to MAX_BATCH."""
+
+    async def read() -> list:
+        return await redis.xreadgroup(
+            TTS_RESULTS_GROUP,
+            consumer,
+            {TTS_RESULTS: ">"},
+            count=MAX_BATCH,
+            block=5000,
+        )
+
+    try:
+        entries = await read()
+    except ResponseError as e:
+        if "NOGROUP" not in str(e):
+            raise
+        logger.warning("Result consumer group missing (Redis reset?), re-creating")
+        await _ensure_consumer_group(redis)
+        entries = await read()
+    if not entries:
+        return []
+    return await _parse_entries(redis, entries[0][1])
+
+
+async def _parse_entries(redis: Redis, raw_entries: list) -> list[tuple[bytes, WorkerResult]]:
+    parsed = []
+    for entry_id, fields in raw_entries:
+        try:
+            parsed.append((entry_id, WorkerResult.model_validate_json(fields[b"data"])))
+        except Exception:
+            logger.exception(f"Poison worker result {entry_id}, acking to unblock")
+            await log_error(f"Poison worker result {entry_id!r} dropped")
+            await redis.xack(TTS_RESULTS, TTS_RESULTS_GROUP, entry_id)
+            await redis.xdel(TTS_RESULTS, entry_id)
+    return parsed
+
+
+async def _process_batch(redis: Redis, cache: Cache, batch: list[tuple[bytes, WorkerResult]]) -> None:
+    """Finalize a batch. On failure nothing is acked: the entries stay pending and
+    are reclaimed, with their claim records, once they've sat idle long enough.
+    """
+    try:
+        claimed = await _claim_results(redis, batch)
+        await _finalize(redis, cache, claimed, [entry_id for entry_id, _ in batch])
+    except Exception as e:
+        logger.exception(f"Error finalizing batch of {len(batch)} results: {e}")
+        await log_error(f"Result batch finalization failed ({len(batch)} results): {e}")
+
+
+async def _claim_results(redis: Redis, batch: list[tuple[bytes, WorkerResult]]) -> list[_ClaimedResult]:
+    """Claim every result in one pipeline; returns the ones this consumer must finalize."""
+    pipe = redis.pipeline(transaction=False)
+    for entry_id, result in batch:
+        await _CLAIM_RESULT(
+            keys=[
+                TTS_FENCES,
+                TTS_INFLIGHT.format(hash=result.variant_hash),
+                TTS_SUBSCRIBERS.format(hash=result.variant_hash),
+                TTS_RESULT_CLAIM.format(job_id=result.job_id),
+            ],
+            args=[
+                str(result.job_id),
+                "" if result.lease_token is None else str(result.lease_token),
+                RESULT_CLAIM_TTL_S,
+                entry_id,
+            ],
+            client=pipe,
+        )
+    replies = await pipe.execute()
+
+    claimed = []
+    for (_, result), reply in zip(batch, replies):
+        outcome = reply[0]
+        if outcome == _CLAIM_STALE:
+            _result_logger(result).warning(f"Dropping result from expired lease (token {result.lease_token})")
+            await log_event(
+                "stale_result_rejected",
+                model_slug=result.model_slug,
+                worker_id=result.worker_id,
+                worker_latency_ms=result.processing_time_ms,
+                queue_type="tts",
+                data={"job_id": str(result.job_id), "lease_token": result.lease_token},
+            )
+        elif outcome == _CLAIM_DUPLICATE:
+            _result_logger(result).info("Variant already finalized, skipping duplicate result")
+        else:
+            subscribers = [entry for entry in reply[1] if not entry.startswith(b"#")]
+            claimed.append(_ClaimedResult(result=result, subscribers=subscribers))
+    return claimed
 
-    inflight_key = TTS_INFLIGHT.format(hash=result.variant_hash)
-    if await redis.delete(inflight_key) == 0:
-        log.info("Variant already finalized, skipping duplicate result")
-        return
 
+async def _finalize(redis: Redis, cache: Cache, claimed: list[_ClaimedResult], entry_ids: list[bytes]) -> None:
+    """One transaction: either every effect of the batch lands together with the
+    ack, or none does and the entries are redelivered.
+
+    The audio is stored first, outside the transaction, so it's readable by the
+    time subscribers hear it's cached. A redelivery stores it again.
+    """
     finalize_start = time.time()
+    pipe = redis.pipeline(transaction=True)
+    synthesized: list[tuple[_ClaimedResult, bytes, AudioMeta]] = []
+
+    for item in claimed:
+        result = item.result
+        if result.cancelled:
+            _queue_notifications(pipe, item, status="cancelled")
+        elif result.error:
+            _queue_notifications(pipe, item, status="error", error=result.error)
+        elif not result.audio_base64:
+            _result_logger(result).info("Empty audio, marking as skipped")
+            _queue_notifications(pipe, item, status="skipped")
+        else:
+            try:
+                audio = base64.b64decode(result.audio_base64, validate=True)
+            except ValueError as e:
+                _result_logger(result).error(f"Undecodable audio in worker result: {e}")
+                _queue_notifications(pipe, item, status="error", error="Synthesis failed")
+                continue
+            word_timestamps = result.word_timestamps
+            if word_timestamps is None and result.word_timestamps_json:
+                # Older worker: convert once here rather than on every read
+                word_timestamps = encode_b64(json.loads(result.word_timestamps_json))
+            meta = AudioMeta(duration_ms=result.duration_ms, word_timestamps=word_timestamps)
+            synthesized.append((item, audio, meta))
+
+    spilled = await _buffer_audio(redis, cache, synthesized)
+    persisted: list[str] = []
+    for item, _, meta in synthesized:
+        result = item.result
+        _queue_notifications(
+            pipe,
+            item,
+            status="cached",
+            audio_url=f"/v1/audio/{result.variant_hash}",
+            word_timestamps_compact=meta.word_timestamps,
+        )
+        pipe.xadd(TTS_BILLING_STREAM, {"data": _billing_event(result).model_dump_json()})
+        if result.variant_hash not in spilled:
+            persisted.append(persist_entry(result.variant_hash, result.usage_multiplier))
+
+    if persisted:
+        pipe.lpush(TTS_PERSIST, *persisted)
+    if claimed:
+        pipe.delete(*[TTS_RESULT_CLAIM.format(job_id=item.result.job_id) for item in claimed])
+    pipe.xack(TTS_RESULTS, TTS_RESULTS_GROUP, *entry_ids)
+    pipe.xdel(TTS_RESULTS, *entry_ids)
+    await pipe.execute()
 
-    if not result.audio_base64:
-        log.info("Empty audio, marking as skipped")
-        await _notify_subscribers(redis, result, status="skipped")
-        return
+    finalize_ms = int((time.time() - finalize_start) * 1000)
+    for item in claimed:
+        await _log_outcome(item.result, finalize_ms)
 
-    audio = base64.b64decode(result.audio_base64)
 
-    audio_key = TTS_AUDIO_CACHE.format(hash=result.variant_hash)
-    await redis.set(audio_key, audio, ex=AUDIO_CACHE_TTL_S)
+async def _buffer_audio(
+    redis: Redis, cache: Cache, synthesized: list[tuple[_ClaimedResult, bytes, AudioMeta]]
+) -> set[str]:
+    """SET each variant's audio and meta in Redis while the buffer has room; store
+    the rest straight into the SQLite cache. Returns the hashes that went to SQLite.
+    """
+    if not synthesized:
+        return set()
+    pipe = redis.pipeline(transaction=False)
+    now_ms = int(time.time() * 1000)
+    records = [(item.result, audio, meta.model_dump_json().encode()) for item, audio, meta in synthesized]
+    for result, audio, meta in records:
+        await _BUFFER_AUDIO(
+            keys=[
+                *_AUDIO_BUFFER_KEYS,
+                TTS_AUDIO_CACHE.format(hash=result.variant_hash),
+                TTS_AUDIO_META.format(hash=result.variant_hash),
+            ],
+            args=[now_ms, AUDIO_CACHE_TTL_S, AUDIO_BUFFER_MAX_BYTES, result.variant_hash, audio, meta],
+            client=pipe,
+        )
+    buffered = await pipe.execute()
+
+    overflow = [record for record, ok in zip(records, buffered) if not ok]
+    if not overflow:
+        return set()
+    start = time.time()
+    for result, audio, meta in overflow:
+        await cache.store(result.variant_hash, audio, commit=False, cost=result.usage_multiplier, meta=meta)
+    await cache.commit()
+    await log_event(
+        "audio_buffer_overflow",
+        data={
+            "spilled": len(overflow),
+            "spilled_bytes": sum(len(audio) + len(meta) for _, audio, meta in overflow),
+            "store_ms": int((time.time() - start) * 1000),
+            "max_bytes": AUDIO_BUFFER_MAX_BYTES,
+        },
+    )
+    return {result.variant_hash for result, _, _ in overflow}
 
-    if result.word_timestamps_json:
-        ts_key = TTS_TIMESTAMPS_CACHE.format(hash=result.variant_hash)
-        await redis.set(ts_key, result.word_timestamps_json.encode(), ex=AUDIO_CACHE_TTL_S)
 
-    await _notify_subscribers(
-        redis,
-        result,
-        status="cached",
-        audio_url=f"/v1/audio/{result.variant_hash}",
-        word_timestamps=result.word_timestamps_json,
+async def _report_audio_buffer(redis: Redis) -> None:
+    buffered_bytes, entries = await _AUDIO_BUFFER_USAGE(
+        keys=_AUDIO_BUFFER_KEYS, args=[int(time.time() * 1000)], client=redis
     )
+    if entries:
+        await log_event(
+            "audio_buffer_usage",
+            data={"bytes": buffered_bytes, "entries": entries, "max_bytes": AUDIO_BUFFER_MAX_BYTES},
+        )
 
-    billing_event = BillingEvent(
+
+def _queue_notifications(
+    pipe: Pipeline,
+    item: _ClaimedResult,
+    status: BlockStatus,
+    audio_url: str | None = None,
+    error: str | None = None,
+    word_timestamps_compact: str | None = None,
+) -> None:
+    result = item.result
+    pipe.publish(TTS_VARIANT_DONE.format(hash=result.variant_hash), status)
+    for entry in item.subscribers:
+        parts = entry.decode().split(":")
+        if len(parts) != 3:
+            _result_logger(result).error(f"Invalid subscriber entry format: {entry}")
+            continue
+
+        user_id, doc_id_str, block_idx_str = parts
+        try:
+            doc_id = uuid.UUID(doc_id_str)
+            block_idx = int(block_idx_str)
+        except ValueError:
+            _result_logger(result).error(f"Invalid subscriber entry format: {entry}")
+            continue
+
+        payload = WSBlockStatus(
+            document_id=doc_id,
+            block_idx=block_idx,
+            status=status,
+            audio_url=audio_url,
+            error=error,
+            model_slug=result.model_slug,
+            voice_slug=result.voice_slug,
+            word_timestamps_compact=word_timestamps_compact,
+            duration_ms=result.duration_ms,
+        ).model_dump_json()
+        pipe.srem(TTS_PENDING.format(user_id=user_id, document_id=doc_id), block_idx)
+        pipe.publish(get_pubsub_channel(user_id, doc_id), payload)
+        # Kept briefly for connections that drop and resume (see ws.py)
+        status_log = TTS_STATUS_LOG.format(user_id=user_id, document_id=doc_id)
+        pipe.xadd(status_log, {"data": payload}, maxlen=STATUS_LOG_MAXLEN)
+        pipe.expire(status_log, TTS_STATUS_LOG_TTL_S)
+
+
+def _billing_event(result: WorkerResult) -> BillingEvent:
+    return BillingEvent(
         job_id=str(result.job_id),
         variant_hash=result.variant_hash,
         user_id=result.user_id,
@@ -159,32 +565,61 @@ async def _handle_success(redis: Redis, result: WorkerResult) -> None:
         document_id=str(result.document_id),
         block_idx=result.block_idx,
     )
-    await redis.xadd(TTS_BILLING_STREAM, {"data": billing_event.model_dump_json()})
-    await redis.lpush(TTS_PERSIST, result.variant_hash)
 
-    finalize_ms = int((time.time() - finalize_start) * 1000)
 
-    await log_event(
-        "synthesis_complete",
-        variant_hash=result.variant_hash,
-        model_slug=result.model_slug,
-        voice_slug=result.voice_slug,
-        text_length=result.text_length,
-        queue_wait_ms=result.queue_wait_ms,
-        worker_latency_ms=result.processing_time_ms,
-        total_latency_ms=result.queue_wait_ms + result.processing_time_ms + finalize_ms,
-        audio_duration_ms=result.duration_ms,
-        worker_id=result.worker_id,
-        queue_type="tts",
-        user_id=result.user_id,
-        document_id=str(result.document_id),
-        block_idx=result.block_idx,
-        data={"finalize_ms": finalize_ms},
-    )
+async def _log_outcome(result: WorkerResult, finalize_ms: int) -> None:
+    if result.cancelled:
+        await log_event(
+            "synthesis_cancelled",
+            variant_hash=result.variant_hash,
+            model_slug=result.model_slug,
+            voice_slug=result.voice_slug,
+            text_length=result.text_length,
+            queue_wait_ms=result.queue_wait_ms,
+            worker_latency_ms=result.processing_time_ms,
+            worker_id=result.worker_id,
+            queue_type="tts",
+            user_id=result.user_id,
+            document_id=str(result.document_id),
+            block_idx=result.block_idx,
+        )
+    elif result.error:
+        await log_event(
+            "synthesis_error",
+            variant_hash=result.variant_hash,
+            model_slug=result.model_slug,
+            voice_slug=result.voice_slug,
+            queue_wait_ms=result.queue_wait_ms,
+            worker_latency_ms=result.processing_time_ms,
+            worker_id=result.worker_id,
+            queue_type="tts",
+            user_id=result.user_id,
+            document_id=str(result.document_id),
+            block_idx=result.block_idx,
+            data={"error": result.error, "error_detail": result.error_detail},
+        )
+    elif result.audio_base64:
+        await log_event(
+            "synthesis_complete",
+            variant_hash=result.variant_hash,
+            model_slug=result.model_slug,
+            voice_slug=result.voice_slug,
+            text_length=result.text_length,
+            queue_wait_ms=result.queue_wait_ms,
+            worker_latency_ms=result.processing_time_ms,
+            total_latency_ms=result.queue_wait_ms + result.processing_time_ms + finalize_ms,
+            audio_duration_ms=result.duration_ms,
+            worker_id=result.worker_id,
+            queue_type="tts",
+            user_id=result.user_id,
+            document_id=str(result.document_id),
+            block_idx=result.block_idx,
+            data={"finalize_ms": finalize_ms},
+        )
 
 
-async def _handle_error(redis: Redis, result: WorkerResult) -> None:
-    log = logger.bind(
+def _result_logger(result: WorkerResult):
+    return logger.bind(
         variant_hash=result.variant_hash,
         user_id=result.user_id,
         model_slug=result.model_slug,
@@ -192,72 +627,3 @@ async def _handle_error(redis: Redis, result: WorkerResult) -> None:
         job_id=str(result.job_id),
         worker_id=result.worker_id,
     )
-
-    inflight_key = TTS_INFLIGHT.format(hash=result.variant_hash)
-    if await redis.delete(inflight_key) == 0:
-        log.info("Variant already finalized, skipping duplicate error result")
-        return
-
-    await log_event(
-        "synthesis_error",
-        variant_hash=result.variant_hash,
-        model_slug=result.model_slug,
-        voice_slug=result.voice_slug,
-        queue_wait_ms=result.queue_wait_ms,
-        worker_latency_ms=result.processing_time_ms,
-        worker_id=result.worker_id,
-        queue_type="tts",
-        user_id=result.user_id,
-        document_id=str(result.document_id),
-        block_idx=result.block_idx,
-        data={"error": result.error, "error_detail": result.error_detail},
-    )
-
-    await _notify_subscribers(redis, result, status="error", error=result.error)
-
-
-async def _notify_subscribers(
-    redis: Redis,
-    result: WorkerResult,
-    status: BlockStatus,
-    audio_url: str | None = None,
-    error: str | None = None,
-    word_timestamps: str | None = None,
-) -> None:
-    subscriber_key = TTS_SUBSCRIBERS.format(hash=result.variant_hash)
-    subscribers = await redis.smembers(subscriber_key)
-
-    for entry in subscribers:
-        parts = entry.decode().split(":")
-        if len(parts) != 3:
-            logger.bind(
-                variant_hash=result.variant_hash,
-                user_id=result.user_id,
-                model_slug=result.model_slug,
-                voice_slug=result.voice_slug,
-            ).error(f"Invalid subscriber entry format: {entry}")
-            continue
-
-        user_id, doc_id_str, block_idx_str = parts
-        doc_id = uuid.UUID(doc_id_str)
-        block_idx = int(block_idx_str)
-
-        pending_key = TTS_PENDING.format(user_id=user_id, document_id=doc_id)
-        await redis.srem(pending_key, block_idx)
-
-        await redis.publish(
-            get_pubsub_channel(user_id, doc_id),
-            WSBlockStatus(
-                document_id=doc_id,
-                block_idx=block_idx,
-                status=status,
-                audio_url=audio_url,
-                error=error,
-                model_slug=result.model_slug,
-                voice_slug=result.voice_slug,
-                word_timestamps=word_timestamps,
-                duration_ms=result.duration_ms,
-            ).model_dump_json(),
-        )
-
-    await redis.delete(subscriber_key)
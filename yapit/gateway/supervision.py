@@ -1,12 +1,40 @@
-"""Makes the death of a long-lived background task visible."""
+"""Makes the death of a long-lived background task visible, and keeps singleton
+loops to one process cluster-wide.
+"""
 
 import asyncio
-from collections.abc import Coroutine
+import contextlib
+import os
+import socket
+import time
+import uuid
+from collections.abc import Callable, Coroutine
 from typing import Any
 
 from loguru import logger
+from redis.asyncio import Redis
 
-from yapit.gateway.metrics import log_error
+from yapit.contracts import LEADER_LEASE
+from yapit.gateway.metrics import log_error, log_event
+
+# A crashed leader is replaced within LEADER_LEASE_S; a cleanly stopped one releases
+# its lease, so a follower takes over within LEADER_RENEW_INTERVAL_S.
+LEADER_LEASE_S = 10
+LEADER_RENEW_INTERVAL_S = 2
+
+_RENEW_LEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_LEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
 
 
 async def supervised(name: str, coro: Coroutine[Any, Any, None]) -> None:
@@ -33,3 +61,93 @@ async def supervised(name: str, coro: Coroutine[Any, Any, None]) -> None:
         return
     logger.error(f"Background task {name} exited unexpectedly")
     await log_error(f"Background task {name} exited unexpectedly")
+
+
+def host_scoped(name: str) -> str:
+    """Lease name for loops that own host-local state (SQLite files): one per host, not per cluster."""
+    return f"{name}@{socket.gethostname()}"
+
+
+async def run_as_leader(
+    redis: Redis,
+    name: str,
+    loop_factory: Callable[[], Coroutine[Any, Any, None]],
+    lease_s: float = LEADER_LEASE_S,
+    renew_interval_s: float = LEADER_RENEW_INTERVAL_S,
+) -> None:
+    """Run `loop_factory()` only while this process holds the `name` lease.
+
+    Every replica runs this; the one whose SET NX wins starts the loop and renews
+    the lease, the rest retry every `renew_interval_s`. A leader that can't renew
+    — lease taken over, or Redis unreachable until it would have expired — cancels
+    its loop and becomes a candidate again, so the loop is restarted from scratch
+    on whichever process wins next.
+
+    The loop crashing or returning ends this too (and releases the lease), so
+    `supervised` reports it exactly as if it ran unwrapped.
+    """
+    key = LEADER_LEASE.format(name=name)
+    token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    lease_ms = int(lease_s * 1000)
+
+    while True:
+        try:
+            acquired_at = time.monotonic()
+            acquired = await redis.set(key, token, px=lease_ms, nx=True)
+        except Exception as e:
+            logger.warning(f"Leader election for {name} failed: {e}")
+            acquired = False
+        if not acquired:
+            await asyncio.sleep(renew_interval_s)
+            continue
+
+        logger.info(f"Acquired leadership of {name} ({token})")
+        await log_event("leader_acquired", data={"loop": name, "holder": token})
+
+        task = asyncio.create_task(loop_factory())
+        try:
+            lost = await _hold_lease(redis, key, token, task, acquired_at + lease_s, lease_s, renew_interval_s)
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+            with contextlib.suppress(Exception):
+                await redis.eval(_RELEASE_LEASE_LUA, 1, key, token)
+
+        if not lost:
+            task.result()  # re-raises the loop's crash for `supervised`
+            return
+
+        logger.warning(f"Lost leadership of {name} ({token}), loop stopped")
+        await log_event("leader_lost", data={"loop": name, "holder": token})
+
+
+async def _hold_lease(
+    redis: Redis,
+    key: str,
+    token: str,
+    task: asyncio.Task,
+    valid_until: float,
+    lease_s: float,
+    renew_interval_s: float,
+) -> bool:
+    """Renew until the loop ends (False) or the lease can no longer be vouched for (True)."""
+    lease_ms = int(lease_s * 1000)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=renew_interval_s)
+        if done:
+            return False
+
+        # Timed from before the round trip, so our view of the deadline never
+        # outlives Redis's: a follower can't start while we still think we lead.
+        sent_at = time.monotonic()
+        try:
+            renewed = await redis.eval(_RENEW_LEASE_LUA, 1, key, token, lease_ms)
+        except Exception as e:
+            logger.warning(f"Leader lease renewal for {key} failed: {e}")
+            renewed = None
+
+        if renewed == 1:
+            valid_until = sent_at + lease_s
+        elif renewed == 0 or time.monotonic() >= valid_until:
+            return True
@@ -1,6 +1,7 @@
 """Core synthesis logic, decoupled from transport (WebSocket, REST)."""
 
 import asyncio
+import time
 import uuid
 from dataclasses import dataclass
 from typing import Literal
@@ -8,10 +9,12 @@ from typing import Literal
 from loguru import logger
 from redis.asyncio import Redis
 from sqlalchemy.dialects.postgresql import insert as pg_insert
-from sqlmodel import select
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from yapit.contracts import (
     TTS_AUDIO_CACHE,
+    TTS_CANCEL,
     TTS_INFLIGHT,
     TTS_JOB_INDEX,
     TTS_JOBS,
@@ -25,9 +28,19 @@ from yapit.gateway.cache import Cache
 from yapit.gateway.domain_models import BlockVariant, TTSModel, UsageType, Voice
 from yapit.gateway.exceptions import UsageLimitExceededError
 from yapit.gateway.metrics import log_event
+from yapit.gateway.text_canonical import CANONICAL_VERSION, canonicalize
 from yapit.gateway.usage import check_usage_limit
+from yapit.gateway.variant_completions import COMPLETION_RECHECK_S, VariantCompletions
 from yapit.queue import QueueConfig, push_job
 
+# Background jobs (trending warmer, bulk synthesis) queue this far behind live requests
+BACKGROUND_QUEUE_OFFSET_S = 86400
+# tts:inflight outlives its job's wait in the queue. A background job can wait up to
+# the offset, so its key does too, until a live request moves the job up.
+INFLIGHT_TTL_S = 600
+BACKGROUND_INFLIGHT_TTL_S = BACKGROUND_QUEUE_OFFSET_S + INFLIGHT_TTL_S
+VARIANT_LOOKUP_CHUNK = 1000  # hashes per IN list / pipeline in the batch lookups
+
 
 @dataclass
 class CachedResult:
@@ -63,6 +76,10 @@ class ErrorResult:
 SynthesisResult = CachedResult | QueuedResult | ErrorResult
 
 
+def usage_type_for(model: TTSModel) -> UsageType:
+    return UsageType.server_kokoro if model.slug.startswith("kokoro") else UsageType.premium_voice
+
+
 async def request_synthesis(
     db,
     redis: Redis,
@@ -75,12 +92,18 @@ async def request_synthesis(
     document_id: uuid.UUID,
     block_idx: int,
     track_for_websocket: bool,
+    background: bool = False,
 ) -> SynthesisResult:
     """Request synthesis for a single piece of text.
 
     Args:
         track_for_websocket: If True, adds subscriber/pending tracking for WebSocket notifications and cursor-based eviction. Set False for REST polling.
+        background: Queue behind every live request (BACKGROUND_QUEUE_OFFSET_S). A live
+            request for the same variant later moves the job up to its own place.
     """
+    canonical_text = canonicalize(text)
+    canonicalized = canonical_text != text
+    text = canonical_text
     variant_hash = BlockVariant.get_hash(
         text=text,
         model_slug=model.slug,
@@ -101,10 +124,11 @@ async def request_synthesis(
             user_id=user_id,
             document_id=str(document_id),
             block_idx=block_idx,
+            data={"canonical_version": CANONICAL_VERSION, "canonicalized": canonicalized},
         )
         return CachedResult(variant_hash=variant_hash, duration_ms=variant.duration_ms)
 
-    usage_type = UsageType.server_kokoro if model.slug.startswith("kokoro") else UsageType.premium_voice
+    usage_type = usage_type_for(model)
     block_chars = int(len(text) * model.usage_multiplier)
     try:
         await check_usage_limit(user_id, usage_type, block_chars, db, billing_enabled=billing_enabled)
@@ -123,6 +147,8 @@ async def request_synthesis(
         document_id=document_id,
         block_idx=block_idx,
         track_for_websocket=track_for_websocket,
+        background=background,
+        canonicalized=canonicalized,
     )
 
     return QueuedResult(variant_hash=variant_hash)
@@ -140,6 +166,8 @@ async def _queue_job(
     document_id: uuid.UUID,
     block_idx: int,
     track_for_websocket: bool,
+    background: bool,
+    canonicalized: bool,
 ) -> str:
     """Queue a synthesis job. Returns variant_hash."""
     if variant is None:
@@ -155,12 +183,24 @@ async def _queue_job(
         await db.exec(stmt)
         await db.commit()
 
+    # TTL is a safety net for orphaned keys; result_consumer DELETE is the normal cleanup path
+    inflight_key = TTS_INFLIGHT.format(hash=variant_hash)
+
     if track_for_websocket:
-        # Track this block as subscriber to be notified when synthesis completes
+        # Track this block as subscriber to be notified when synthesis completes.
+        # Coming back to a block skipped a moment ago: its running job may be marked
+        # for cancellation. The mark is cleared in the same transaction, so the
+        # worker's cancel check (one MULTI too) never sees the block skipped but
+        # still subscribed after it was requested again.
         subscriber_key = TTS_SUBSCRIBERS.format(hash=variant_hash)
         subscriber_entry = f"{user_id}:{document_id}:{block_idx}"
-        await redis.sadd(subscriber_key, subscriber_entry)
-        await redis.expire(subscriber_key, 600)
+        running = await redis.get(inflight_key)
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.sadd(subscriber_key, subscriber_entry)
+            pipe.expire(subscriber_key, 600)
+            if running is not None:
+                pipe.srem(TTS_CANCEL.format(job_id=running.decode()), subscriber_entry)
+            await pipe.execute()
 
         pending_key = TTS_PENDING.format(user_id=user_id, document_id=document_id)
         await redis.sadd(pending_key, block_idx)
@@ -169,9 +209,17 @@ async def _queue_job(
     job_id = uuid.uuid4()
     job_id_str = str(job_id)
 
-    # TTL is a safety net for orphaned keys; result_consumer DELETE is the normal cleanup path
-    was_set = await redis.set(TTS_INFLIGHT.format(hash=variant_hash), job_id_str, ex=600, nx=True)
+    queue_name = get_queue_name(model.slug)
+    inflight_ttl_s = BACKGROUND_INFLIGHT_TTL_S if background else INFLIGHT_TTL_S
+    was_set = await redis.set(inflight_key, job_id_str, ex=inflight_ttl_s, nx=True)
     if not was_set:
+        owner = None if background else await redis.get(inflight_key)
+        if owner is not None:
+            owner_job_id = owner.decode()
+            # The job may be a background one still waiting at the back of the queue.
+            # Moved up, it waits like a live job, so its key gets the live TTL back.
+            await redis.zadd(queue_name, {owner_job_id: time.time()}, xx=True, lt=True)
+            await redis.expire(inflight_key, INFLIGHT_TTL_S, lt=True)
         return variant_hash
 
     job = SynthesisJob(
@@ -191,11 +239,18 @@ async def _queue_job(
         ),
     )
 
-    queue_name = get_queue_name(model.slug)
     index_key = f"{user_id}:{document_id}:{block_idx}" if track_for_websocket else None
 
     tts_config = QueueConfig(queue_name=queue_name, jobs_key=TTS_JOBS, job_index_key=TTS_JOB_INDEX)
-    await push_job(redis, tts_config, job_id_str, job.model_dump_json().encode(), index_key=index_key)
+    await push_job(
+        redis,
+        tts_config,
+        job_id_str,
+        job.model_dump_json().encode(),
+        index_key=index_key,
+        variant_hash=variant_hash,
+        score_offset_s=BACKGROUND_QUEUE_OFFSET_S if background else 0.0,
+    )
 
     queue_depth = await redis.zcard(queue_name)
     await log_event(
@@ -209,11 +264,39 @@ async def _queue_job(
         block_idx=block_idx,
         queue_depth=queue_depth,
         queue_type="tts",
+        data={"canonical_version": CANONICAL_VERSION, "canonicalized": canonicalized},
     )
 
     return variant_hash
 
 
+async def cached_variants(redis: Redis, cache: Cache, hashes: list[str]) -> set[str]:
+    """The subset of `hashes` whose audio is in the Redis buffer or the SQLite cache."""
+    cached: set[str] = set()
+    for i in range(0, len(hashes), VARIANT_LOOKUP_CHUNK):
+        chunk = hashes[i : i + VARIANT_LOOKUP_CHUNK]
+        async with redis.pipeline(transaction=False) as pipe:
+            for variant_hash in chunk:
+                pipe.exists(TTS_AUDIO_CACHE.format(hash=variant_hash))
+            found = await pipe.execute()
+        cached.update(variant_hash for variant_hash, exists in zip(chunk, found, strict=True) if exists)
+    return cached | await cache.batch_exists([h for h in hashes if h not in cached])
+
+
+async def get_variant_durations(db: AsyncSession, hashes: list[str]) -> dict[str, int]:
+    """Actual durations of the variants among `hashes` that billing has recorded."""
+    durations: dict[str, int] = {}
+    for i in range(0, len(hashes), VARIANT_LOOKUP_CHUNK):
+        rows = await db.exec(
+            select(BlockVariant.hash, BlockVariant.duration_ms).where(
+                col(BlockVariant.hash).in_(hashes[i : i + VARIANT_LOOKUP_CHUNK]),
+                col(BlockVariant.duration_ms).is_not(None),
+            )
+        )
+        durations.update(rows.all())
+    return durations
+
+
 async def synthesize_and_wait(
     db,
     redis: Redis,
@@ -225,10 +308,10 @@ async def synthesize_and_wait(
     billing_enabled: bool,
     document_id: uuid.UUID,
     block_idx: int,
+    completions: VariantCompletions,
     timeout_seconds: float,
-    poll_interval: float,
-) -> SynthesisResult:
-    """Request synthesis and poll until result is ready or timeout."""
+) -> CachedResult | ErrorResult:
+    """Request synthesis and wait until the result is finalized or timeout."""
     result = await request_synthesis(
         db=db,
         redis=redis,
@@ -246,20 +329,43 @@ async def synthesize_and_wait(
     if not isinstance(result, QueuedResult):
         return result
 
-    variant_hash = result.variant_hash
-    audio_key = TTS_AUDIO_CACHE.format(hash=variant_hash)
-    elapsed = 0.0
-    while elapsed < timeout_seconds:
-        if await redis.exists(audio_key) or await cache.exists(variant_hash):
-            return CachedResult(variant_hash=variant_hash)
-        await asyncio.sleep(poll_interval)
-        elapsed += poll_interval
-
+    finalized = await wait_for_variant(redis, cache, completions, result.variant_hash, timeout_seconds)
+    if finalized is not None:
+        return finalized
     logger.bind(
         user_id=user_id,
         model_slug=model.slug,
         voice_slug=voice.slug,
-        variant_hash=variant_hash,
+        variant_hash=result.variant_hash,
         document_id=str(document_id),
     ).warning(f"Synthesis timed out after {timeout_seconds}s")
     return ErrorResult(error="Synthesis timed out")
+
+
+async def wait_for_variant(
+    redis: Redis,
+    cache: Cache,
+    completions: VariantCompletions,
+    variant_hash: str,
+    timeout_seconds: float,
+) -> CachedResult | ErrorResult | None:
+    """Wait for a queued variant to be finalized. None if it isn't within the timeout.
+
+    Needs no DB session, so callers that wait long can close theirs after queueing.
+    """
+    audio_key = TTS_AUDIO_CACHE.format(hash=variant_hash)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_seconds
+    async with completions.watch(variant_hash) as done:
+        while (remaining := deadline - loop.time()) > 0:
+            # Also catches a result finalized before the subscription landed
+            if await redis.exists(audio_key) or await cache.exists(variant_hash):
+                return CachedResult(variant_hash=variant_hash)
+            try:
+                status = await asyncio.wait_for(asyncio.shield(done), min(remaining, COMPLETION_RECHECK_S))
+            except TimeoutError:
+                continue
+            if status == "cached":
+                return CachedResult(variant_hash=variant_hash)
+            return ErrorResult(error="Synthesis failed")
+    return None
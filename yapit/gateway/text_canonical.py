@@ -0,0 +1,103 @@
+"""Canonical block text: what gets hashed into the variant and sent to the TTS model.
+
+Variant hashes are over the exact text, so texts that only differ in invisible or
+typographic ways (a soft hyphen from PDF extraction, a double space, curly vs
+straight quotes, a trailing space) were separate variants, synthesized and cached
+separately, even between two uploads of the same paper. canonicalize() folds those
+differences before hashing and synthesis. The rules only touch what the Kokoro
+pipeline doesn't speak, or speaks worse:
+- NFC, so precomposed and combining accents are the same letters.
+- soft hyphens, zero-width spaces, word joiners and BOMs are dropped. They are
+  invisible, and inside a word they only keep G2P from finding it in the lexicon.
+- curly single and double quotes become straight ones, which misaki's English G2P
+  normalizes to the same tokens itself (don't and don\u2019t read alike).
+- runs of spaces and tabs (any Unicode space) become one space, runs of line breaks
+  one line break (Kokoro splits segments on line breaks, so those stay), and both
+  ends are trimmed.
+
+Migration: the hash stays a hash of the text actually synthesized, with no version
+in it. Texts that were canonical already (most of them) keep their hashes and their
+cached audio. The others now hash like their canonical form, which is often cached
+already. Their old variants are no longer looked up and leave the cache through
+normal LRU eviction (or at the next warm_cache run, if pinned). Changing the rules
+means a new CANONICAL_VERSION, which only labels the events below: the rules are
+code, not configuration, and every change to them moves the hashes it touches.
+
+The version and whether a block changed are on the cache_hit and synthesis_queued
+events. `python -m yapit.gateway.text_canonical` measures the effect on the stored
+documents: how many distinct texts (= synthesized variants per voice) canonicalization
+saves.
+"""
+
+import asyncio
+import re
+import unicodedata
+import uuid
+from collections import Counter
+
+from sqlmodel import col, select
+
+CANONICAL_VERSION = 1
+
+_INVISIBLE = dict.fromkeys(map(ord, "\u00ad\u200b\u2060\ufeff"))  # soft hyphen, ZWSP, word joiner, BOM
+_QUOTES = str.maketrans({"\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"'})
+_SPACES = re.compile(r"[^\S\n]+")
+_LINE_BREAKS = re.compile(r" ?\n[\n ]*")
+
+REPORT_PAGE_SIZE = 200
+
+
+def canonicalize(text: str) -> str:
+    text = unicodedata.normalize("NFC", text).translate(_INVISIBLE).translate(_QUOTES)
+    return _LINE_BREAKS.sub("\n", _SPACES.sub(" ", text)).strip()
+
+
+async def _report() -> None:
+    # Deferred: domain_models hashes through this module
+    from yapit.gateway.config import Settings
+    from yapit.gateway.db import close_db, create_session, init_db
+    from yapit.gateway.domain_models import Document
+
+    settings = Settings()  # ty: ignore[missing-argument]
+    init_db(settings)
+    raw: Counter[str] = Counter()
+    canonical: Counter[str] = Counter()
+    documents = changed = 0
+    last_id: uuid.UUID | None = None
+    try:
+        while True:
+            async with create_session() as db:
+                query = select(Document).order_by(col(Document.id)).limit(REPORT_PAGE_SIZE)
+                if last_id is not None:
+                    query = query.where(col(Document.id) > last_id)
+                page = (await db.exec(query)).all()
+            if not page:
+                break
+            last_id = page[-1].id
+            for doc in page:
+                try:
+                    texts = doc.audio_texts
+                except ValueError:
+                    continue  # created by an older version, no longer readable
+                documents += 1
+                for text in texts:
+                    canonical_text = canonicalize(text)
+                    raw[text] += 1
+                    canonical[canonical_text] += 1
+                    changed += canonical_text != text
+    finally:
+        await close_db()
+
+    blocks = raw.total()
+    saved = len(raw) - len(canonical)
+    print(f"Canonicalization v{CANONICAL_VERSION} over {documents} documents, {blocks} blocks")
+    print(f"  blocks whose text changes:  {changed} ({changed / max(blocks, 1):.1%})")
+    print(f"  distinct texts:             {len(raw)} -> {len(canonical)} ({saved} fewer variants per voice)")
+    print(
+        f"  corpus hit rate (blocks sharing a variant): "
+        f"{1 - len(raw) / max(blocks, 1):.1%} -> {1 - len(canonical) / max(blocks, 1):.1%}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(_report())
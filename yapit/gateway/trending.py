@@ -0,0 +1,184 @@
+"""Popularity-driven warming of public documents.
+
+warm_cache pins a hand-picked set of documents. When some other public document
+takes off, every new listener's first pass runs into cold blocks. So each
+synthesize request on a public document records a listen:
+- a listener counts once per document and voice per TRENDING_HALF_LIFE_S
+  (tts:trending). Scores halve every half-life.
+- the furthest block anyone has requested is kept as the frontier
+  (tts:trending:frontier).
+
+Each tick the warmer takes the documents with at least MIN_LISTENERS. While the
+model's queue holds no live jobs, it queues the WARM_AHEAD_BLOCKS blocks past the
+frontier as background jobs, behind any live request. Cached blocks up to there are
+pinned until TRENDING_PIN_S from now. Pins are renewed while the document trends and
+lapse once it stops.
+
+Leased per host, like the other loops that write the host's SQLite cache. Decay is
+computed from the time stored in Redis, so hosts ticking the same scores don't
+decay them twice.
+"""
+
+import asyncio
+import time
+import uuid
+
+from loguru import logger
+from pydantic import ValidationError
+from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+from sqlmodel import select
+
+from yapit.contracts import (
+    TTS_TRENDING,
+    TTS_TRENDING_DECAYED_AT,
+    TTS_TRENDING_FRONTIER,
+    TTS_TRENDING_SEEN,
+    get_queue_name,
+)
+from yapit.gateway.cache import Cache
+from yapit.gateway.db import create_session
+from yapit.gateway.deps import get_model, get_voice
+from yapit.gateway.domain_models import BlockVariant, Document
+from yapit.gateway.exceptions import ResourceNotFoundError
+from yapit.gateway.metrics import log_error, log_event
+from yapit.gateway.synthesis import QueuedResult, request_synthesis
+
+TRENDING_TICK_S = 60
+TRENDING_HALF_LIFE_S = 3600
+MIN_LISTENERS = 3.0
+MAX_TRENDING = 10
+WARM_AHEAD_BLOCKS = 20
+TRENDING_PIN_S = 6 * 3600
+WARMER_USER_ID = "trending-warmer"
+_FADED_SCORE = 0.1  # below this a document is forgotten, frontier included
+
+# KEYS: trending zset, frontier hash, seen key. ARGV: member, block index, half-life (s).
+_RECORD_LISTEN_LUA = """
+if redis.call('SET', KEYS[3], 1, 'NX', 'EX', ARGV[3]) then
+    redis.call('ZINCRBY', KEYS[1], 1, ARGV[1])
+end
+local frontier = tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or '-1')
+if tonumber(ARGV[2]) > frontier then
+    redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+end
+"""
+
+# Decays the scores to now and forgets faded documents.
+# KEYS: trending zset, frontier hash, decayed_at. ARGV: now (s), half-life (s), faded score.
+_DECAY_LUA = """
+local now = tonumber(ARGV[1])
+local last = tonumber(redis.call('GET', KEYS[3]) or ARGV[1])
+redis.call('SET', KEYS[3], ARGV[1])
+if now <= last then
+    return 0
+end
+redis.call('ZUNIONSTORE', KEYS[1], 1, KEYS[1], 'WEIGHTS', tostring(0.5 ^ ((now - last) / tonumber(ARGV[2]))))
+local faded = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[3])
+for _, member in ipairs(faded) do
+    redis.call('HDEL', KEYS[2], member)
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[3])
+return #faded
+"""
+
+# Built once per process; each call passes its client.
+_RECORD_LISTEN = AsyncScript(None, _RECORD_LISTEN_LUA.encode())
+_DECAY = AsyncScript(None, _DECAY_LUA.encode())
+
+
+def trending_member(document_id: uuid.UUID | str, model_slug: str, voice_slug: str) -> str:
+    return f"{document_id}|{model_slug}|{voice_slug}"
+
+
+async def record_listen(
+    redis: Redis, user_id: str, document_id: uuid.UUID, model_slug: str, voice_slug: str, block_idx: int
+) -> None:
+    member = trending_member(document_id, model_slug, voice_slug)
+    await _RECORD_LISTEN(
+        keys=[TTS_TRENDING, TTS_TRENDING_FRONTIER, TTS_TRENDING_SEEN.format(member=member, user_id=user_id)],
+        args=[member, block_idx, TRENDING_HALF_LIFE_S],
+        client=redis,
+    )
+
+
+async def run_trending_warmer(redis: Redis, cache: Cache) -> None:
+    logger.info("Trending warmer starting")
+    while True:
+        await asyncio.sleep(TRENDING_TICK_S)
+        try:
+            await warm_trending(redis, cache)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception(f"Trending warmer error: {e}")
+            await log_error(f"Trending warmer error: {e}")
+
+
+async def warm_trending(redis: Redis, cache: Cache) -> None:
+    """One tick: decay, warm and pin every trending document, release lapsed pins."""
+    await _DECAY(
+        keys=[TTS_TRENDING, TTS_TRENDING_FRONTIER, TTS_TRENDING_DECAYED_AT],
+        args=[time.time(), TRENDING_HALF_LIFE_S, _FADED_SCORE],
+        client=redis,
+    )
+    trending = await redis.zrevrangebyscore(
+        TTS_TRENDING, "+inf", MIN_LISTENERS, start=0, num=MAX_TRENDING, withscores=True
+    )
+    for member, listeners in trending:
+        await _warm_document(redis, cache, member.decode(), listeners)
+    await cache.unpin_expired()
+
+
+async def _warm_document(redis: Redis, cache: Cache, member: str, listeners: float) -> None:
+    document_id, model_slug, voice_slug = member.split("|")
+    raw_frontier = await redis.hget(TTS_TRENDING_FRONTIER, member)
+    frontier = int(raw_frontier) if raw_frontier is not None else -1
+
+    queued = 0
+    async with create_session() as db:
+        doc = (await db.exec(select(Document).where(Document.id == uuid.UUID(document_id)))).first()
+        if doc is None or not doc.is_public:
+            return
+        try:
+            model = await get_model(db, model_slug)
+            voice = await get_voice(db, model_slug, voice_slug)
+            texts = doc.audio_texts
+        except (ResourceNotFoundError, ValidationError):
+            return
+
+        end = min(frontier + 1 + WARM_AHEAD_BLOCKS, len(texts))
+        hashes = [BlockVariant.get_hash(texts[idx], model.slug, voice.slug, voice.parameters) for idx in range(end)]
+        cached = await cache.batch_exists(hashes)
+
+        # Only while no live job is waiting: background jobs queue behind them anyway,
+        # but this keeps the queue from filling with work nobody may need
+        if await redis.zcount(get_queue_name(model.slug), "-inf", time.time()) == 0:
+            for idx in range(frontier + 1, end):
+                if hashes[idx] in cached:
+                    continue
+                result = await request_synthesis(
+                    db=db,
+                    redis=redis,
+                    cache=cache,
+                    user_id=WARMER_USER_ID,
+                    text=texts[idx],
+                    model=model,
+                    voice=voice,
+                    billing_enabled=False,
+                    document_id=doc.id,
+                    block_idx=idx,
+                    track_for_websocket=False,
+                    background=True,
+                )
+                if isinstance(result, QueuedResult):
+                    queued += 1
+
+    pinned = await cache.pin([h for h in hashes if h in cached], until=time.time() + TRENDING_PIN_S)
+    await log_event(
+        "trending_warm",
+        model_slug=model_slug,
+        voice_slug=voice_slug,
+        document_id=document_id,
+        data={"listeners": round(listeners, 1), "frontier": frontier, "queued": queued, "pinned": pinned},
+    )
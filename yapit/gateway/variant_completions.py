@@ -0,0 +1,92 @@
+"""Wakes callers waiting on a variant as soon as the result consumer finalizes it.
+
+For synthesize_and_wait (voice previews, cache warming), polling the audio keys
+costs up to one interval of added latency and two lookups per tick per waiter.
+Instead the result consumer publishes each finalized variant's status on
+tts:variant_done:{hash}, and a process keeps one pubsub connection for all its
+waiters. The first waiter on a variant subscribes to its channel, later ones
+share the same future (until it resolves), the last one to leave unsubscribes.
+
+A status published in the moment before the subscription lands is missed, so
+waiters still re-check the caches every COMPLETION_RECHECK_S.
+"""
+
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from yapit.contracts import TTS_VARIANT_DONE
+from yapit.gateway.backoff import Backoff
+
+COMPLETION_RECHECK_S = 5.0
+
+
+@dataclass
+class _Watch:
+    future: asyncio.Future[str] = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+    waiters: int = 0
+
+
+class VariantCompletions:
+    def __init__(self, redis: Redis) -> None:
+        self._pubsub = redis.pubsub()
+        self._watches: dict[str, _Watch] = {}
+        self._listener: asyncio.Task | None = None
+
+    @contextlib.asynccontextmanager
+    async def watch(self, variant_hash: str) -> AsyncIterator[asyncio.Future[str]]:
+        """Yields a future resolved with the variant's finalized status
+        ("cached", "error", "skipped", "cancelled").
+        """
+        channel = TTS_VARIANT_DONE.format(hash=variant_hash)
+        watch = self._watches.get(channel)
+        is_new = watch is None
+        if watch is None or watch.future.done():
+            # A resolved future is the previous job's status; the variant may be queued again.
+            # The subscription stays, the last waiter on the new watch drops it.
+            watch = self._watches[channel] = _Watch()
+        watch.waiters += 1
+        try:
+            if is_new:
+                await self._pubsub.subscribe(channel)
+                if self._listener is None:
+                    self._listener = asyncio.create_task(self._listen())
+            yield watch.future
+        finally:
+            watch.waiters -= 1
+            if watch.waiters == 0 and self._watches.get(channel) is watch:
+                del self._watches[channel]
+                with contextlib.suppress(RedisError):
+                    await self._pubsub.unsubscribe(channel)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+        await self._pubsub.aclose()
+
+    async def _listen(self) -> None:
+        backoff = Backoff(max_s=COMPLETION_RECHECK_S)
+        try:
+            while self._watches:
+                try:
+                    message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    backoff.reset()
+                except RedisError as e:
+                    # Waiters fall back to their periodic re-check meanwhile
+                    logger.warning(f"Variant completion listener error: {e}")
+                    await backoff.sleep()
+                    continue
+                if message is None:
+                    continue
+                watch = self._watches.get(message["channel"].decode())
+                if watch is not None and not watch.future.done():
+                    watch.future.set_result(message["data"].decode())
+        finally:
+            self._listener = None
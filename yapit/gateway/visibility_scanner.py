@@ -2,6 +2,14 @@
 
 Generic scanner that works for both TTS and YOLO queues.
 Processing entries store queue_name and dlq_key so scanner doesn't need to parse job types.
+
+Workers index every processing entry in a leases ZSET scored by deadline, so a scan is
+one ZRANGEBYSCORE over expired leases — cost scales with stuck jobs, not with worker
+count or in-flight jobs. ZREM of the lease is the claim on a stuck job.
+
+Workers that predate the leases ZSET (still running during a rolling deploy) track
+jobs without a lease. Every ADOPT_EVERY_N_SCANS scans their entries are adopted,
+until none has turned up for ADOPTION_QUIET_S.
 """
 
 import asyncio
@@ -15,35 +23,56 @@ from redis.asyncio import Redis
 from yapit.contracts import TTS_RESULTS, YOLO_RESULT, YoloResult, build_tts_dlq_error, parse_queue_name
 from yapit.gateway.backoff import Backoff
 from yapit.gateway.metrics import log_error, log_event
-from yapit.queue import move_to_dlq, requeue_job
+from yapit.queue import lease_member, move_to_dlq, parse_lease_member, push_result, requeue_job
+
+# Expired leases fetched per ZRANGEBYSCORE; the scan repeats until a short batch
+SCAN_BATCH_SIZE = 100
+ADOPT_EVERY_N_SCANS = 10
+ADOPTION_QUIET_S = 3600  # no unleased entry for this long: no pre-lease workers left
 
 
 async def run_visibility_scanner(
     redis: Redis,
+    leases_key: str,
     processing_pattern: str,
     jobs_key: str,
     visibility_timeout_s: int,
     max_retries: int,
     scan_interval_s: int,
     name: str = "visibility",
+    fences_key: str | None = None,
 ) -> None:
     """Run visibility timeout scanner for a queue type.
 
     Args:
         redis: Redis client
-        processing_pattern: Pattern to match processing keys, e.g. "tts:processing:*"
+        leases_key: Sorted set of processing entries by deadline, e.g. "tts:leases"
+        processing_pattern: Pattern to match processing keys, e.g. "tts:processing:*".
+            Scanned to lease entries written by workers without leases, while there are any.
         jobs_key: Hash key where jobs are stored, e.g. "tts:jobs"
-        visibility_timeout_s: Seconds before a job is considered stuck
+        visibility_timeout_s: Lease length given to adopted entries
         max_retries: Max retries before moving to DLQ
         scan_interval_s: Seconds between scans
         name: Name for logging
+        fences_key: Hash of current lease fencing tokens; a reclaimed job's token is
+            dropped so the result consumer rejects whatever its old holder sends
     """
-    logger.info(f"{name} scanner starting (pattern={processing_pattern}, timeout={visibility_timeout_s}s)")
+    logger.info(f"{name} scanner starting (leases={leases_key}, timeout={visibility_timeout_s}s)")
 
+    adopting = True
+    scans = 0
+    last_unleased = time.monotonic()
     backoff = Backoff.from_interval(scan_interval_s)
     while True:
         try:
-            await _scan_processing_sets(redis, processing_pattern, jobs_key, visibility_timeout_s, max_retries)
+            if adopting and scans % ADOPT_EVERY_N_SCANS == 0:
+                if await _adopt_unleased_entries(redis, processing_pattern, leases_key, visibility_timeout_s):
+                    last_unleased = time.monotonic()
+                elif time.monotonic() - last_unleased > ADOPTION_QUIET_S:
+                    adopting = False
+                    logger.info(f"{name} scanner: no unleased entries for {ADOPTION_QUIET_S}s, stopped adopting")
+            scans += 1
+            await _reclaim_expired_leases(redis, leases_key, jobs_key, max_retries, fences_key)
             backoff.reset()
             await asyncio.sleep(scan_interval_s)
         except asyncio.CancelledError:
@@ -55,86 +84,121 @@ async def run_visibility_scanner(
             await backoff.sleep()
 
 
-async def _scan_processing_sets(
+async def _adopt_unleased_entries(
     redis: Redis,
     processing_pattern: str,
-    jobs_key: str,
+    leases_key: str,
     visibility_timeout_s: int,
-    max_retries: int,
-) -> None:
+) -> int:
+    """Lease processing entries that have none, deadline from their start time.
+
+    Covers jobs tracked by workers that predate the leases ZSET; without this they'd
+    never be requeued. NX leaves existing leases untouched. Returns how many were adopted.
+    """
+    total = 0
     cursor = 0
     while True:
         cursor, keys = await redis.scan(cursor, match=processing_pattern, count=100)
         for key in keys:
-            await _check_processing_set(redis, key, jobs_key, visibility_timeout_s, max_retries)
+            processing_key = key.decode() if isinstance(key, bytes) else key
+            entries = await redis.hgetall(processing_key)
+            if not entries:
+                continue
+            deadlines = {}
+            for job_id, entry_json in entries.items():
+                job_id = job_id.decode() if isinstance(job_id, bytes) else job_id
+                started = json.loads(entry_json)["processing_started"]
+                deadlines[lease_member(processing_key, job_id)] = started + visibility_timeout_s
+            adopted = await redis.zadd(leases_key, deadlines, nx=True)
+            if adopted:
+                logger.info(f"Adopted {adopted} unleased processing entries from {processing_key}")
+                total += adopted
         if cursor == 0:
-            break
+            return total
 
 
-async def _check_processing_set(
+async def _reclaim_expired_leases(
     redis: Redis,
-    processing_key: bytes,
+    leases_key: str,
     jobs_key: str,
-    visibility_timeout_s: int,
     max_retries: int,
+    fences_key: str | None = None,
 ) -> None:
-    entries = await redis.hgetall(processing_key)
-    now = time.time()
-
-    for job_id_bytes, entry_json in entries.items():
-        entry = json.loads(entry_json)
-
-        age = now - entry["processing_started"]
-        if age < visibility_timeout_s:
-            continue
-
-        job_id = job_id_bytes.decode() if isinstance(job_id_bytes, bytes) else job_id_bytes
-        retry_count = entry["retry_count"]
-        raw_job = entry["job"].encode()
-        queue_name = entry["queue_name"]
-        dlq_key = entry["dlq_key"]
-        queue_type, model_slug = parse_queue_name(queue_name)
+    while True:
+        expired = await redis.zrangebyscore(leases_key, "-inf", time.time(), start=0, num=SCAN_BATCH_SIZE)
+        for member in expired:
+            await _reclaim(redis, leases_key, member.decode(), jobs_key, max_retries, fences_key)
+        if len(expired) < SCAN_BATCH_SIZE:
+            break
 
-        logger.bind(job_id=job_id, queue_type=queue_type, model_slug=model_slug).warning(
-            f"Job stuck for {age:.1f}s, retry_count={retry_count}"
-        )
 
-        await redis.hdel(processing_key, job_id_bytes)
-
-        if retry_count >= max_retries:
-            await move_to_dlq(redis, dlq_key, job_id, raw_job, retry_count)
-
-            error_msg = f"Job moved to DLQ after {retry_count} retries"
-            if queue_type == "tts":
-                error_result = build_tts_dlq_error(raw_job.decode(), error_msg)
-                await redis.lpush(TTS_RESULTS, error_result.model_dump_json())
-            elif queue_type == "yolo":
-                yolo_error = YoloResult(
-                    job_id=uuid.UUID(job_id),
-                    figures=[],
-                    page_width=None,
-                    page_height=None,
-                    worker_id="dlq",
-                    processing_time_ms=0,
-                    error=error_msg,
-                )
-                result_key = YOLO_RESULT.format(job_id=job_id)
-                await redis.lpush(result_key, yolo_error.model_dump_json())
-                await redis.expire(result_key, 300)
-
-            await log_event(
-                "job_dlq",
-                queue_type=queue_type,
-                model_slug=model_slug,
-                retry_count=retry_count,
-                data={"job_id": job_id, "stuck_seconds": age},
-            )
-        else:
-            await requeue_job(redis, queue_name, jobs_key, job_id, raw_job, retry_count)
-            await log_event(
-                "job_requeued",
-                queue_type=queue_type,
-                model_slug=model_slug,
-                retry_count=retry_count + 1,
-                data={"job_id": job_id, "stuck_seconds": age},
+async def _reclaim(
+    redis: Redis,
+    leases_key: str,
+    member: str,
+    jobs_key: str,
+    max_retries: int,
+    fences_key: str | None,
+) -> None:
+    # Workers drop the lease with the entry when they finish, so losing this ZREM
+    # means the job completed (or another scanner took it) since the ZRANGEBYSCORE
+    if not await redis.zrem(leases_key, member):
+        return
+
+    processing_key, job_id = parse_lease_member(member)
+    if fences_key:
+        await redis.hdel(fences_key, job_id)
+    entry_json = await redis.hget(processing_key, job_id)
+    if entry_json is None:
+        return
+    await redis.hdel(processing_key, job_id)
+
+    entry = json.loads(entry_json)
+    age = time.time() - entry["processing_started"]
+    retry_count = entry["retry_count"]
+    raw_job = entry["job"].encode()
+    queue_name = entry["queue_name"]
+    dlq_key = entry["dlq_key"]
+    queue_type, model_slug = parse_queue_name(queue_name)
+
+    logger.bind(job_id=job_id, queue_type=queue_type, model_slug=model_slug).warning(
+        f"Job stuck for {age:.1f}s, retry_count={retry_count}"
+    )
+
+    if retry_count >= max_retries:
+        await move_to_dlq(redis, dlq_key, job_id, raw_job, retry_count)
+
+        error_msg = f"Job moved to DLQ after {retry_count} retries"
+        if queue_type == "tts":
+            error_result = build_tts_dlq_error(raw_job.decode(), error_msg)
+            await push_result(redis, TTS_RESULTS, error_result.model_dump_json())
+        elif queue_type == "yolo":
+            yolo_error = YoloResult(
+                job_id=uuid.UUID(job_id),
+                figures=[],
+                page_width=None,
+                page_height=None,
+                worker_id="dlq",
+                processing_time_ms=0,
+                error=error_msg,
             )
+            result_key = YOLO_RESULT.format(job_id=job_id)
+            await redis.lpush(result_key, yolo_error.model_dump_json())
+            await redis.expire(result_key, 300)
+
+        await log_event(
+            "job_dlq",
+            queue_type=queue_type,
+            model_slug=model_slug,
+            retry_count=retry_count,
+            data={"job_id": job_id, "stuck_seconds": age},
+        )
+    else:
+        await requeue_job(redis, queue_name, jobs_key, job_id, raw_job, retry_count)
+        await log_event(
+            "job_requeued",
+            queue_type=queue_type,
+            model_slug=model_slug,
+            retry_count=retry_count + 1,
+            data={"job_id": job_id, "stuck_seconds": age},
+        )
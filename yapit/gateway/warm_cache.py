@@ -4,12 +4,25 @@ Pre-synthesizes audio so preview sentences and showcase docs are cached and
 playable for free (cached audio skips billing). Pins warmed entries so LRU
 eviction never touches them.
 
+The whole plan (every preview sentence and showcase block for every voice) is
+built up front and checked against the cache in one pass. Missing variants are
+then queued with at most `concurrency` in flight — enough to keep every worker
+replica busy with one job queued behind the one it's synthesizing, without
+flooding the queue ahead of live listeners. Completions are awaited as they
+arrive, and progress with throughput and ETA is logged every PROGRESS_INTERVAL_S.
+
+An interrupted run resumes where it stopped: the rerun skips what's already
+cached and re-attaches to jobs still in flight.
+
 Run manually when voices or showcase content changes:
-    python -m yapit.gateway.warm_cache
+    python -m yapit.gateway.warm_cache [--concurrency N]
 """
 
+import argparse
 import asyncio
+import os
 import sys
+import time
 import uuid
 from dataclasses import dataclass, field
 from typing import Literal
@@ -25,11 +38,16 @@ from yapit.gateway.config import Settings
 from yapit.gateway.db import close_db, create_session, init_db
 from yapit.gateway.deps import create_cache
 from yapit.gateway.domain_models import BlockVariant, Document, TTSModel, Voice
-from yapit.gateway.preview_sentences import N_PREVIEW_SENTENCES, preview_sentences
-from yapit.gateway.synthesis import CachedResult, QueuedResult, synthesize_and_wait
+from yapit.gateway.preview_sentences import preview_sentences
+from yapit.gateway.synthesis import CachedResult, synthesize_and_wait
+from yapit.gateway.variant_completions import VariantCompletions
 
 PREVIEW_DOCUMENT_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
 
+JOBS_PER_REPLICA = 2  # one synthesizing, one queued behind it
+PROGRESS_INTERVAL_S = 15
+SYNTHESIS_TIMEOUT_S = 120.0
+
 
 @dataclass
 class ShowcaseDoc:
@@ -54,10 +72,25 @@ SHOWCASE_DOCS = [
 
 @dataclass
 class WarmingStats:
+    total: int = 0
     cached: int = 0
     synthesized: int = 0
     failed: int = 0
 
+    @property
+    def done(self) -> int:
+        return self.cached + self.synthesized + self.failed
+
+
+@dataclass
+class WarmItem:
+    model: TTSModel
+    voice: Voice
+    text: str
+    document_id: uuid.UUID
+    block_idx: int
+    variant_hash: str
+
 
 def filter_voices(
     model: TTSModel,
@@ -72,66 +105,97 @@ def filter_voices(
     return active
 
 
-async def warm_texts(
+def plan_texts(model: TTSModel, voices: list[Voice], texts: list[str], document_id: uuid.UUID) -> list[WarmItem]:
+    return [
+        WarmItem(
+            model=model,
+            voice=voice,
+            text=text,
+            document_id=document_id,
+            block_idx=idx,
+            variant_hash=BlockVariant.get_hash(text, model.slug, voice.slug, voice.parameters),
+        )
+        for voice in voices
+        for idx, text in enumerate(texts)
+    ]
+
+
+def default_concurrency() -> int:
+    """Worker replicas (KOKORO_CPU_REPLICAS, in the gateway's env) × JOBS_PER_REPLICA."""
+    return max(int(os.environ.get("KOKORO_CPU_REPLICAS", "1")), 1) * JOBS_PER_REPLICA
+
+
+async def warm_items(
     redis_client: Redis,
     cache: Cache,
-    model: TTSModel,
-    voices: list[Voice],
-    texts: list[str],
-    document_id: uuid.UUID,
+    completions: VariantCompletions,
+    items: list[WarmItem],
     stats: WarmingStats,
+    concurrency: int,
 ) -> list[str]:
-    """Synthesize texts for each voice, return variant hashes of all successful entries."""
-    hashes: list[str] = []
-    for vi, voice in enumerate(voices, 1):
-        voice_cached = voice_synthesized = voice_failed = 0
-
-        # Check which entries already exist so we can report accurate counts
-        text_hashes = [BlockVariant.get_hash(text, model.slug, voice.slug, voice.parameters) for text in texts]
-        already_cached = await cache.batch_exists(text_hashes)
-
-        for idx, (text, h) in enumerate(zip(texts, text_hashes)):
-            if h in already_cached:
-                stats.cached += 1
-                voice_cached += 1
-                hashes.append(h)
-                continue
-
-            async with create_session() as db:
-                result = await synthesize_and_wait(
-                    db=db,
-                    redis=redis_client,
-                    cache=cache,
-                    user_id="cache-warmer",
-                    text=text,
-                    model=model,
-                    voice=voice,
-                    billing_enabled=False,
-                    document_id=document_id,
-                    block_idx=idx,
-                    timeout_seconds=30.0,
-                    poll_interval=0.2,
-                )
-
-            if isinstance(result, (CachedResult, QueuedResult)):
-                stats.synthesized += 1
-                voice_synthesized += 1
-                hashes.append(h)
-            else:
-                stats.failed += 1
-                voice_failed += 1
-                logger.bind(model_slug=model.slug, voice_slug=voice.slug, block_idx=idx).warning(
-                    f"Warming failed: {result.error}"
-                )
+    """Synthesize every missing item, at most `concurrency` in flight.
+
+    Returns variant hashes of all successful entries.
+    """
+    already_cached = await cache.batch_exists([item.variant_hash for item in items])
+    missing = [item for item in items if item.variant_hash not in already_cached]
+    stats.total += len(items)
+    stats.cached += len(items) - len(missing)
+    hashes = [item.variant_hash for item in items if item.variant_hash in already_cached]
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def warm(item: WarmItem) -> None:
+        async with slots, create_session() as db:
+            result = await synthesize_and_wait(
+                db=db,
+                redis=redis_client,
+                cache=cache,
+                user_id="cache-warmer",
+                text=item.text,
+                model=item.model,
+                voice=item.voice,
+                billing_enabled=False,
+                document_id=item.document_id,
+                block_idx=item.block_idx,
+                completions=completions,
+                timeout_seconds=SYNTHESIS_TIMEOUT_S,
+            )
+        if isinstance(result, CachedResult):
+            stats.synthesized += 1
+            hashes.append(item.variant_hash)
+        else:
+            stats.failed += 1
+            logger.bind(model_slug=item.model.slug, voice_slug=item.voice.slug, block_idx=item.block_idx).warning(
+                f"Warming failed: {result.error}"
+            )
 
+    reporter = asyncio.create_task(_report_progress(stats))
+    try:
+        await asyncio.gather(*(warm(item) for item in missing))
+    finally:
+        reporter.cancel()
+    return hashes
+
+
+async def _report_progress(stats: WarmingStats) -> None:
+    start = time.monotonic()
+    start_synthesized = stats.synthesized
+    while True:
+        await asyncio.sleep(PROGRESS_INTERVAL_S)
+        elapsed = time.monotonic() - start
+        rate = (stats.synthesized - start_synthesized) / elapsed
+        remaining = stats.total - stats.done
+        eta = f"{remaining / rate / 60:.0f}min" if rate > 0 else "?"
         logger.info(
-            f"  {voice.slug} ({vi}/{len(voices)}): "
-            f"{voice_synthesized} synthesized, {voice_cached} cached, {voice_failed} failed"
+            f"Warming {stats.done}/{stats.total}: {stats.synthesized} synthesized, {stats.cached} cached, "
+            f"{stats.failed} failed — {rate * 60:.1f} variants/min, ETA {eta}"
         )
-    return hashes
 
 
-async def run_warming(cache: Cache, redis_client: Redis) -> WarmingStats:
+async def run_warming(
+    cache: Cache, redis_client: Redis, completions: VariantCompletions, concurrency: int
+) -> WarmingStats:
     """Run the full warming cycle: synthesize missing entries, then pin all warmed keys."""
     async with create_session() as db:
         models = (
@@ -140,23 +204,14 @@ async def run_warming(cache: Cache, redis_client: Redis) -> WarmingStats:
             )
         ).all()
 
-    stats = WarmingStats()
-    all_hashes: list[str] = []
+    items: list[WarmItem] = []
 
     # --- Voice previews (each voice previews in its own language) ---
-    total_voices = sum(len([v for v in m.voices if v.is_active]) for m in models)
-    logger.info(
-        f"Voice previews: {len(models)} models, {total_voices} voices, {total_voices * N_PREVIEW_SENTENCES} requests"
-    )
-
     for model in models:
-        active = [v for v in model.voices if v.is_active]
-        logger.info(f"{model.slug}: {len(active)} voices")
-        for voice in active:
-            hashes = await warm_texts(
-                redis_client, cache, model, [voice], preview_sentences(voice.lang), PREVIEW_DOCUMENT_ID, stats
-            )
-            all_hashes.extend(hashes)
+        for voice in model.voices:
+            if voice.is_active:
+                items.extend(plan_texts(model, [voice], preview_sentences(voice.lang), PREVIEW_DOCUMENT_ID))
+    n_previews = len(items)
 
     # --- Showcase documents ---
     for showcase in SHOWCASE_DOCS:
@@ -168,37 +223,53 @@ async def run_warming(cache: Cache, redis_client: Redis) -> WarmingStats:
             continue
 
         block_texts = doc.audio_texts
+        for model in models:
+            items.extend(plan_texts(model, filter_voices(model, showcase.voice_filter), block_texts, showcase.id))
         logger.info(f"Showcase '{doc.title}': {len(block_texts)} blocks")
 
-        for model in models:
-            voices = filter_voices(model, showcase.voice_filter)
-            logger.info(f"  {model.slug}: {len(voices)} voices")
-            hashes = await warm_texts(redis_client, cache, model, voices, block_texts, showcase.id, stats)
-            all_hashes.extend(hashes)
+    logger.info(
+        f"Warming plan: {n_previews} preview and {len(items) - n_previews} showcase variants "
+        f"across {len(models)} models, {concurrency} in flight"
+    )
+    stats = WarmingStats()
+    start = time.monotonic()
+    all_hashes = await warm_items(redis_client, cache, completions, items, stats, concurrency)
+    elapsed = time.monotonic() - start
 
     # --- Pin all warmed entries; pins from previous runs (stale hashes) return to LRU ---
     unique_hashes = list(dict.fromkeys(all_hashes))  # deduplicate, preserve order
     unpinned = await cache.unpin_all()
     newly_pinned = await cache.pin(unique_hashes)
     logger.info(
-        f"Cache warming done: {stats.cached} cached, {stats.synthesized} synthesized, "
-        f"{stats.failed} failed, {unpinned} previously pinned reset, "
-        f"{newly_pinned} pinned ({len(unique_hashes)} total pinnable)"
+        f"Cache warming done in {elapsed / 60:.1f}min: {stats.cached} cached, {stats.synthesized} synthesized "
+        f"({stats.synthesized / max(elapsed, 1) * 60:.1f}/min), {stats.failed} failed, "
+        f"{unpinned} previously pinned reset, {newly_pinned} pinned ({len(unique_hashes)} total pinnable)"
     )
     return stats
 
 
 async def main() -> int:
     """Standalone entry point for manual one-off warming."""
+    parser = argparse.ArgumentParser(description="Synthesize and pin voice previews and showcase documents")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=default_concurrency(),
+        help=f"Variants in flight (default: KOKORO_CPU_REPLICAS × {JOBS_PER_REPLICA})",
+    )
+    args = parser.parse_args()
+
     settings = Settings()  # ty: ignore[missing-argument]
     init_db(settings)
     redis_client = await aioredis.from_url(settings.redis_url, decode_responses=False)
     cache = create_cache(settings.audio_cache_type, settings.audio_cache_config)
+    completions = VariantCompletions(redis_client)
 
     try:
-        stats = await run_warming(cache, redis_client)
+        stats = await run_warming(cache, redis_client, completions, args.concurrency)
         return 0 if stats.failed == 0 else 1
     finally:
+        await completions.close()
         await cache.close()
         await redis_client.aclose()
         await close_db()
@@ -0,0 +1,118 @@
+"""Statistical stack-sampling profiler for the gateway and workers.
+
+A background thread reads every other thread's current frame at a fixed interval
+and counts identical stacks. Output is the collapsed-stack format
+(`root;caller;callee count` per line) that flamegraph.pl, speedscope and
+inferno read directly.
+
+Sampling from a thread rather than the event loop is the point: the hot paths
+worth profiling (Kokoro inference, Opus encoding, YOLO detection) hold the loop
+for their whole duration, so a coroutine-based sampler would never get to run.
+
+Gateway: `POST /v1/admin/profile` profiles the gateway process in-request.
+Workers: `SIGUSR1` profiles for `PROFILE_SECONDS` (default 30) and stores the
+result under `profile:{worker_id}` in Redis, where the admin endpoint reads it.
+"""
+
+import asyncio
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+
+import redis.asyncio as redis
+from loguru import logger
+
+from yapit.contracts import PROFILE_RESULT
+
+DEFAULT_INTERVAL_S = 0.01
+DEFAULT_SIGNAL_PROFILE_S = 30
+PROFILE_RESULT_TTL_S = 3600
+
+_active = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    """Another profile is already running in this process."""
+
+
+def _frame_label(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+def _collapse(frame: FrameType | None) -> list[str]:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def sample_stacks(duration_s: float, interval_s: float = DEFAULT_INTERVAL_S) -> Counter[str]:
+    """Block for `duration_s`, sampling all other threads. Returns {collapsed_stack: count}.
+
+    Each stack is rooted at its thread name so executor threads stay separate
+    from the event loop thread in the flamegraph.
+    """
+    if not _active.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running")
+    try:
+        own_id = threading.get_ident()
+        counts: Counter[str] = Counter()
+        deadline = time.monotonic() + duration_s
+        while time.monotonic() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = _collapse(frame)
+                if stack:
+                    counts[";".join([names.get(thread_id, str(thread_id)), *stack])] += 1
+            time.sleep(interval_s)
+        return counts
+    finally:
+        _active.release()
+
+
+def format_collapsed(counts: Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+async def profile(duration_s: float, interval_s: float = DEFAULT_INTERVAL_S) -> str:
+    """Profile this process for `duration_s` without blocking the event loop."""
+    counts = await asyncio.to_thread(sample_stacks, duration_s, interval_s)
+    return format_collapsed(counts)
+
+
+def install_signal_profiler(client: redis.Redis, worker_id: str) -> None:
+    """Profile on SIGUSR1 and store the result in Redis. Call from the worker's event loop.
+
+    The handler only starts the sampling thread; storing the result is handed
+    back to the loop, which picks it up once the current job releases it.
+    """
+    loop = asyncio.get_running_loop()
+    duration_s = float(os.environ.get("PROFILE_SECONDS", DEFAULT_SIGNAL_PROFILE_S))
+    result_key = PROFILE_RESULT.format(target=worker_id)
+
+    async def store(collapsed: str) -> None:
+        await client.set(result_key, collapsed.encode(), ex=PROFILE_RESULT_TTL_S)
+        logger.info(f"Profile stored at {result_key} ({len(collapsed.splitlines())} unique stacks)")
+
+    def run() -> None:
+        try:
+            collapsed = format_collapsed(sample_stacks(duration_s))
+        except ProfilerBusyError:
+            logger.warning("SIGUSR1 ignored: a profile is already running")
+            return
+        asyncio.run_coroutine_threadsafe(store(collapsed), loop)
+
+    def on_signal(signum: int, frame: FrameType | None) -> None:
+        logger.info(f"SIGUSR1 received, profiling {worker_id} for {duration_s:.0f}s")
+        threading.Thread(target=run, name="profiler", daemon=True).start()
+
+    signal.signal(signal.SIGUSR1, on_signal)
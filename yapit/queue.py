@@ -5,6 +5,7 @@ YOLO workers pull and track them. Job types and processing logic live with the
 callers.
 """
 
+import asyncio
 import json
 import time
 from dataclasses import dataclass
@@ -20,7 +21,8 @@ class QueueConfig:
     queue_name: str  # sorted set: job_id -> timestamp
     jobs_key: str  # hash: job_id -> {retry_count, job}
     processing_pattern: str | None = None  # e.g. "tts:processing:{worker_id}" (only needed for workers)
-    results_key: str | None = None  # list for result queue (TTS), None for direct key storage (YOLO)
+    leases_key: str | None = None  # sorted set: "{processing_key}|{job_id}" -> deadline (only needed for workers)
+    results_key: str | None = None  # stream for result queue (TTS), None for direct key storage (YOLO)
     job_index_key: str | None = None  # hash for deduplication index (TTS only)
 
 
@@ -34,6 +36,11 @@ class PulledJob:
     queued_at: float
 
 
+def job_index_entry(job_id: str, queue_name: str, variant_hash: str | None) -> str:
+    """Job index value: everything cursor eviction needs, without decoding the job."""
+    return f"{job_id}|{queue_name}|{variant_hash or ''}"
+
+
 async def push_job(
     client: redis.Redis,
     config: QueueConfig,
@@ -41,6 +48,8 @@ async def push_job(
     raw_job: bytes,
     retry_count: int = 0,
     index_key: str | None = None,
+    variant_hash: str | None = None,
+    score_offset_s: float = 0.0,
 ) -> None:
     """Push a job to the queue.
 
@@ -51,6 +60,9 @@ async def push_job(
         raw_job: Serialized job data (caller handles serialization)
         retry_count: Number of times this job has been retried
         index_key: Optional key for job index (for deduplication/eviction)
+        variant_hash: Stored in the index entry so eviction can release the inflight key
+        score_offset_s: Queue the job behind everything pushed in the next score_offset_s
+            seconds (background work)
     """
     now = time.time()
     wrapper_data: dict = {"retry_count": retry_count, "job": raw_job.decode(), "queued_at": now}
@@ -60,8 +72,8 @@ async def push_job(
 
     await client.hset(config.jobs_key, job_id, job_wrapper)
     if index_key and config.job_index_key:
-        await client.hset(config.job_index_key, index_key, job_id)
-    await client.zadd(config.queue_name, {job_id: now})
+        await client.hset(config.job_index_key, index_key, job_index_entry(job_id, config.queue_name, variant_hash))
+    await client.zadd(config.queue_name, {job_id: now + score_offset_s})
 
 
 async def pull_job(
@@ -101,6 +113,16 @@ async def pull_job(
     )
 
 
+def lease_member(processing_key: str, job_id: str) -> str:
+    """Lease ZSET member: enough for the scanner to find the processing entry without scanning."""
+    return f"{processing_key}|{job_id}"
+
+
+def parse_lease_member(member: str) -> tuple[str, str]:
+    processing_key, job_id = member.rsplit("|", 1)
+    return processing_key, job_id
+
+
 async def track_processing(
     client: redis.Redis,
     processing_key: str,
@@ -109,22 +131,90 @@ async def track_processing(
     retry_count: int,
     queue_name: str,
     dlq_key: str,
-) -> None:
+    leases_key: str,
+    lease_s: float,
+    fences_key: str | None = None,
+) -> int | None:
     """Track a job as being processed.
 
-    Stores processing entry with timestamp for visibility timeout scanning.
-    Includes queue_name and dlq_key so scanner can requeue without parsing job.
+    Stores the processing entry and indexes it in the leases ZSET by deadline, so the
+    visibility scanner finds expired jobs with one ZRANGEBYSCORE instead of reading
+    every worker's hash. Includes queue_name and dlq_key so scanner can requeue without parsing job.
+
+    With `fences_key`, the lease also gets a fencing token — a globally increasing
+    number recorded as the job's current holder. The worker attaches it to its
+    result; a result whose token no longer matches came from a lease the scanner
+    reclaimed and must be discarded. Returns the token (None without fencing).
     """
+    token = await client.incr(f"{fences_key}:seq") if fences_key else None
+    now = time.time()
     entry = json.dumps(
         {
-            "processing_started": time.time(),
+            "processing_started": now,
             "retry_count": retry_count,
             "job": raw_job.decode(),
             "queue_name": queue_name,
             "dlq_key": dlq_key,
         }
     )
-    await client.hset(processing_key, job_id, entry)
+    async with client.pipeline() as pipe:
+        pipe.hset(processing_key, job_id, entry)
+        pipe.zadd(leases_key, {lease_member(processing_key, job_id): now + lease_s})
+        if fences_key:
+            assert token is not None
+            pipe.hset(fences_key, job_id, token)
+        await pipe.execute()
+    return token
+
+
+async def renew_lease(client: redis.Redis, leases_key: str, processing_key: str, job_id: str, lease_s: float) -> bool:
+    """Push a running job's deadline to now + lease_s.
+
+    Returns False if the lease is gone — the scanner already reclaimed the job and
+    someone else may be running it.
+    """
+    member = lease_member(processing_key, job_id)
+    changed = await client.zadd(leases_key, {member: time.time() + lease_s}, xx=True, ch=True)
+    return bool(changed)
+
+
+async def release_processing(client: redis.Redis, processing_key: str, leases_key: str, job_id: str) -> None:
+    """Drop the processing entry and its lease once the job has a result."""
+    async with client.pipeline() as pipe:
+        pipe.hdel(processing_key, job_id)
+        pipe.zrem(leases_key, lease_member(processing_key, job_id))
+        await pipe.execute()
+
+
+async def push_result(client: redis.Redis, results_key: str, result_json: str) -> None:
+    """Append a worker result to the results stream for the gateway's consumer group."""
+    await client.xadd(results_key, {"data": result_json})
+
+
+async def run_lease_heartbeat(
+    client: redis.Redis,
+    leases_key: str,
+    processing_key: str,
+    job_id: str,
+    interval_s: float,
+    lease_s: float,
+    budget_deadline: float,
+) -> None:
+    """Renew a lease every `interval_s` until cancelled.
+
+    Each renewal extends the deadline to now + `lease_s`, but never past
+    `budget_deadline` — a crashed worker is detected within `lease_s`, and a hung
+    one once its budget runs out, since renewals stop extending it.
+    """
+    while True:
+        await asyncio.sleep(interval_s)
+        remaining_s = budget_deadline - time.time()
+        if remaining_s <= 0:
+            logger.warning(f"Job {job_id} exceeded its lease budget, no longer renewing")
+            return
+        if not await renew_lease(client, leases_key, processing_key, job_id, min(lease_s, remaining_s)):
+            logger.warning(f"Lease for job {job_id} was reclaimed while still running")
+            return
 
 
 async def requeue_job(
@@ -8,14 +8,30 @@ class PubSub:
     async def subscribe(self, *args: str, **kwargs: Any) -> None: ...
     async def unsubscribe(self, *args: str) -> None: ...
     def listen(self) -> AsyncIterator[dict[str, Any]]: ...
+    async def get_message(
+        self, ignore_subscribe_messages: bool = False, timeout: float | None = 0.0
+    ) -> dict[str, Any] | None: ...
+    async def aclose(self) -> None: ...
     async def close(self) -> None: ...
 
 class Pipeline:
     def get(self, name: KeyT) -> Any: ...
     def set(self, name: KeyT, value: EncodableT, **kwargs: Any) -> Any: ...
+    def hset(self, name: KeyT, key: KeyT, value: EncodableT) -> Any: ...
     def hget(self, name: KeyT, key: KeyT) -> Any: ...
     def hdel(self, name: KeyT, *keys: KeyT) -> Any: ...
+    def zadd(self, name: KeyT, mapping: dict[str, float], **kwargs: Any) -> Any: ...
     def zrem(self, name: KeyT, *values: str) -> Any: ...
+    def sadd(self, name: KeyT, *values: EncodableT) -> Any: ...
+    def srem(self, name: KeyT, *values: EncodableT) -> Any: ...
+    def smembers(self, name: KeyT) -> Any: ...
+    def lpush(self, name: KeyT, *values: EncodableT) -> Any: ...
+    def publish(self, channel: str, message: EncodableT) -> Any: ...
+    def xadd(self, name: KeyT, fields: dict[Any, Any], **kwargs: Any) -> Any: ...
+    def xack(self, name: KeyT, groupname: KeyT, *ids: KeyT) -> Any: ...
+    def xdel(self, name: KeyT, *ids: KeyT) -> Any: ...
+    def expire(self, name: KeyT, time: int) -> Any: ...
+    def exists(self, *names: KeyT) -> Any: ...
     def delete(self, *names: KeyT) -> Any: ...
     async def execute(self) -> list[Any]: ...
     async def __aenter__(self) -> Self: ...
@@ -69,12 +85,24 @@ class Redis:
         withscores: bool = False,
         score_cast_func: Any = ...,
     ) -> list[Any]: ...
+    async def zrevrangebyscore(
+        self,
+        name: KeyT,
+        max: float | str,
+        min: float | str,
+        start: int | None = None,
+        num: int | None = None,
+        withscores: bool = False,
+        score_cast_func: Any = ...,
+    ) -> list[Any]: ...
+    async def zcount(self, name: KeyT, min: float | str, max: float | str) -> int: ...
     async def bzpopmin(self, keys: KeyT, timeout: float = 0) -> tuple[bytes, bytes, float] | None: ...
 
     # Keys
     async def exists(self, *names: KeyT) -> int: ...
     async def delete(self, *names: KeyT) -> int: ...
-    async def expire(self, name: KeyT, time: int) -> bool: ...
+    async def expire(self, name: KeyT, time: int, **kwargs: Any) -> bool: ...
+    async def ttl(self, name: KeyT) -> int: ...
     async def scan(
         self, cursor: int = 0, match: str | None = None, count: int | None = None, **kwargs: Any
     ) -> tuple[int, list[bytes]]: ...
@@ -104,7 +132,26 @@ class Redis:
     async def xack(self, name: KeyT, groupname: KeyT, *ids: KeyT) -> int: ...
     async def xdel(self, name: KeyT, *ids: KeyT) -> int: ...
     async def xgroup_create(self, name: KeyT, groupname: KeyT, id: str = "$", mkstream: bool = False) -> bool: ...
+    async def xgroup_delconsumer(self, name: KeyT, groupname: KeyT, consumername: KeyT) -> int: ...
+    async def xautoclaim(
+        self,
+        name: KeyT,
+        groupname: KeyT,
+        consumername: KeyT,
+        min_idle_time: int,
+        start_id: str | bytes = "0-0",
+        count: int | None = None,
+        justid: bool = False,
+    ) -> list[Any]: ...
+    async def xinfo_consumers(self, name: KeyT, groupname: KeyT) -> list[dict[str, Any]]: ...
     async def xlen(self, name: KeyT) -> int: ...
+    async def xrange(
+        self, name: KeyT, min: str = "-", max: str = "+", count: int | None = None
+    ) -> list[tuple[bytes, dict[bytes, bytes]]]: ...
+
+    # Scripting
+    async def eval(self, script: str, numkeys: int, *keys_and_args: EncodableT) -> Any: ...
+    def register_script(self, script: str) -> Any: ...
 
     # Pub/Sub
     async def publish(self, channel: str, message: EncodableT) -> int: ...
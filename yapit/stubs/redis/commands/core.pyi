@@ -0,0 +1,15 @@
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from redis.asyncio.client import Pipeline, Redis
+from redis.typing import EncodableT, KeyT
+
+class AsyncScript:
+    sha: str
+    def __init__(self, registered_client: Redis | None, script: str | bytes) -> None: ...
+    async def __call__(
+        self,
+        keys: Sequence[KeyT] | None = None,
+        args: Iterable[EncodableT] | None = None,
+        client: Redis | Pipeline | None = None,
+    ) -> Any: ...
@@ -1 +1,2 @@
-class ResponseError(Exception): ...
+class RedisError(Exception): ...
+class ResponseError(RedisError): ...
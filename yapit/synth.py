@@ -1,14 +1,41 @@
-"""How a TTS model is called, and how one job is run."""
+"""How a TTS model is called, and how one job is run.
 
+Cancellation is cooperative: when a user skips past a block whose job is already
+running, the gateway records it in `tts:cancel:{job_id}`. A watcher next to the job
+turns that into a thread-safe event once nobody else is waiting on the audio, and
+adapters call `raise_if_cancelled()` between units of work (sentence chunks, HTTP
+retries). The event travels in a contextvar so it reaches `asyncio.to_thread`
+workers and stays per-job when jobs run concurrently.
+"""
+
+import asyncio
 import base64
-import json
+import threading
 import time
 from abc import ABC, abstractmethod
+from contextvars import ContextVar
 from typing import TypedDict, Unpack
 
+import redis.asyncio as redis
 from loguru import logger
 
-from yapit.contracts import SynthesisJob, SynthesisResult, WorkerResult
+from yapit.contracts import TTS_CANCEL, TTS_SUBSCRIBERS, SynthesisJob, SynthesisResult, WorkerResult
+from yapit.word_timestamps import encode_b64
+
+CANCEL_POLL_INTERVAL_S = 0.5
+
+_cancel_event: ContextVar[threading.Event | None] = ContextVar("cancel_event", default=None)
+
+
+class SynthesisCancelled(Exception):
+    """Every block waiting on this job was skipped; stop synthesizing."""
+
+
+def raise_if_cancelled() -> None:
+    """Checkpoint for adapters. Safe to call from worker threads."""
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise SynthesisCancelled()
 
 
 # ty doesn't accept a TypedDict bound on a type parameter yet; the runtime contract is fine.
@@ -29,8 +56,18 @@ class SynthAdapter[SynthesisParameters: TypedDict](ABC):  # ty: ignore[invalid-t
         return None
 
 
-async def execute_job(adapter: SynthAdapter, job: SynthesisJob, worker_id: str, queued_at: float) -> WorkerResult:
-    """Synthesize one job. Failures come back as an error result, not an exception."""
+async def execute_job(
+    adapter: SynthAdapter,
+    job: SynthesisJob,
+    worker_id: str,
+    queued_at: float,
+    lease_token: int | None = None,
+    client: redis.Redis | None = None,
+) -> WorkerResult:
+    """Synthesize one job. Failures come back as an error result, not an exception.
+
+    With `client`, the job can be cancelled mid-synthesis (see module docstring).
+    """
     job_log = logger.bind(
         job_id=str(job.job_id),
         user_id=job.user_id,
@@ -46,9 +83,10 @@ async def execute_job(adapter: SynthAdapter, job: SynthesisJob, worker_id: str,
         *,
         audio_base64: str | None = None,
         duration_ms: int | None = None,
-        word_timestamps_json: str | None = None,
+        word_timestamps: str | None = None,
         error: str | None = None,
         error_detail: str | None = None,
+        cancelled: bool = False,
     ) -> WorkerResult:
         return WorkerResult(
             job_id=job.job_id,
@@ -65,21 +103,34 @@ async def execute_job(adapter: SynthAdapter, job: SynthesisJob, worker_id: str,
             queue_wait_ms=queue_wait_ms,
             audio_base64=audio_base64,
             duration_ms=duration_ms,
-            word_timestamps_json=word_timestamps_json,
+            word_timestamps=word_timestamps,
             error=error,
             error_detail=error_detail,
+            lease_token=lease_token,
+            cancelled=cancelled,
         )
 
+    cancel = threading.Event()
+    cancel_token = _cancel_event.set(cancel)
+    watcher = asyncio.create_task(_watch_for_cancel(client, job, cancel)) if client is not None else None
     try:
         synth_result = await _synthesize(adapter, job)
+    except SynthesisCancelled:
+        job_log.info(f"Job cancelled after {int((time.time() - start_time) * 1000)}ms, block skipped")
+        return build_result(cancelled=True)
     except Exception as e:
         job_log.exception(f"Job failed: {e}")
         return build_result(error="Synthesis failed", error_detail=str(e))
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+            await asyncio.gather(watcher, return_exceptions=True)
+        _cancel_event.reset(cancel_token)
 
     worker_result = build_result(
         audio_base64=base64.b64encode(synth_result.audio).decode("ascii"),
         duration_ms=synth_result.duration_ms,
-        word_timestamps_json=synth_result.word_timestamps_json,
+        word_timestamps=synth_result.word_timestamps,
     )
     job_log.info(
         f"Job completed: {worker_result.processing_time_ms}ms processing, "
@@ -88,6 +139,26 @@ async def execute_job(adapter: SynthAdapter, job: SynthesisJob, worker_id: str,
     return worker_result
 
 
+async def _watch_for_cancel(client: redis.Redis, job: SynthesisJob, cancel: threading.Event) -> None:
+    cancel_key = TTS_CANCEL.format(job_id=job.job_id)
+    subscriber_key = TTS_SUBSCRIBERS.format(hash=job.variant_hash)
+    while True:
+        await asyncio.sleep(CANCEL_POLL_INTERVAL_S)
+        # Both sets in one MULTI: the gateway re-subscribes a block and clears its
+        # mark in one transaction, so this sees either both changes or neither.
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.smembers(cancel_key)
+            pipe.smembers(subscriber_key)
+            evicted, subscribers = await pipe.execute()
+        if not evicted:
+            continue
+        # Same text+voice in another block or another user's document shares this job
+        if subscribers - evicted:
+            continue
+        cancel.set()
+        return
+
+
 async def _synthesize(adapter: SynthAdapter, job: SynthesisJob) -> SynthesisResult:
     audio = await adapter.synthesize(
         job.synthesis_parameters.text,
@@ -101,5 +172,5 @@ async def _synthesize(adapter: SynthAdapter, job: SynthesisJob) -> SynthesisResu
     return SynthesisResult(
         audio=audio,
         duration_ms=adapter.calculate_duration_ms(audio),
-        word_timestamps_json=json.dumps(word_ts) if word_ts else None,
+        word_timestamps=encode_b64(word_ts) if word_ts else None,
     )
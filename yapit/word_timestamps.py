@@ -0,0 +1,127 @@
+"""Compact binary encoding of word timestamps.
+
+Kokoro reports a start and end per word. As JSON ({"t","s","e"} per word) that is
+often as large as a short block's Opus audio, and it travels worker -> Redis ->
+SQLite -> every WebSocket status. The encoded form:
+
+    header  1 byte   FORMAT_VERSION | FLAG_ZLIB
+    body             zlib-compressed when FLAG_ZLIB is set
+      varint n_tokens, then per token: varint byte length + UTF-8
+      varint n_words,  then per word:  varint token index,
+                                       zigzag varint start - previous start (ms),
+                                       varint end - start (ms)
+
+Repeated words share a token table entry. The body is compressed only when that
+makes it smaller. zlib rather than zstd: it is in the 3.12 stdlib, and at a few
+hundred bytes the ratio difference is noise.
+
+Where the payload rides in JSON (WorkerResult, AudioMeta, WS status) it is base64.
+"""
+
+import base64
+import zlib
+
+FORMAT_VERSION = 1
+FLAG_ZLIB = 0x10
+_VERSION_MASK = 0x0F
+
+
+class TimestampDecodeError(ValueError):
+    pass
+
+
+def encode(words: list[dict]) -> bytes:
+    """Encode [{"t": str, "s": seconds, "e": seconds}, ...]."""
+    token_index: dict[str, int] = {}
+    entries = bytearray()
+    prev_start = 0
+    for word in words:
+        token = word["t"]
+        if token not in token_index:
+            token_index[token] = len(token_index)
+        start, end = round(word["s"] * 1000), round(word["e"] * 1000)
+        _write_varint(entries, token_index[token])
+        _write_varint(entries, _zigzag(start - prev_start))
+        _write_varint(entries, max(end - start, 0))
+        prev_start = start
+
+    body = bytearray()
+    _write_varint(body, len(token_index))
+    for token in token_index:
+        raw = token.encode()
+        _write_varint(body, len(raw))
+        body += raw
+    _write_varint(body, len(words))
+    body += entries
+
+    compressed = zlib.compress(body, 9)
+    if len(compressed) < len(body):
+        return bytes([FORMAT_VERSION | FLAG_ZLIB]) + compressed
+    return bytes([FORMAT_VERSION]) + body
+
+
+def decode(data: bytes) -> list[dict]:
+    """Inverse of encode, with start/end back in seconds."""
+    if not data or data[0] & _VERSION_MASK != FORMAT_VERSION:
+        raise TimestampDecodeError("Unknown word timestamp format")
+    body = data[1:]
+    if data[0] & FLAG_ZLIB:
+        try:
+            body = zlib.decompress(body)
+        except zlib.error as e:
+            raise TimestampDecodeError(f"Corrupt word timestamps: {e}") from e
+
+    try:
+        pos = 0
+        n_tokens, pos = _read_varint(body, pos)
+        tokens: list[str] = []
+        for _ in range(n_tokens):
+            length, pos = _read_varint(body, pos)
+            tokens.append(body[pos : pos + length].decode())
+            pos += length
+        n_words, pos = _read_varint(body, pos)
+        words: list[dict] = []
+        start = 0
+        for _ in range(n_words):
+            idx, pos = _read_varint(body, pos)
+            delta, pos = _read_varint(body, pos)
+            duration, pos = _read_varint(body, pos)
+            start += _unzigzag(delta)
+            words.append({"t": tokens[idx], "s": start / 1000, "e": (start + duration) / 1000})
+    except (IndexError, UnicodeDecodeError) as e:
+        raise TimestampDecodeError(f"Corrupt word timestamps: {e}") from e
+    return words
+
+
+def encode_b64(words: list[dict]) -> str:
+    return base64.b64encode(encode(words)).decode()
+
+
+def decode_b64(packed: str) -> list[dict]:
+    return decode(base64.b64decode(packed))
+
+
+def _zigzag(n: int) -> int:
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+def _unzigzag(n: int) -> int:
+    return n // 2 if n % 2 == 0 else -(n + 1) // 2
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
@@ -11,7 +11,7 @@ import torch
 from kokoro import KModel, KPipeline
 from typing_extensions import TypedDict
 
-from yapit.synth import SynthAdapter
+from yapit.synth import SynthAdapter, raise_if_cancelled
 
 DEVICE: str = os.getenv("DEVICE", "")
 
@@ -65,38 +65,45 @@ class KokoroAdapter(SynthAdapter[VoiceConfig]):
         return self._pipes[lang_code]
 
     async def synthesize(self, text: str, **kwargs: Unpack[VoiceConfig]) -> bytes:
+        # Inference and encoding run off the event loop so the worker's lease heartbeat keeps ticking
         async with self._lock:  # model not thread-safe (usage as local worker with fastapi)
-            pipe = self._pipeline(_lang_code(kwargs["voice"]))
-            all_pcm: list[bytes] = []
-            all_timestamps: list[dict] = []
-            cumulative_s = 0.0
-
-            for result in pipe(text, voice=kwargs["voice"], speed=kwargs["speed"], split_pattern=SPLIT_PATTERN):
-                if result.audio is None:
-                    continue
-                pcm = (result.audio.numpy() * 32767).astype(np.int16).tobytes()
-                all_pcm.append(pcm)
-
-                if result.tokens:
-                    for tok in result.tokens:
-                        if tok.start_ts is not None and tok.end_ts is not None:
-                            all_timestamps.append(
-                                {
-                                    "t": tok.text,
-                                    "s": round(tok.start_ts + cumulative_s, 4),
-                                    "e": round(tok.end_ts + cumulative_s, 4),
-                                }
-                            )
-
-                cumulative_s += len(pcm) / (KOKORO_SAMPLE_RATE * 2)
-
-            pcm = b"".join(all_pcm)
-
-        # Calculate exact duration from PCM before lossy encoding
-        self._last_duration_ms = int(len(pcm) / (KOKORO_SAMPLE_RATE * 2) * 1000)
-        self._last_word_timestamps = all_timestamps if all_timestamps else None
-
-        return _pcm_to_ogg_opus(pcm)
+            pcm, all_timestamps = await asyncio.to_thread(self._synthesize_pcm, text, kwargs["voice"], kwargs["speed"])
+            audio = await asyncio.to_thread(_pcm_to_ogg_opus, pcm)
+
+            # Set under the lock with no await before returning, so the caller reads this
+            # synthesis's values, not a concurrent one's. Duration is exact from the PCM.
+            self._last_duration_ms = int(len(pcm) / (KOKORO_SAMPLE_RATE * 2) * 1000)
+            self._last_word_timestamps = all_timestamps if all_timestamps else None
+            return audio
+
+    def _synthesize_pcm(self, text: str, voice: str, speed: float) -> tuple[bytes, list[dict]]:
+        pipe = self._pipeline(_lang_code(voice))
+        all_pcm: list[bytes] = []
+        all_timestamps: list[dict] = []
+        cumulative_s = 0.0
+
+        # The pipeline yields per sentence chunk; a skipped block stops at the next one
+        for result in pipe(text, voice=voice, speed=speed, split_pattern=SPLIT_PATTERN):
+            raise_if_cancelled()
+            if result.audio is None:
+                continue
+            pcm = (result.audio.numpy() * 32767).astype(np.int16).tobytes()
+            all_pcm.append(pcm)
+
+            if result.tokens:
+                for tok in result.tokens:
+                    if tok.start_ts is not None and tok.end_ts is not None:
+                        all_timestamps.append(
+                            {
+                                "t": tok.text,
+                                "s": round(tok.start_ts + cumulative_s, 4),
+                                "e": round(tok.end_ts + cumulative_s, 4),
+                            }
+                        )
+
+            cumulative_s += len(pcm) / (KOKORO_SAMPLE_RATE * 2)
+
+        return b"".join(all_pcm), all_timestamps
 
     def calculate_duration_ms(self, audio_bytes: bytes) -> int:
         return self._last_duration_ms
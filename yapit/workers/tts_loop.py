@@ -1,22 +1,69 @@
-"""Pull-based TTS worker that processes synthesis jobs from Redis queue."""
+"""Pull-based TTS worker that processes synthesis jobs from Redis queue.
+
+Leases: each job's visibility budget scales with its text length and this worker's
+observed synthesis speed, so a long block on a slow CPU replica isn't requeued
+while still running. Within that budget the lease is kept short and renewed by a
+heartbeat, so a crashed worker's job is picked up within HEARTBEAT_LEASE_S.
+"""
 
 import asyncio
+import time
 
 import redis.asyncio as redis
 from loguru import logger
 
 from yapit.contracts import (
     TTS_DLQ,
+    TTS_FENCES,
     TTS_JOB_INDEX,
     TTS_JOBS,
+    TTS_LEASES,
     TTS_PROCESSING,
     TTS_RESULTS,
+    TTS_VISIBILITY_TIMEOUT_S,
     SynthesisJob,
     get_queue_name,
 )
-from yapit.queue import QueueConfig, pull_job, track_processing
+from yapit.profiler import install_signal_profiler
+from yapit.queue import (
+    QueueConfig,
+    pull_job,
+    push_result,
+    release_processing,
+    run_lease_heartbeat,
+    track_processing,
+)
 from yapit.synth import SynthAdapter, execute_job
 
+HEARTBEAT_INTERVAL_S = 3
+HEARTBEAT_LEASE_S = 10
+
+# Budget = expected synthesis time x factor, clamped. Until a job has been timed,
+# assume a slow CPU replica.
+DEFAULT_CHARS_PER_S = 25.0
+BUDGET_FACTOR = 3.0
+MAX_BUDGET_S = 300
+THROUGHPUT_EWMA_ALPHA = 0.2
+
+
+class ThroughputEstimate:
+    """EWMA of this worker's chars/sec. Per replica on purpose: a CPU and a GPU
+    replica of the same model differ by an order of magnitude.
+    """
+
+    def __init__(self, chars_per_s: float = DEFAULT_CHARS_PER_S):
+        self.chars_per_s = chars_per_s
+
+    def observe(self, text_length: int, processing_time_ms: int) -> None:
+        if text_length <= 0 or processing_time_ms <= 0:
+            return
+        sample = text_length / (processing_time_ms / 1000)
+        self.chars_per_s += THROUGHPUT_EWMA_ALPHA * (sample - self.chars_per_s)
+
+    def budget_s(self, text_length: int) -> float:
+        expected_s = text_length / self.chars_per_s
+        return min(max(expected_s * BUDGET_FACTOR, TTS_VISIBILITY_TIMEOUT_S), MAX_BUDGET_S)
+
 
 async def run_tts_worker(redis_url: str, model: str, adapter: SynthAdapter, worker_id: str) -> None:
     """Process jobs one at a time — a GPU model can only synthesize sequentially."""
@@ -24,11 +71,13 @@ async def run_tts_worker(redis_url: str, model: str, adapter: SynthAdapter, work
         queue_name=get_queue_name(model),
         jobs_key=TTS_JOBS,
         processing_pattern=TTS_PROCESSING,
+        leases_key=TTS_LEASES,
         results_key=TTS_RESULTS,
         job_index_key=TTS_JOB_INDEX,
     )
     processing_key = TTS_PROCESSING.format(worker_id=worker_id)
     dlq_key = TTS_DLQ.format(model=model)
+    throughput = ThroughputEstimate()
 
     logger.info(f"TTS worker {worker_id} starting, queue={config.queue_name}")
 
@@ -36,6 +85,7 @@ async def run_tts_worker(redis_url: str, model: str, adapter: SynthAdapter, work
     logger.info(f"TTS worker {worker_id} adapter initialized")
 
     client = await redis.from_url(redis_url, decode_responses=False)
+    install_signal_profiler(client, worker_id)
 
     try:
         while True:
@@ -44,17 +94,43 @@ async def run_tts_worker(redis_url: str, model: str, adapter: SynthAdapter, work
                 continue
 
             job = SynthesisJob.model_validate_json(pulled.raw_job)
+            text_length = len(job.synthesis_parameters.text)
+            budget_s = throughput.budget_s(text_length)
 
-            await track_processing(
-                client, processing_key, pulled.job_id, pulled.raw_job, pulled.retry_count, config.queue_name, dlq_key
+            lease_token = await track_processing(
+                client,
+                processing_key,
+                pulled.job_id,
+                pulled.raw_job,
+                pulled.retry_count,
+                config.queue_name,
+                dlq_key,
+                TTS_LEASES,
+                min(HEARTBEAT_LEASE_S, budget_s),
+                fences_key=TTS_FENCES,
+            )
+            heartbeat = asyncio.create_task(
+                run_lease_heartbeat(
+                    client,
+                    TTS_LEASES,
+                    processing_key,
+                    pulled.job_id,
+                    interval_s=HEARTBEAT_INTERVAL_S,
+                    lease_s=HEARTBEAT_LEASE_S,
+                    budget_deadline=time.time() + budget_s,
+                )
             )
 
             try:
-                worker_result = await execute_job(adapter, job, worker_id, pulled.queued_at)
+                worker_result = await execute_job(adapter, job, worker_id, pulled.queued_at, lease_token, client)
             finally:
-                await client.hdel(processing_key, pulled.job_id)
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+                await release_processing(client, processing_key, TTS_LEASES, pulled.job_id)
 
-            await client.lpush(TTS_RESULTS, worker_result.model_dump_json())
+            if not worker_result.error and not worker_result.cancelled:
+                throughput.observe(text_length, worker_result.processing_time_ms)
+            await push_result(client, TTS_RESULTS, worker_result.model_dump_json())
 
     except asyncio.CancelledError:
         logger.info(f"TTS worker {worker_id} shutting down")
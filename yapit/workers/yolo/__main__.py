@@ -23,16 +23,19 @@ from PIL import Image
 from yapit.contracts import (
     YOLO_DLQ,
     YOLO_JOBS,
+    YOLO_LEASES,
     YOLO_PROCESSING,
     YOLO_QUEUE,
     YOLO_RESULT,
+    YOLO_VISIBILITY_TIMEOUT_S,
     YoloJob,
     YoloResult,
 )
 from yapit.contracts import (
     DetectedFigure as DetectedFigureContract,
 )
-from yapit.queue import QueueConfig, pull_job, track_processing
+from yapit.profiler import install_signal_profiler
+from yapit.queue import QueueConfig, pull_job, release_processing, track_processing
 
 DEVICE: str = os.getenv("DEVICE", "cpu")
 
@@ -44,7 +47,9 @@ IOU_THRESHOLD = 0.45
 IMGSZ = 1024
 
 _model: YOLOv10 | None = None
-_queue_config = QueueConfig(queue_name=YOLO_QUEUE, jobs_key=YOLO_JOBS, processing_pattern=YOLO_PROCESSING)
+_queue_config = QueueConfig(
+    queue_name=YOLO_QUEUE, jobs_key=YOLO_JOBS, processing_pattern=YOLO_PROCESSING, leases_key=YOLO_LEASES
+)
 
 
 @dataclass
@@ -251,6 +256,7 @@ async def run_worker(redis_url: str, worker_id: str) -> None:
     logger.info(f"YOLO worker {worker_id} starting, queue={_queue_config.queue_name}")
 
     client = await redis.from_url(redis_url, decode_responses=False)
+    install_signal_profiler(client, worker_id)
 
     try:
         while True:
@@ -269,6 +275,8 @@ async def run_worker(redis_url: str, worker_id: str) -> None:
                 pulled.retry_count,
                 _queue_config.queue_name,
                 YOLO_DLQ,
+                YOLO_LEASES,
+                YOLO_VISIBILITY_TIMEOUT_S,
             )
 
             try:
@@ -300,7 +308,7 @@ async def run_worker(redis_url: str, worker_id: str) -> None:
                 )
 
             finally:
-                await client.hdel(processing_key, pulled.job_id)
+                await release_processing(client, processing_key, YOLO_LEASES, pulled.job_id)
 
             result_key = YOLO_RESULT.format(job_id=str(job.job_id))
             await client.lpush(result_key, result.model_dump_json())